@@ -0,0 +1,71 @@
+"""
+Redução das séries históricas para os gráficos.
+
+Com várias extrações por dia o histórico cresce sem limite, mas o gráfico só
+precisa de uma quantidade fixa de pontos. Quando a série passa de
+PONTOS_GRAFICO, as extrações são agrupadas no maior balde (semana ou dia) que
+ainda deixa pelo menos PONTOS_GRAFICO pontos (fica a última extração de cada
+balde, como no rollup de crescimento.py), e o LTTB (Largest-Triangle-Three-
+Buckets) escolhe entre eles os pontos que preservam a forma da curva: picos e
+vales continuam no gráfico, o resto sai.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Pontos por série enviados ao navegador
+PONTOS_GRAFICO = 400
+# Baldes de tempo, do maior para o menor
+BALDES = ("W", "D")
+# Acima disso as séries são desenhadas só com linhas
+MARCADORES_ATE = 60
+
+
+def lttb(x, y, limite):
+    """Índices dos `limite` pontos escolhidos pelo LTTB (primeiro e último sempre entram)"""
+    n = len(x)
+    if limite >= n or limite < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Baldes do meio: limite - 2 faixas de índices [bordas[i], bordas[i + 1])
+    bordas = (np.arange(limite - 1) * (n - 2) / (limite - 2)).astype(np.int64) + 1
+    bordas[-1] = n - 1
+    indices = np.empty(limite, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    anterior = 0
+    for i in range(limite - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+        # Média do balde seguinte (o último ponto, no caso do último balde)
+        proximo_fim = bordas[i + 2] if i + 2 < len(bordas) else n
+        media_x = x[fim:proximo_fim].mean()
+        media_y = y[fim:proximo_fim].mean()
+        area = np.abs(
+            (x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(area))
+        indices[i + 1] = anterior
+    return indices
+
+
+def reduzir_historico(df, coluna, limite=PONTOS_GRAFICO, por=None, coluna_data='data_extracao'):
+    """Linhas de `df` para o gráfico de `coluna`: no máximo `limite` por série (por grupo de `por`)"""
+    if por is not None:
+        partes = [reduzir_historico(grupo, coluna, limite, None, coluna_data) for _, grupo in df.groupby(por, sort=False)]
+        return pd.concat(partes) if partes else df
+    df = df.sort_values(coluna_data)
+    if len(df) <= limite:
+        return df
+    for balde in BALDES:
+        chave = df[coluna_data].dt.to_period(balde)
+        if chave.nunique() >= limite:
+            df = df.groupby(chave, sort=False).tail(1)
+            break
+    x = df[coluna_data].to_numpy(dtype='datetime64[s]').astype(np.int64)
+    return df.iloc[lttb(x, df[coluna].to_numpy(), limite)]
+
+
+def modo_linha(pontos):
+    """mode do go.Scatter: marcadores só enquanto a série tem poucos pontos"""
+    return 'lines+markers' if pontos <= MARCADORES_ATE else 'lines'
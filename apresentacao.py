@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Relatórios em PowerPoint montados sobre um deck-modelo.
+
+O deck-modelo (modelos/apresentacao.pptx) já traz o formato 16:9 e os layouts
+estilizados (capa, seção, seção de alerta e encerramento, com fundos, faixas de
+cabeçalho e textos fixos). Ele é lido uma vez por processo e cada relatório só
+desenha o conteúdo variável: títulos, cards, tabelas e gráficos, estes com
+`CategoryChartData` montado a partir das colunas de tabelas.py.
+
+Uso:
+    python apresentacao.py --modelo                 # regrava modelos/apresentacao.pptx
+    python apresentacao.py --por-unidade [TIPO]     # um deck por unidade (em paralelo)
+"""
+
+import copy
+import functools
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+
+import tabelas
+
+try:
+    from pptx import Presentation
+    from pptx.util import Inches, Pt
+    from pptx.dml.color import RGBColor
+    from pptx.enum.text import PP_ALIGN
+    from pptx.enum.shapes import MSO_SHAPE
+    from pptx.chart.data import CategoryChartData
+    from pptx.enum.chart import XL_CHART_TYPE, XL_LEGEND_POSITION, XL_LABEL_POSITION
+    PPTX_AVAILABLE = True
+except ImportError:
+    PPTX_AVAILABLE = False
+
+MODELO_PPTX = Path(__file__).parent / "modelos" / "apresentacao.pptx"
+
+if PPTX_AVAILABLE:
+    # Cores do tema
+    AZUL_ESCURO = RGBColor(30, 73, 118)  # #1e4976
+    AZUL_CLARO = RGBColor(37, 99, 235)   # #2563eb
+    VERDE = RGBColor(34, 197, 94)        # #22c55e
+    VERMELHO = RGBColor(239, 68, 68)     # #ef4444
+    LARANJA = RGBColor(249, 115, 22)     # #f97316
+    CINZA = RGBColor(100, 116, 139)      # #64748b
+    CINZA_CLARO = RGBColor(148, 163, 184)
+    BORDA = RGBColor(226, 232, 240)
+    BRANCO = RGBColor(255, 255, 255)
+
+    LARGURA = Inches(13.333)  # 16:9
+    ALTURA = Inches(7.5)
+
+# Layouts do modelo (nome -> índice do layout do template padrão que ele substitui)
+LAYOUTS = {"Capa": 0, "Seção": 1, "Seção Alerta": 2, "Encerramento": 5}
+
+
+# ============================================================
+# DECK-MODELO
+# ============================================================
+
+def _texto(shapes, x, y, largura, altura, paragrafos, alinhamento=None, quebra=False):
+    """Caixa de texto; `paragrafos` = [(texto, tamanho, cor, negrito), ...]"""
+    caixa = shapes.add_textbox(x, y, largura, altura)
+    tf = caixa.text_frame
+    tf.word_wrap = quebra
+    for i, (texto, tamanho, cor, negrito) in enumerate(paragrafos):
+        p = tf.paragraphs[0] if i == 0 else tf.add_paragraph()
+        p.text = texto
+        p.font.size = Pt(tamanho)
+        p.font.bold = negrito
+        p.font.color.rgb = cor
+        if alinhamento is not None:
+            p.alignment = alinhamento
+    return caixa
+
+
+def _retangulo(shapes, x, y, largura, altura, cor, forma=None, borda=None):
+    ret = shapes.add_shape(forma or MSO_SHAPE.RECTANGLE, x, y, largura, altura)
+    ret.fill.solid()
+    ret.fill.fore_color.rgb = cor
+    if borda is None:
+        ret.line.fill.background()
+    else:
+        ret.line.color.rgb = borda
+    return ret
+
+
+def _desenhar_layout(nome, shapes):
+    """Elementos fixos de cada layout"""
+    if nome in ("Capa", "Encerramento"):
+        _retangulo(shapes, 0, 0, LARGURA, ALTURA, AZUL_ESCURO)
+    if nome == "Capa":
+        _texto(shapes, Inches(0.5), Inches(4), Inches(12.333), Inches(0.8),
+               [("Colégio Elo • Sistema de Gestão de Vagas", 24, CINZA_CLARO, False)], PP_ALIGN.CENTER)
+    elif nome == "Seção":
+        _retangulo(shapes, 0, 0, LARGURA, Inches(1.2), AZUL_ESCURO)
+    elif nome == "Seção Alerta":
+        _retangulo(shapes, 0, 0, LARGURA, Inches(1.2), VERMELHO)
+    elif nome == "Encerramento":
+        _texto(shapes, Inches(0.5), Inches(2.5), Inches(12.333), Inches(1),
+               [("Obrigado!", 48, BRANCO, True)], PP_ALIGN.CENTER)
+        _texto(shapes, Inches(0.5), Inches(4), Inches(12.333), Inches(0.5),
+               [("Relatório gerado pelo SIGA Vagas Dashboard", 18, CINZA_CLARO, False)], PP_ALIGN.CENTER)
+
+
+def _remover_slide(prs, indice):
+    sld_ids = prs.slides._sldIdLst
+    sld_id = sld_ids[indice]
+    prs.part.drop_rel(sld_id.rId)
+    sld_ids.remove(sld_id)
+
+
+def construir_modelo():
+    """Deck-modelo em bytes: template padrão em 16:9 com os LAYOUTS estilizados"""
+    prs = Presentation()
+    prs.slide_width = LARGURA
+    prs.slide_height = ALTURA
+    rascunho = prs.slides.add_slide(prs.slide_layouts[6])
+
+    for nome, indice in LAYOUTS.items():
+        layout = prs.slide_layouts[indice]
+        layout._element.cSld.name = nome
+        arvore = layout.shapes._spTree
+        for placeholder in list(layout.placeholders):
+            arvore.remove(placeholder._element)
+        # Desenha no slide de rascunho e move as formas para o layout
+        _desenhar_layout(nome, rascunho.shapes)
+        for forma in list(rascunho.shapes):
+            arvore.append(copy.deepcopy(forma._element))
+            rascunho.shapes._spTree.remove(forma._element)
+
+    _remover_slide(prs, 0)
+    output = BytesIO()
+    prs.save(output)
+    return output.getvalue()
+
+
+@functools.lru_cache(maxsize=1)
+def bytes_modelo():
+    """Deck-modelo do processo: modelos/apresentacao.pptx, ou montado em memória se não existir"""
+    if MODELO_PPTX.exists():
+        return MODELO_PPTX.read_bytes()
+    return construir_modelo()
+
+
+# ============================================================
+# CONTEÚDO
+# ============================================================
+
+def _cores_ocupacao(ocup):
+    """Verde (>= 80), laranja (>= 50) ou vermelho, por posição"""
+    paleta = (VERMELHO, LARANJA, VERDE)
+    return [paleta[i] for i in np.digitize(ocup, [50, 80])]
+
+
+def _slide(prs, layout, titulo=None):
+    slide = prs.slides.add_slide(prs.slide_layouts.get_by_name(layout))
+    if titulo:
+        _texto(slide.shapes, Inches(0.5), Inches(0.3), Inches(12), Inches(0.7), [(titulo, 32, BRANCO, True)])
+    return slide
+
+
+def _tabela(slide, x, y, largura, altura_linha, cabecalho, linhas, cor_cabecalho, tamanho, alinhamento, cor_coluna=None):
+    """Tabela com cabeçalho; `alinhamento` e `cor_coluna` ({coluna: [cor ou None por linha]}) valem por coluna"""
+    tabela = slide.shapes.add_table(len(linhas) + 1, len(cabecalho), x, y, largura, altura_linha * (len(linhas) + 1)).table
+    for j, texto in enumerate(cabecalho):
+        cell = tabela.cell(0, j)
+        cell.text = texto
+        cell.fill.solid()
+        cell.fill.fore_color.rgb = cor_cabecalho
+        p = cell.text_frame.paragraphs[0]
+        p.font.size = Pt(tamanho + 2)
+        p.font.bold = True
+        p.font.color.rgb = BRANCO
+        p.alignment = PP_ALIGN.CENTER
+    cor_coluna = cor_coluna or {}
+    for i, linha in enumerate(linhas, 1):
+        for j, texto in enumerate(linha):
+            cell = tabela.cell(i, j)
+            cell.text = texto
+            p = cell.text_frame.paragraphs[0]
+            p.font.size = Pt(tamanho)
+            p.alignment = alinhamento[j]
+            if j in cor_coluna and cor_coluna[j][i - 1] is not None:
+                p.font.bold = True
+                p.font.color.rgb = cor_coluna[j][i - 1]
+    return tabela
+
+
+def _grafico_ocupacao(slide, tipo, categorias, ocupacoes):
+    """Barras de ocupação % (0-100) com rótulos e cores por faixa"""
+    dados = CategoryChartData()
+    dados.categories = categorias
+    dados.add_series('Ocupação %', ocupacoes)
+    chart = slide.shapes.add_chart(tipo, Inches(0.8), Inches(1.6), Inches(11.5), Inches(5.2), dados).chart
+    chart.has_legend = False
+
+    eixo = chart.value_axis
+    eixo.maximum_scale = 100
+    eixo.minimum_scale = 0
+    eixo.major_unit = 20
+    eixo.has_major_gridlines = True
+    eixo.major_gridlines.format.line.color.rgb = BORDA
+
+    plot = chart.plots[0]
+    plot.has_data_labels = True
+    rotulos = plot.data_labels
+    rotulos.show_value = True
+    rotulos.font.size = Pt(14)
+    rotulos.font.bold = True
+    rotulos.number_format = '0"%"'
+    rotulos.position = XL_LABEL_POSITION.OUTSIDE_END
+
+    for ponto, cor in zip(chart.series[0].points, _cores_ocupacao(ocupacoes)):
+        ponto.format.fill.solid()
+        ponto.format.fill.fore_color.rgb = cor
+    return chart
+
+
+def _milhar(valor):
+    return f"{int(valor):,}".replace(",", ".")
+
+
+def montar_apresentacao(resumo, vagas, tipo_relatorio, titulo=None):
+    """Presentation do relatório `tipo_relatorio` sobre o deck-modelo"""
+    prs = Presentation(BytesIO(bytes_modelo()))
+    total = resumo['total_geral']
+    # Data da extração: o arquivo fica em cache por versão do snapshot (como relatorios._datas_relatorio)
+    extracao = datetime.fromisoformat(str(resumo['data_extracao'])[:19])
+    ocupacao_geral = round(total['matriculados'] / total['vagas'] * 100, 1)
+
+    unidades = tabelas.colunas_unidades(resumo)
+    ocup_unidades = tabelas.percentual(unidades['Matriculados'], unidades['Vagas'])
+    segmentos = tabelas.colunas_segmentos(resumo)
+    ocup_segmentos = tabelas.percentual(segmentos['Matriculados'], segmentos['Vagas'])
+
+    # ========== CAPA ==========
+    slide = _slide(prs, "Capa")
+    _texto(slide.shapes, Inches(0.5), Inches(2.5), Inches(12.333), Inches(1.5),
+           [(titulo or f"📊 {tipo_relatorio}", 44, BRANCO, True)], PP_ALIGN.CENTER)
+    _texto(slide.shapes, Inches(0.5), Inches(5), Inches(12.333), Inches(0.5),
+           [(extracao.strftime('%d/%m/%Y às %H:%M'), 18, CINZA_CLARO, False)], PP_ALIGN.CENTER)
+
+    # ========== KPIs ==========
+    slide = _slide(prs, "Seção", "📈 Indicadores Principais")
+    kpis = [
+        ("Ocupação", f"{ocupacao_geral}%", VERDE if ocupacao_geral >= 70 else VERMELHO),
+        ("Matriculados", _milhar(total['matriculados']), AZUL_CLARO),
+        ("Vagas Totais", _milhar(total['vagas']), AZUL_CLARO),
+        ("Disponíveis", _milhar(total['disponiveis']), LARANJA),
+    ]
+    largura, y = Inches(2.8), Inches(2)
+    for i, (rotulo, valor, cor) in enumerate(kpis):
+        x = Inches(0.8) + i * (largura + Inches(0.4))
+        _retangulo(slide.shapes, x, y, largura, Inches(2), RGBColor(241, 245, 249), MSO_SHAPE.ROUNDED_RECTANGLE, BORDA)
+        _texto(slide.shapes, x, y + Inches(0.3), largura, Inches(1), [(valor, 36, cor, True)], PP_ALIGN.CENTER)
+        _texto(slide.shapes, x, y + Inches(1.3), largura, Inches(0.5), [(rotulo.upper(), 12, CINZA, False)], PP_ALIGN.CENTER)
+
+    # ========== POR UNIDADE ==========
+    slide = _slide(prs, "Seção", "🏫 Desempenho por Unidade")
+    linhas = [
+        [nome, str(vagas_u), str(matr), str(disp), f"{ocup}%"]
+        for nome, vagas_u, matr, disp, ocup in zip(
+            unidades['Unidade_curta'], unidades['Vagas'], unidades['Matriculados'],
+            unidades['Disponiveis'], ocup_unidades.tolist(),
+        )
+    ]
+    linhas.append(['TOTAL', str(total['vagas']), str(total['matriculados']), str(total['disponiveis']), f"{ocupacao_geral}%"])
+    alinhamento = [PP_ALIGN.LEFT] + [PP_ALIGN.CENTER] * 4
+    tabela = _tabela(
+        slide, Inches(1.1), Inches(1.8), Inches(11), Inches(0.5),
+        ['Unidade', 'Vagas', 'Matriculados', 'Disponíveis', 'Ocupação'], linhas, AZUL_ESCURO, 12, alinhamento,
+        cor_coluna={4: _cores_ocupacao(ocup_unidades) + [None]},
+    )
+    for j in range(5):  # Linha total
+        cell = tabela.cell(len(linhas), j)
+        cell.fill.solid()
+        cell.fill.fore_color.rgb = RGBColor(241, 245, 249)
+        cell.text_frame.paragraphs[0].font.bold = True
+
+    # ========== POR SEGMENTO ==========
+    slide = _slide(prs, "Seção", "📚 Desempenho por Segmento")
+    largura = Inches(2.8)
+    cores = _cores_ocupacao(ocup_segmentos)
+    for i, (seg, vagas_s, matr, ocup) in enumerate(zip(
+        segmentos['Segmento'], segmentos['Vagas'].tolist(), segmentos['Matriculados'].tolist(), ocup_segmentos.tolist()
+    )):
+        x = Inches(0.8) + i * (largura + Inches(0.4))
+        _retangulo(slide.shapes, x, Inches(2), largura, Inches(3.5), RGBColor(248, 250, 252), MSO_SHAPE.ROUNDED_RECTANGLE, BORDA)
+        _texto(slide.shapes, x, Inches(2.2), largura, Inches(0.5), [(seg, 16, AZUL_ESCURO, True)], PP_ALIGN.CENTER)
+        _texto(slide.shapes, x, Inches(2.8), largura, Inches(0.8), [(f"{ocup}%", 36, cores[i], True)], PP_ALIGN.CENTER)
+        _texto(slide.shapes, x + Inches(0.2), Inches(3.8), largura - Inches(0.4), Inches(1.5), [
+            (f"Vagas: {vagas_s}", 12, CINZA, False),
+            (f"Matriculados: {matr}", 12, CINZA, False),
+            (f"Disponíveis: {vagas_s - matr}", 12, CINZA, False),
+        ], quebra=True)
+
+    # ========== TURMAS CRÍTICAS (se aplicável) ==========
+    if tipo_relatorio in ['Turmas Críticas', 'Detalhado por Unidade']:
+        slide = _slide(prs, "Seção Alerta", "🚨 Turmas que Requerem Atenção")
+        turmas = tabelas.colunas_turmas(vagas)
+        ocup = tabelas.percentual(turmas['Matriculados'], turmas['Vagas'])
+        ordem = np.argsort(ocup, kind='stable')
+        top = ordem[ocup[ordem] < 70][:10]
+        if len(top):
+            linhas = [
+                [turmas['Unidade_curta'][i], turmas['Turma'][i][:35], turmas['Segmento'][i], f"{ocup[i]}%"]
+                for i in top.tolist()
+            ]
+            _tabela(
+                slide, Inches(0.8), Inches(1.8), Inches(11.5), Inches(0.45),
+                ['Unidade', 'Turma', 'Segmento', 'Ocupação'], linhas, VERMELHO, 11,
+                [PP_ALIGN.LEFT, PP_ALIGN.LEFT, PP_ALIGN.CENTER, PP_ALIGN.CENTER],
+                cor_coluna={3: [VERMELHO] * len(linhas)},
+            )
+
+    # ========== GRÁFICO DE PIZZA - OCUPAÇÃO ==========
+    slide = _slide(prs, "Seção", "📊 Distribuição de Vagas")
+    dados = CategoryChartData()
+    dados.categories = ['Matriculados', 'Disponíveis']
+    dados.add_series('Vagas', (total['matriculados'], total['disponiveis']))
+    chart = slide.shapes.add_chart(XL_CHART_TYPE.PIE, Inches(0.8), Inches(1.8), Inches(5.5), Inches(5), dados).chart
+    chart.has_legend = True
+    chart.legend.position = XL_LEGEND_POSITION.BOTTOM
+    chart.legend.include_in_layout = False
+    for ponto, cor in zip(chart.series[0].points, (VERDE, LARANJA)):
+        ponto.format.fill.solid()
+        ponto.format.fill.fore_color.rgb = cor
+    plot = chart.plots[0]
+    plot.has_data_labels = True
+    plot.data_labels.show_percentage = True
+    plot.data_labels.show_value = False
+    plot.data_labels.show_category_name = False
+    plot.data_labels.font.size = Pt(14)
+    plot.data_labels.font.bold = True
+
+    _texto(slide.shapes, Inches(7), Inches(2.5), Inches(5), Inches(3), [
+        (f"{ocupacao_geral}%", 72, VERDE if ocupacao_geral >= 70 else VERMELHO, True),
+        ("Taxa de Ocupação", 18, CINZA, False),
+        (f"\n{_milhar(total['matriculados'])} matriculados", 16, CINZA, False),
+        (f"{_milhar(total['disponiveis'])} disponíveis", 16, CINZA, False),
+    ], PP_ALIGN.CENTER, quebra=True)
+
+    # ========== GRÁFICO DE BARRAS - POR UNIDADE ==========
+    slide = _slide(prs, "Seção", "📊 Ocupação por Unidade")
+    _grafico_ocupacao(slide, XL_CHART_TYPE.COLUMN_CLUSTERED, unidades['Unidade_curta'], ocup_unidades.tolist())
+    _texto(slide.shapes, Inches(10.5), Inches(1.4), Inches(2), Inches(0.3), [("Meta: 80%", 12, CINZA, False)])
+
+    # ========== GRÁFICO DE BARRAS - POR SEGMENTO ==========
+    slide = _slide(prs, "Seção", "📊 Ocupação por Segmento")
+    _grafico_ocupacao(slide, XL_CHART_TYPE.BAR_CLUSTERED, segmentos['Segmento'], ocup_segmentos.tolist())
+
+    # ========== ENCERRAMENTO ==========
+    slide = _slide(prs, "Encerramento")
+    _texto(slide.shapes, Inches(0.5), Inches(4.5), Inches(12.333), Inches(0.5),
+           [(f"Colégio Elo © {extracao.year}", 14, CINZA_CLARO, False)], PP_ALIGN.CENTER)
+    return prs
+
+
+def gerar_powerpoint(resumo, vagas, tipo_relatorio, titulo=None):
+    """Gera relatório em formato PowerPoint (bytes; None sem python-pptx)"""
+    if not PPTX_AVAILABLE:
+        return None
+    output = BytesIO()
+    montar_apresentacao(resumo, vagas, tipo_relatorio, titulo).save(output)
+    return output.getvalue()
+
+
+# ============================================================
+# UM DECK POR UNIDADE
+# ============================================================
+
+def filtrar_unidade(dados, codigo):
+    """resumo/vagas só com a unidade `codigo` (total_geral passa a ser o da unidade)"""
+    unidade = next(u for u in dados['unidades'] if u['codigo'] == codigo)
+    filtrado = dict(dados, unidades=[unidade])
+    if 'total' in unidade:
+        filtrado['total_geral'] = unidade['total']
+    return filtrado
+
+
+def _deck_unidade(resumo, vagas, tipo_relatorio, codigo):
+    resumo_u = filtrar_unidade(resumo, codigo)
+    nome = resumo_u['unidades'][0]['unidade_curta']
+    return nome, gerar_powerpoint(resumo_u, filtrar_unidade(vagas, codigo), tipo_relatorio, f"📊 {tipo_relatorio} • {nome}")
+
+
+def gerar_powerpoint_por_unidade(resumo, vagas, tipo_relatorio, max_workers=None):
+    """{unidade_curta: bytes} com um deck por unidade, gerados em paralelo (um processo por deck)"""
+    codigos = [u['codigo'] for u in resumo['unidades']]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        jobs = [executor.submit(_deck_unidade, resumo, vagas, tipo_relatorio, codigo) for codigo in codigos]
+        return dict(job.result() for job in jobs)
+
+
+def main():
+    if not PPTX_AVAILABLE:
+        sys.exit("python-pptx não instalado")
+    if "--modelo" in sys.argv:
+        MODELO_PPTX.write_bytes(construir_modelo())
+        print(f"Modelo gravado em {MODELO_PPTX}")
+        return
+    if "--por-unidade" in sys.argv:
+        import json
+
+        import artefatos
+        from classificacao import classificar_dados
+        from relatorios import TIPOS_RELATORIO, slug_relatorio
+
+        resto = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+        tipo_relatorio = resto[0] if resto else TIPOS_RELATORIO[0]
+        output_dir = Path(__file__).parent / "output"
+        with open(output_dir / "resumo_ultimo.json", encoding="utf-8") as f:
+            resumo = classificar_dados(json.load(f))
+        with open(output_dir / "vagas_ultimo.json", encoding="utf-8") as f:
+            vagas = classificar_dados(json.load(f))
+
+        versao = artefatos.versao_snapshot(resumo)
+        for nome, conteudo in gerar_powerpoint_por_unidade(resumo, vagas, tipo_relatorio).items():
+            caminho = artefatos.caminho_artefato(
+                f"relatorio_{slug_relatorio(tipo_relatorio)}_{slug_relatorio(nome)}.pptx", versao
+            )
+            artefatos.salvar_artefato(caminho, conteudo)
+            print(f"  {caminho}")
+        return
+    print(__doc__)
+
+
+if __name__ == "__main__":
+    main()
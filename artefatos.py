@@ -0,0 +1,81 @@
+"""
+Cache em disco dos arquivos de exportação (Excel, HTML, CSV).
+
+Cada artefato é gerado uma vez por (tipo, versão do snapshot) e gravado em
+output/artefatos/<versao>/<tipo>. Só as versões mais recentes são mantidas, então
+o diretório não cresce com as extrações. Artefatos que embutem vagas.db inteiro
+(o Excel do histórico) usam `versao_historico`, que muda também quando o banco
+recebe extrações sem trocar o snapshot (importar_arquivos).
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import conexoes
+
+DB_PATH = Path(__file__).parent / "output" / "vagas.db"
+DIR_ARTEFATOS = Path(__file__).parent / "output" / "artefatos"
+MAX_VERSOES = 3
+
+
+def versao_snapshot(dados):
+    """Versão do snapshot a partir de `data_extracao` ('2026-01-15T06:00:12' -> '2026-01-15T06-00-12')"""
+    return str(dados["data_extracao"])[:19].replace(":", "-")
+
+
+def versao_historico(dados, db_path=DB_PATH):
+    """Versão do snapshot + última extração gravada no banco ('<versao>/banco-57').
+
+    Fica num subdiretório da versão do snapshot, então sai junto com ela em podar_versoes.
+    """
+    ultima = 0
+    if Path(db_path).exists():
+        with conexoes.leitura(db_path) as conn:
+            ultima = conn.execute("SELECT MAX(id) FROM 'extrações'").fetchone()[0] or 0
+    return f"{versao_snapshot(dados)}/banco-{ultima}"
+
+
+def caminho_artefato(tipo, versao):
+    return DIR_ARTEFATOS / versao / tipo
+
+
+def obter_artefato(tipo, versao, gerar):
+    """Bytes do artefato `tipo` da versão; chama `gerar()` só se ainda não estiver em disco.
+
+    `gerar` pode devolver str (gravado em UTF-8) ou bytes.
+    """
+    caminho = caminho_artefato(tipo, versao)
+    if caminho.exists():
+        return caminho.read_bytes()
+
+    conteudo = gerar()
+    if isinstance(conteudo, str):
+        conteudo = conteudo.encode("utf-8")
+    salvar_artefato(caminho, conteudo)
+    podar_versoes()
+    return conteudo
+
+
+def salvar_artefato(caminho, conteudo):
+    """Grava de forma atômica (arquivo temporário + rename) para leitores concorrentes"""
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=caminho.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(conteudo)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, caminho)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def podar_versoes(max_versoes=MAX_VERSOES):
+    """Remove as versões mais antigas além de `max_versoes`"""
+    if not DIR_ARTEFATOS.exists():
+        return
+    versoes = sorted(p for p in DIR_ARTEFATOS.iterdir() if p.is_dir())
+    for antiga in versoes[:-max_versoes]:
+        shutil.rmtree(antiga, ignore_errors=True)
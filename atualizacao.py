@@ -0,0 +1,245 @@
+"""
+Atualização dos dados (extração do SIGA) em segundo plano.
+
+O botão "Atualizar" dos dashboards inicia o extrator como subprocesso e volta
+na hora: a sessão continua navegável enquanto ele roda. O extrator grava os
+eventos de progresso (etapa, unidade, turmas lidas) em
+output/extracao_progresso.jsonl, um JSON por linha, gravado na hora; o
+dashboard lê o arquivo a cada poucos segundos. Quando aparece o evento
+"gravado" (snapshot e vagas.db escritos) o dashboard já troca para os dados
+novos, sem esperar a pré-renderização dos relatórios. Cliques enquanto a
+extração roda só acompanham o mesmo subprocesso.
+
+Entre processos (dashboards, cron, execução manual) a extração é única: quem
+chama extrair_vagas.main pega a trava output/extracao.lock (flock, liberada
+pelo sistema se o processo morrer). Um pedido que chega com outra extração em
+andamento espera por ela e recebe o resultado dela; um pedido que chega até
+FRESCOR depois de uma extração concluída recebe os dados dessa extração. Só
+quem não encontra dados assim extrai de novo.
+"""
+
+import fcntl
+import json
+import os
+import signal
+import subprocess
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+OUTPUT_DIR = Path(__file__).parent / "output"
+ARQUIVO_PROGRESSO = OUTPUT_DIR / "extracao_progresso.jsonl"
+ARQUIVO_LOG = OUTPUT_DIR / "extracao.log"
+ARQUIVO_TRAVA = OUTPUT_DIR / "extracao.lock"
+ARQUIVO_SNAPSHOT = OUTPUT_DIR / "vagas_ultimo.json"
+
+# Pedidos até esse tempo depois de uma extração concluída usam os dados dela
+FRESCOR = timedelta(minutes=10)
+
+# Extração mais longa que isso é interrompida
+TIMEOUT_SEGUNDOS = 600
+# Espera entre o SIGTERM e o SIGKILL ao interromper
+ESPERA_TERMINO = 5
+
+RODANDO = "rodando"
+CONCLUIDA = "concluida"
+FALHOU = "falhou"
+
+
+class Progresso:
+    """Eventos do extrator, um JSON por linha (o arquivo é recomeçado a cada extração)"""
+
+    def __init__(self, caminho=ARQUIVO_PROGRESSO, recomecar=True):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(exist_ok=True)
+        if recomecar:
+            self.caminho.write_text("", encoding="utf-8")
+
+    def __call__(self, fase, mensagem, **dados):
+        evento = {"hora": datetime.now().isoformat(timespec="seconds"), "fase": fase, "mensagem": mensagem, **dados}
+        with open(self.caminho, "a", encoding="utf-8") as f:
+            f.write(json.dumps(evento, ensure_ascii=False) + "\n")
+
+
+class TravaExtracao:
+    """`with TravaExtracao() as trava:` trava exclusiva da extração entre processos.
+
+    Espera se outro processo está extraindo (`trava.esperou` fica True). Dentro
+    do bloco o arquivo guarda o pid e o início de quem está com a trava.
+    """
+
+    def __init__(self, caminho=ARQUIVO_TRAVA):
+        self.caminho = Path(caminho)
+        self.esperou = False
+        self._arquivo = None
+
+    def __enter__(self):
+        self.caminho.parent.mkdir(exist_ok=True)
+        self._arquivo = open(self.caminho, "a+", encoding="utf-8")
+        try:
+            fcntl.flock(self._arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self.esperou = True
+            fcntl.flock(self._arquivo, fcntl.LOCK_EX)
+        self._arquivo.seek(0)
+        self._arquivo.truncate()
+        self._arquivo.write(json.dumps({"pid": os.getpid(), "inicio": datetime.now().isoformat(timespec="seconds")}))
+        self._arquivo.flush()
+        return self
+
+    def __exit__(self, *exc):
+        self._arquivo.seek(0)
+        self._arquivo.truncate()
+        fcntl.flock(self._arquivo, fcntl.LOCK_UN)
+        self._arquivo.close()
+        return False
+
+
+def extracao_em_andamento(caminho=ARQUIVO_TRAVA):
+    """{pid, inicio} da extração com a trava, ou None se nenhuma está rodando"""
+    caminho = Path(caminho)
+    if not caminho.exists():
+        return None
+    with open(caminho, "a+", encoding="utf-8") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            f.seek(0)
+            try:
+                return json.loads(f.read() or "{}")
+            except json.JSONDecodeError:
+                return {}
+        fcntl.flock(f, fcntl.LOCK_UN)
+    return None
+
+
+def dados_recentes(inicio_pedido, frescor=FRESCOR, caminho=ARQUIVO_SNAPSHOT):
+    """Snapshot gravado depois de `inicio_pedido - frescor`, ou None (aí é preciso extrair).
+
+    Vale a hora em que o arquivo foi gravado (fim da extração), não a
+    data_extracao, que é o início dela.
+    """
+    caminho = Path(caminho)
+    if not caminho.exists() or caminho.stat().st_mtime < (inicio_pedido - frescor).timestamp():
+        return None
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def ler_progresso(caminho=ARQUIVO_PROGRESSO):
+    """Eventos gravados até agora (uma linha ainda incompleta é ignorada)"""
+    try:
+        linhas = Path(caminho).read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        return []
+    eventos = []
+    for linha in linhas:
+        try:
+            eventos.append(json.loads(linha))
+        except json.JSONDecodeError:
+            break
+    return eventos
+
+
+class AtualizacaoDados:
+    """Subprocesso de extração do servidor e o estado dele"""
+
+    def __init__(self, arquivo_progresso=ARQUIVO_PROGRESSO, arquivo_log=ARQUIVO_LOG, timeout=TIMEOUT_SEGUNDOS,
+                 arquivo_trava=ARQUIVO_TRAVA):
+        self.arquivo_progresso = Path(arquivo_progresso)
+        self.arquivo_log = Path(arquivo_log)
+        self.arquivo_trava = Path(arquivo_trava)
+        self.timeout = timeout
+        self._processo = None
+        self._inicio = None
+        self._id = 0
+        self._interrompida = False
+        self._lock = threading.Lock()
+
+    def iniciar(self, comando, cwd):
+        """Inicia a extração; False se já há uma rodando (o chamador só acompanha)"""
+        with self._lock:
+            if self._processo is not None and self._processo.poll() is None:
+                return False
+            # Eventos da extração anterior não valem para esta; se outro processo (cron) está
+            # extraindo, o subprocesso vai esperar por ele e os eventos são os dele
+            if extracao_em_andamento(self.arquivo_trava) is None:
+                self.arquivo_progresso.parent.mkdir(exist_ok=True)
+                self.arquivo_progresso.write_text("", encoding="utf-8")
+            with open(self.arquivo_log, "w", encoding="utf-8") as log:
+                self._processo = subprocess.Popen(
+                    [str(parte) for parte in comando], cwd=str(cwd), stdout=log, stderr=subprocess.STDOUT,
+                    env={**os.environ, "PYTHONUNBUFFERED": "1"}, start_new_session=True,
+                )
+            self._inicio = time.monotonic()
+            self._id += 1
+            self._interrompida = False
+            # O timeout vale mesmo sem nenhuma sessão consultando o status
+            threading.Thread(target=self._vigiar, args=(self._processo,), daemon=True).start()
+            return True
+
+    def status(self):
+        """{id, estado, eventos, gravado, reaproveitado, segundos, codigo, log}; None se nenhuma extração foi iniciada aqui"""
+        with self._lock:
+            if self._processo is None:
+                return None
+            codigo = self._processo.poll()
+            segundos = time.monotonic() - self._inicio
+            id_job, interrompida = self._id, self._interrompida
+
+        eventos = ler_progresso(self.arquivo_progresso)
+        if codigo is None:
+            estado = RODANDO
+        else:
+            estado = CONCLUIDA if codigo == 0 and not interrompida else FALHOU
+        return {
+            "id": id_job,
+            "estado": estado,
+            "eventos": eventos,
+            "gravado": any(evento["fase"] == "gravado" for evento in eventos),
+            # Mensagem quando o extrator não extraiu e devolveu os dados de outra extração
+            "reaproveitado": next((evento["mensagem"] for evento in eventos if evento["fase"] == "reaproveitado"), None),
+            "segundos": int(segundos),
+            "codigo": codigo,
+            "log": self._fim_log() if estado == FALHOU else "",
+            "interrompida": interrompida,
+        }
+
+    def _vigiar(self, processo):
+        """Thread de cada extração: espera o subprocesso e o interrompe se passar do timeout"""
+        try:
+            processo.wait(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            with self._lock:
+                if processo is self._processo:
+                    self._interrompida = True
+            # Fora do self._lock: a espera pelo término não trava o status() das outras sessões
+            self._interromper(processo)
+
+    @staticmethod
+    def _interromper(processo):
+        """Encerra o grupo inteiro do subprocesso e devolve o código de saída.
+
+        O subprocesso roda numa sessão própria (start_new_session) e o extrator é
+        filho dele (cron_extrator.sh -> python): matar só o processo direto
+        deixaria o extrator rodando, com a trava da extração.
+        """
+        grupo = processo.pid
+        try:
+            os.killpg(grupo, signal.SIGTERM)
+            try:
+                processo.wait(timeout=ESPERA_TERMINO)
+            except subprocess.TimeoutExpired:
+                pass
+            # O que ainda estiver no grupo (mesmo com o processo direto já encerrado)
+            os.killpg(grupo, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        return processo.wait()
+
+    def _fim_log(self, linhas=40):
+        try:
+            return "\n".join(self.arquivo_log.read_text(encoding="utf-8", errors="replace").splitlines()[-linhas:])
+        except FileNotFoundError:
+            return ""
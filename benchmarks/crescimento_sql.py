@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Taxa de crescimento: contas em pandas sobre o histórico inteiro × janelas no SQLite.
+
+Bancos temporários com N extrações do período (3 por dia, as turmas da última
+extração de output/vagas.db com matriculados crescentes). "pandas" é a conta
+antiga do dashboard: carrega a soma de cada extração e compara primeira e
+última linha. "sql" é crescimento.crescimento_diario: rollup diário e funções
+de janela no banco, só a série diária volta. Antes de medir, confere a série
+do SQL contra a mesma conta feita em pandas.
+
+Uso: python benchmarks/crescimento_sql.py
+"""
+
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import crescimento  # noqa: E402
+import periodos  # noqa: E402
+
+EXTRACOES = (30, 300, 3000)
+POR_DIA = 3
+PERIODO = "2026"
+REPETICOES = 5
+
+QUERY_TOTAL = """
+SELECT e.data_extracao, SUM(v.vagas) as vagas, SUM(v.matriculados) as matriculados,
+       SUM(v.novatos) as novatos, SUM(v.veteranos) as veteranos, SUM(v.disponiveis) as disponiveis
+FROM vagas v JOIN 'extrações' e ON v.extracao_id = e.id
+WHERE e.periodo = ?
+GROUP BY e.id ORDER BY e.data_extracao
+"""
+
+
+def melhor_tempo(funcao):
+    tempos = []
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def montar_banco(destino, extracoes):
+    """Cópia de vagas.db com `extracoes` extrações de PERIODO, POR_DIA por dia (com dias pulados)"""
+    shutil.copy(periodos.DB_PATH, destino)
+    periodos.garantir_esquema(destino)
+    conn = sqlite3.connect(destino)
+    modelo = conn.execute("SELECT MAX(id) FROM 'extrações'").fetchone()[0]
+    conn.execute("CREATE TEMP TABLE modelo AS SELECT * FROM vagas WHERE extracao_id = ?", (modelo,))
+    conn.execute("DELETE FROM vagas")
+    conn.execute("DELETE FROM 'extrações'")
+    rng = np.random.default_rng(0)
+    # Um dia em cada cinco fica sem extração
+    dias = np.flatnonzero(rng.random(extracoes) > 0.2)[:extracoes // POR_DIA + 1]
+    for i in range(extracoes):
+        dia = np.datetime64("2025-10-01") + np.timedelta64(int(dias[i // POR_DIA]), "D")
+        data = f"{dia}T{9 + 4 * (i % POR_DIA):02d}:00:00"
+        cursor = conn.execute(
+            "INSERT INTO 'extrações' (data_extracao, periodo, dia_campanha) VALUES (?, ?, ?)",
+            (data, PERIODO, periodos.dia_campanha(PERIODO, data)),
+        )
+        conn.execute(
+            "INSERT INTO vagas (extracao_id, unidade_codigo, segmento, turma_id, vagas, matriculados) "
+            "SELECT ?, unidade_codigo, segmento, turma_id, vagas, matriculados * ? / ? FROM modelo",
+            (cursor.lastrowid, i + 1, extracoes),
+        )
+    conn.commit()
+    conn.close()
+
+
+def antiga(db_path):
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query(QUERY_TOTAL, conn, params=(PERIODO,))
+    conn.close()
+    df['data_extracao'] = pd.to_datetime(df['data_extracao'])
+    primeiro, ultimo = df.iloc[0], df.iloc[-1]
+    crescimento_matr = ultimo['matriculados'] - primeiro['matriculados']
+    dias = (ultimo['data_extracao'] - primeiro['data_extracao']).days
+    return crescimento_matr, crescimento_matr / dias if dias > 0 else 0
+
+
+def referencia(db_path):
+    """Mesma série do SQL montada em pandas a partir de todas as extrações"""
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query(QUERY_TOTAL, conn, params=(PERIODO,))
+    conn.close()
+    df['dia'] = pd.to_datetime(df['data_extracao']).dt.normalize()
+    diario = df.groupby('dia').last()[['vagas', 'matriculados']].reset_index()
+    m, n = diario['matriculados'], (diario['dia'] - diario['dia'].iloc[0]).dt.days
+    diario['variacao'] = m.diff()
+    diario['media_diaria'] = ((m - m.iloc[0]) / n.replace(0, np.nan)).round(1)
+    for janela in (7, 30):
+        base = [np.flatnonzero(n.to_numpy() >= d - janela)[0] for d in n]
+        diario[f'ritmo_{janela}d'] = ((m - m.iloc[base].to_numpy()) / (n - n.iloc[base].to_numpy()).replace(0, np.nan)).round(1)
+    return diario
+
+
+def main():
+    print("| Conta | Extrações | Linhas devolvidas | Tempo (ms) |")
+    print("|---|---|---|---|")
+    with tempfile.TemporaryDirectory() as tmp:
+        for extracoes in EXTRACOES:
+            db_path = Path(tmp) / f"vagas_{extracoes}.db"
+            montar_banco(db_path, extracoes)
+            sql = crescimento.crescimento_diario(PERIODO, db_path)
+            ref = referencia(db_path)
+            colunas = ['vagas', 'matriculados', 'variacao', 'media_diaria', 'ritmo_7d', 'ritmo_30d']
+            # Tolerância de uma casa: ROUND do SQLite e do pandas desempatam diferente
+            pd.testing.assert_frame_equal(sql[colunas], ref[colunas], check_dtype=False, atol=0.11)
+
+            segundos = melhor_tempo(lambda: antiga(db_path))
+            print(f"| pandas | {extracoes:,} | {extracoes:,} | {segundos * 1000:.1f} |")
+            segundos = melhor_tempo(lambda: crescimento.crescimento_diario(PERIODO, db_path))
+            print(f"| sql | {extracoes:,} | {len(sql):,} | {segundos * 1000:.1f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Exportação Excel do histórico completo de vagas.db: tempo, vazão e pico de memória.
+
+Monta bancos temporários com N extrações (replicando as turmas gravadas em
+output/vagas.db) e exporta snapshot + histórico com `planilhas` (XlsxWriter em
+streaming, gravando direto no arquivo) e com a montagem antiga (DataFrames
+inteiros + pd.ExcelWriter/openpyxl em BytesIO). O pico de memória é o do
+tracemalloc, medido numa execução separada da de tempo.
+
+Uso: python benchmarks/exportar_historico.py [extrações ...]
+"""
+
+import itertools
+import json
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import pandas as pd  # noqa: E402
+
+import planilhas  # noqa: E402
+from classificacao import classificar_dados  # noqa: E402
+
+ESCALAS = (10, 100, 1000)
+MAX_LEGADO = 100  # acima disso a montagem antiga leva minutos e vários GB
+
+
+def montar_banco(destino, extracoes):
+    """Cópia de vagas.db com `extracoes` extrações (as turmas da última, repetidas)"""
+    shutil.copy(planilhas.DB_PATH, destino)
+    conn = sqlite3.connect(destino)
+    ultima, data = conn.execute("SELECT id, data_extracao FROM 'extrações' ORDER BY id DESC LIMIT 1").fetchone()
+    atuais = conn.execute("SELECT COUNT(*) FROM 'extrações'").fetchone()[0]
+    colunas = [c[1] for c in conn.execute("PRAGMA table_info(vagas)") if c[1] not in ("id", "extracao_id")]
+    lista = ", ".join(colunas)
+    for i in range(extracoes - atuais):
+        cursor = conn.execute(
+            "INSERT INTO 'extrações' (data_extracao, periodo) VALUES (?, '2026')", (f"{data[:10]}T{i:08d}",)
+        )
+        conn.execute(
+            f"INSERT INTO vagas (extracao_id, {lista}) SELECT ?, {lista} FROM vagas WHERE extracao_id = ?",
+            (cursor.lastrowid, ultima),
+        )
+    conn.commit()
+    linhas = conn.execute("SELECT COUNT(*) FROM vagas").fetchone()[0]
+    conn.close()
+    return linhas
+
+
+def exportar_legado(resumo, vagas, db_path):
+    """Montagem antiga (DataFrames inteiros + openpyxl em BytesIO); devolve o tamanho do arquivo"""
+    conn = sqlite3.connect(db_path)
+    total = pd.read_sql_query(planilhas.QUERY_HISTORICO_TOTAL, conn)
+    turmas = pd.read_sql_query(planilhas.QUERY_HISTORICO_TURMAS, conn)
+    conn.close()
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        for nome, colunas, linhas in (planilhas.aba_resumo(resumo), planilhas.aba_unidades(resumo),
+                                      planilhas.aba_turmas(vagas)):
+            pd.DataFrame(list(linhas), columns=[c for c, _ in colunas]).to_excel(writer, sheet_name=nome, index=False)
+        total.to_excel(writer, sheet_name="Histórico Total", index=False)
+        turmas.to_excel(writer, sheet_name="Histórico Turmas", index=False)
+    return len(output.getvalue())
+
+
+def exportar_streaming(resumo, vagas, db_path, destino):
+    """Exportação atual, gravando direto em `destino`; devolve o tamanho do arquivo"""
+    abas = [planilhas.aba_resumo(resumo), planilhas.aba_unidades(resumo), planilhas.aba_turmas(vagas)]
+    planilhas.escrever_planilha(str(destino), itertools.chain(abas, planilhas.abas_historico(db_path)))
+    return destino.stat().st_size
+
+
+def medir(exportar):
+    inicio = time.perf_counter()
+    tamanho = exportar()
+    segundos = time.perf_counter() - inicio
+    tracemalloc.start()
+    exportar()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return segundos, pico, tamanho
+
+
+def main():
+    escalas = [int(n) for n in sys.argv[1:]] or ESCALAS
+    with open(planilhas.OUTPUT_DIR / "resumo_ultimo.json", encoding="utf-8") as f:
+        resumo = classificar_dados(json.load(f))
+    with open(planilhas.OUTPUT_DIR / "vagas_ultimo.json", encoding="utf-8") as f:
+        vagas = classificar_dados(json.load(f))
+
+    print("| Exportação | Extrações | Linhas | Tempo (s) | Linhas/s | Pico de memória (MB) | Arquivo (MB) |")
+    print("|---|---|---|---|---|---|---|")
+    with tempfile.TemporaryDirectory() as tmp:
+        for extracoes in escalas:
+            db_path, destino = Path(tmp) / f"vagas_{extracoes}.db", Path(tmp) / "historico.xlsx"
+            linhas = montar_banco(db_path, extracoes)
+            resultados = {"streaming": medir(lambda: exportar_streaming(resumo, vagas, db_path, destino))}
+            if extracoes <= MAX_LEGADO:
+                resultados["antiga"] = medir(lambda: exportar_legado(resumo, vagas, db_path))
+            for nome, (segundos, pico, tamanho) in resultados.items():
+                print(f"| {nome} | {extracoes:,} | {linhas:,} | {segundos:.2f} | {linhas / segundos:,.0f} "
+                      f"| {pico / 2**20:,.1f} | {tamanho / 2**20:,.1f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Gráficos de histórico: um ponto por extração × série reduzida (amostragem.py).
+
+Históricos sintéticos de N extrações (uma a cada 2 horas) para o total e para
+4 unidades. "antigo" monta os gráficos como antes (todas as extrações, eixo
+categórico com `data_formatada`); "reduzido" passa as séries por
+amostragem.reduzir_historico e usa eixo de datas. Mede o tempo de montar os
+dois gráficos (Evolução da Ocupação e Por Unidade) e o tamanho do JSON que vai
+para o navegador.
+
+Uso: python benchmarks/historico_graficos.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import plotly.graph_objects as go  # noqa: E402
+import plotly.io as pio  # noqa: E402
+
+import amostragem  # noqa: E402
+
+EXTRACOES = (100, 1_000, 10_000, 50_000)
+UNIDADES = ("Boa Viagem", "Candeias", "Jaboatão", "Paulista")
+REPETICOES = 3
+
+
+def melhor_tempo(funcao):
+    tempos = []
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def historico(extracoes, rng):
+    datas = pd.date_range("2025-10-01 06:00", periods=extracoes, freq="2h")
+    partes = []
+    for unidade in UNIDADES:
+        matriculados = 400 + np.cumsum(rng.poisson(0.3, extracoes))
+        partes.append(pd.DataFrame({
+            "data_extracao": datas, "unidade_nome": unidade, "vagas": 1500, "matriculados": matriculados,
+        }))
+    unidades = pd.concat(partes, ignore_index=True)
+    total = unidades.groupby("data_extracao", as_index=False)[["vagas", "matriculados"]].sum()
+    return total, unidades
+
+
+def antigo(total, unidades):
+    total = total.assign(data_formatada=total["data_extracao"].dt.strftime("%d/%m %H:%M"))
+    unidades = unidades.assign(data_formatada=unidades["data_extracao"].dt.strftime("%d/%m %H:%M"))
+    fig_ocup = go.Figure(go.Scatter(
+        x=total["data_formatada"], y=round(total["matriculados"] / total["vagas"] * 100, 1), mode="lines+markers",
+    ))
+    fig_unid = go.Figure()
+    for unidade in unidades["unidade_nome"].unique():
+        df_u = unidades[unidades["unidade_nome"] == unidade]
+        fig_unid.add_trace(go.Scatter(x=df_u["data_formatada"], y=df_u["matriculados"], mode="lines+markers"))
+    return pio.to_json(fig_ocup) + pio.to_json(fig_unid)
+
+
+def reduzido(total, unidades):
+    df_ocup = amostragem.reduzir_historico(
+        total.assign(ocupacao=round(total["matriculados"] / total["vagas"] * 100, 1)), "ocupacao"
+    )
+    fig_ocup = go.Figure(go.Scatter(
+        x=df_ocup["data_extracao"], y=df_ocup["ocupacao"], mode=amostragem.modo_linha(len(df_ocup)),
+    ))
+    fig_unid = go.Figure()
+    series = amostragem.reduzir_historico(unidades, "matriculados", por="unidade_nome")
+    for _, df_u in series.groupby("unidade_nome", sort=False):
+        fig_unid.add_trace(go.Scatter(x=df_u["data_extracao"], y=df_u["matriculados"], mode=amostragem.modo_linha(len(df_u))))
+    return pio.to_json(fig_ocup) + pio.to_json(fig_unid)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print("| Gráficos | Extrações | Tempo (ms) | JSON (KB) |")
+    print("|---|---|---|---|")
+    for extracoes in EXTRACOES:
+        total, unidades = historico(extracoes, rng)
+        for nome, funcao in (("antigo", antigo), ("reduzido", reduzido)):
+            segundos, conteudo = melhor_tempo(lambda: funcao(total, unidades))
+            print(f"| {nome} | {extracoes:,} | {segundos * 1000:.1f} | {len(conteudo) / 1024:,.1f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tempo até o primeiro elemento do dashboard num processo novo.
+
+Copia o app (os .py da raiz e modelos/) de uma revisão do git para um diretório
+temporário e, em REPETICOES processos novos por script, importa o streamlit (o
+servidor já o tem carregado) e roda o script até o st.set_page_config, o
+primeiro elemento enviado ao navegador. Esse trecho é quase todo importação:
+é o que a primeira sessão depois de o servidor subir (ou acordar) espera
+antes de ver qualquer coisa. O `-X importtime` da mesma execução dá os módulos
+de primeiro nível que mais pesam.
+
+A segunda tabela, na árvore de trabalho, é o custo que saiu da abertura e
+passou para o primeiro download de cada tipo (uma vez por processo).
+
+Uso: python benchmarks/importacao.py [revisão ...]
+     (`.` ou nenhuma revisão: a árvore de trabalho; ex.: `HEAD~1 .` para comparar)
+"""
+
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+SCRIPTS = ("dashboard_cloud.py", "dashboard.py")
+REPETICOES = 5
+MAIS_PESADOS = 3
+# Módulo importado no primeiro download: o que o download gera
+ADIADOS = {
+    "planilhas": "Excel (xlsxwriter)",
+    "apresentacao": "PowerPoint (python-pptx)",
+    "modelos_html": "Relatório HTML do dashboard.py (jinja2 + templates)",
+}
+
+# Roda no processo filho (cwd = diretório do app)
+ATE_PRIMEIRO_ELEMENTO = """
+import json, runpy, sys, time
+import streamlit as st
+
+class PrimeiroElemento(Exception):
+    pass
+
+def set_page_config(*args, **kwargs):
+    raise PrimeiroElemento
+
+st.set_page_config = set_page_config
+sys.path.insert(0, ".")
+inicio = time.perf_counter()
+try:
+    runpy.run_path(sys.argv[1], run_name="__main__")
+except PrimeiroElemento:
+    print(json.dumps({"ms": (time.perf_counter() - inicio) * 1000}))
+"""
+
+PRIMEIRO_USO = """
+import importlib, json, sys, time
+import streamlit, pandas, classificacao, tabelas
+
+inicio = time.perf_counter()
+importlib.import_module(sys.argv[1])
+print(json.dumps({"ms": (time.perf_counter() - inicio) * 1000}))
+"""
+
+
+def copiar_app(revisao, destino):
+    """Os .py da raiz e modelos/ da revisão (árvore de trabalho se None)"""
+    if revisao is None:
+        for arquivo in BASE_DIR.glob("*.py"):
+            shutil.copy(arquivo, destino)
+        shutil.copytree(BASE_DIR / "modelos", destino / "modelos")
+        return
+    arquivos = subprocess.run(
+        ["git", "ls-tree", "--name-only", revisao], cwd=BASE_DIR, capture_output=True, text=True, check=True
+    ).stdout.split()
+    incluir = [a for a in arquivos if a.endswith(".py")] + ["modelos"]
+    tar = subprocess.run(["git", "archive", revisao, *incluir], cwd=BASE_DIR, capture_output=True, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", str(destino)], input=tar, check=True)
+
+
+def mais_pesados(importtime):
+    """Módulos de primeiro nível importados depois do streamlit, do mais lento ao mais rápido (ms)"""
+    modulos = []
+    for linha in importtime.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, acumulado, nome = linha.split("|")
+        modulos.append((len(nome) - len(nome.lstrip()), nome.strip(), int(acumulado) / 1000))
+    fim_streamlit = max(i for i, (_, nome, _) in enumerate(modulos) if nome == "streamlit")
+    depois = [(nome, ms) for nivel, nome, ms in modulos[fim_streamlit + 1:] if nivel == 1]
+    return sorted(depois, key=lambda modulo: -modulo[1])
+
+
+def executar(codigo, argumento, diretorio):
+    """(ms medido pelo filho, saída do -X importtime) de um processo novo"""
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo, argumento], cwd=diretorio, capture_output=True, text=True,
+    )
+    medidas = [json.loads(linha) for linha in saida.stdout.splitlines() if linha.startswith("{")]
+    if not medidas:
+        raise RuntimeError(saida.stderr[-2000:])
+    return medidas[-1]["ms"], saida.stderr
+
+
+def main():
+    revisoes = [None if revisao == "." else revisao for revisao in sys.argv[1:]] or [None]
+    print(f"Mediana de {REPETICOES} processos novos (streamlit já importado)")
+    print()
+    print("| Revisão | Script | Até o primeiro elemento (ms) | Módulos mais pesados (ms) |")
+    print("|---|---|---|---|")
+    for revisao in revisoes:
+        with tempfile.TemporaryDirectory() as tmp:
+            destino = Path(tmp)
+            copiar_app(revisao, destino)
+            nome = revisao or "árvore de trabalho"
+            for script in SCRIPTS:
+                execucoes = [executar(ATE_PRIMEIRO_ELEMENTO, script, destino) for _ in range(REPETICOES)]
+                ms = statistics.median(m for m, _ in execucoes)
+                # Módulos da execução mediana
+                _, importtime = sorted(execucoes)[REPETICOES // 2]
+                pesados = ", ".join(f"{modulo} {t:.0f}" for modulo, t in mais_pesados(importtime)[:MAIS_PESADOS])
+                print(f"| {nome} | {script} | {ms:.0f} | {pesados} |")
+
+    print()
+    print("| Primeiro download | Módulo | Importação (ms) |")
+    print("|---|---|---|")
+    for modulo, descricao in ADIADOS.items():
+        ms = statistics.median(executar(PRIMEIRO_USO, modulo, BASE_DIR)[0] for _ in range(REPETICOES))
+        print(f"| {descricao} | {modulo} | {ms:.0f} |")
+
+
+if __name__ == "__main__":
+    main()
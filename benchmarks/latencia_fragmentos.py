@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Latência por interação: rerun completo x rerun só do fragmento.
+
+Usa o AppTest do Streamlit para mudar cada filtro/slider que está dentro de um
+`st.fragment`. O AppTest sempre reexecuta o script inteiro, então o tempo da
+execução mede o custo antigo (rerun completo); o tempo do corpo do fragmento,
+cronometrado envolvendo `st.fragment`, é o que o navegador espera agora.
+
+Uso: python benchmarks/latencia_fragmentos.py [repetições]
+"""
+
+import functools
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+from streamlit.util import calc_hash
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# (script, página, tipo do widget, key, valor, fragmento)
+INTERACOES = [
+    ("dashboard_cloud.py", "visao-geral", "slider", "alerta_critico", 60, "fragmento_alertas"),
+    ("dashboard_cloud.py", "segmentos", "selectbox", "filtro_segmento", "Ens. Médio", "fragmento_detalhe_segmento"),
+    ("dashboard_cloud.py", "series", "selectbox", "filtro_segmento_series", "Ens. Médio", "fragmento_series"),
+    ("dashboard_cloud.py", "turmas", "selectbox", "turma_segmento", "Ens. Médio", "fragmento_turmas"),
+    ("dashboard.py", None, "selectbox", "qtd_alertas", 10, "fragmento_alertas_unidade"),
+    ("dashboard.py", None, "selectbox", "filtro_seg_resumo", "Ens. Médio", "fragmento_resumo_segmento"),
+    ("dashboard.py", None, "selectbox", "filtro_segmento_det", "Ens. Médio", "fragmento_detalhamento"),
+]
+
+TEMPOS_FRAGMENTO = {}
+
+
+def cronometrar_fragmentos():
+    """Envolve `st.fragment` para registrar o tempo do corpo de cada fragmento"""
+    original = st.fragment
+
+    def fragment(func=None, **kwargs):
+        if func is None:
+            return lambda f: fragment(f, **kwargs)
+
+        @functools.wraps(func)
+        def medido(*args, **kw):
+            inicio = time.perf_counter()
+            try:
+                return func(*args, **kw)
+            finally:
+                TEMPOS_FRAGMENTO[func.__name__] = time.perf_counter() - inicio
+
+        return original(medido, **kwargs)
+
+    st.fragment = fragment
+
+
+def abrir(script, pagina):
+    at = AppTest.from_file(str(BASE_DIR / script), default_timeout=120).run()
+    if pagina:
+        at._page_hash = calc_hash(pagina)
+        at.run()
+    return at
+
+
+def medir(script, pagina, tipo, key, valor, fragmento, repeticoes):
+    at = abrir(script, pagina)
+    widget = getattr(at, tipo)(key=key)
+    padrao = widget.value
+    completo, parcial = [], []
+    for i in range(repeticoes):
+        novo = valor if i % 2 == 0 else padrao
+        inicio = time.perf_counter()
+        getattr(at, tipo)(key=key).set_value(novo).run()
+        completo.append(time.perf_counter() - inicio)
+        parcial.append(TEMPOS_FRAGMENTO[fragmento])
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+    return statistics.median(completo), statistics.median(parcial)
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    logging.disable(logging.CRITICAL)
+    cronometrar_fragmentos()
+    print(f"streamlit {st.__version__} • mediana de {repeticoes} interações\n")
+    print("| Script | Widget | Fragmento | Rerun completo (ms) | Rerun do fragmento (ms) | Redução |")
+    print("|---|---|---|---|---|---|")
+    for script, pagina, tipo, key, valor, fragmento in INTERACOES:
+        completo, parcial = medir(script, pagina, tipo, key, valor, fragmento, repeticoes)
+        local = f"{script} ({pagina})" if pagina else script
+        print(
+            f"| {local} | `{key}` | `{fragmento}` | {completo * 1000:,.0f} | "
+            f"{parcial * 1000:,.0f} | {1 - parcial / completo:.0%} |"
+        )
+
+
+if __name__ == "__main__":
+    main()
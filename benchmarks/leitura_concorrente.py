@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Latência das leituras do histórico com N sessões simultâneas.
+
+Banco temporário com EXTRACOES extrações do período (as turmas da última
+extração de output/vagas.db). Cada sessão simulada é uma thread que chama a
+leitura do histórico (as 3 séries + contagem, como carregar_historico)
+CONSULTAS vezes. "nova" abre e fecha uma conexão de escrita por chamada, como
+antes; "pool" usa periodos.historico_periodo com as conexões somente leitura
+de conexoes.py. No cenário "com extração" uma thread grava uma extração nova a
+cada 200 ms durante a medição, como o extrator rodando junto com o dashboard.
+Por fim, a mesma comparação numa consulta leve (periodos_disponiveis, só
+índice), em que a abertura da conexão é a maior parte do tempo.
+
+Uso: python benchmarks/leitura_concorrente.py
+"""
+
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import conexoes  # noqa: E402
+import periodos  # noqa: E402
+
+EXTRACOES = 300
+PERIODO = "2026"
+SESSOES = (1, 4, 8)
+CONSULTAS = 10
+INTERVALO_GRAVACAO = 0.2
+CONSULTAS_LEVES = 500
+
+
+def montar_banco(destino):
+    """Cópia de vagas.db com EXTRACOES extrações de PERIODO, a cada 8 horas"""
+    shutil.copy(periodos.DB_PATH, destino)
+    periodos.garantir_esquema(destino)
+    conn = sqlite3.connect(destino)
+    modelo = conn.execute("SELECT MAX(id) FROM 'extrações'").fetchone()[0]
+    conn.execute("CREATE TEMP TABLE modelo AS SELECT * FROM vagas WHERE extracao_id = ?", (modelo,))
+    conn.execute("DELETE FROM vagas")
+    conn.execute("DELETE FROM 'extrações'")
+    for i in range(EXTRACOES):
+        gravar_extracao(conn, np.datetime64("2025-10-01T09:00") + np.timedelta64(8 * i, "h"))
+    conn.commit()
+    conn.close()
+
+
+def gravar_extracao(conn, data, periodo=PERIODO):
+    cursor = conn.execute(
+        "INSERT INTO 'extrações' (data_extracao, periodo) VALUES (?, ?)", (str(data), periodo)
+    )
+    conn.execute(
+        "INSERT INTO vagas (extracao_id, unidade_codigo, unidade_nome, segmento, vagas, matriculados, "
+        "novatos, veteranos, disponiveis) SELECT ?, unidade_codigo, unidade_nome, segmento, vagas, "
+        "matriculados, novatos, veteranos, disponiveis FROM modelo",
+        (cursor.lastrowid,),
+    )
+
+
+def leitura_nova(db_path):
+    """Leitura antiga: conexão de escrita aberta e fechada a cada chamada"""
+    conn = sqlite3.connect(db_path)
+    frames = [pd.read_sql_query(consulta, conn, params=(PERIODO,)) for consulta in periodos.QUERIES_HISTORICO]
+    conn.execute("SELECT COUNT(*) FROM 'extrações' WHERE periodo = ?", (PERIODO,)).fetchone()
+    conn.close()
+    for df in frames:
+        df['data_extracao'] = pd.to_datetime(df['data_extracao'], format='ISO8601')
+    return frames
+
+
+def leitura_pool(db_path):
+    return periodos.historico_periodo(PERIODO, db_path)
+
+
+def leve_nova(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("SELECT DISTINCT periodo FROM 'extrações' ORDER BY periodo").fetchall()
+    conn.close()
+
+
+def leve_pool(db_path):
+    periodos.periodos_disponiveis(db_path)
+
+
+def gravador(db_path, parar):
+    """Extração gravando em paralelo (conexão de escrita própria, em outro período para não mudar o que é lido)"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("CREATE TEMP TABLE modelo AS SELECT * FROM vagas WHERE extracao_id = (SELECT MAX(id) FROM 'extrações')")
+    data = np.datetime64("2027-01-01T00:00")
+    while not parar.wait(INTERVALO_GRAVACAO):
+        data += np.timedelta64(1, "m")
+        gravar_extracao(conn, data, str(int(PERIODO) + 1))
+        conn.commit()
+    conn.close()
+
+
+def medir(leitura, db_path, sessoes):
+    def sessao():
+        tempos = []
+        for _ in range(CONSULTAS):
+            inicio = time.perf_counter()
+            for tentativa in range(5):
+                try:
+                    leitura(db_path)
+                    break
+                except (sqlite3.OperationalError, pd.errors.DatabaseError):
+                    # Banco travado pela gravação: tenta de novo (conta no tempo)
+                    time.sleep(0.01 * (tentativa + 1))
+            tempos.append(time.perf_counter() - inicio)
+        return tempos
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(sessoes) as executor:
+        tempos = np.concatenate(list(executor.map(lambda _: sessao(), range(sessoes))))
+    total = time.perf_counter() - inicio
+    return np.percentile(tempos, 50) * 1000, np.percentile(tempos, 95) * 1000, len(tempos) / total
+
+
+def main():
+    print(f"Histórico de {EXTRACOES} extrações, {CONSULTAS} leituras por sessão")
+    print()
+    print("| Conexão | Sessões | Extração gravando | p50 (ms) | p95 (ms) | Leituras/s |")
+    print("|---|---|---|---|---|---|")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "vagas.db"
+        montar_banco(db_path)
+        cenarios = [(sessoes, False) for sessoes in SESSOES] + [(SESSOES[-1], True)]
+        for sessoes, gravando in cenarios:
+            for nome, leitura in (("nova", leitura_nova), ("pool", leitura_pool)):
+                leitura(db_path)
+                parar = threading.Event()
+                thread = threading.Thread(target=gravador, args=(db_path, parar)) if gravando else None
+                if thread:
+                    thread.start()
+                p50, p95, vazao = medir(leitura, db_path, sessoes)
+                if thread:
+                    parar.set()
+                    thread.join()
+                print(f"| {nome} | {sessoes} | {'sim' if gravando else 'não'} | {p50:.1f} | {p95:.1f} | {vazao:.0f} |")
+
+        print()
+        print("| Consulta leve | Tempo médio (µs) |")
+        print("|---|---|")
+        for nome, leitura in (("nova", leve_nova), ("pool", leve_pool)):
+            leitura(db_path)
+            inicio = time.perf_counter()
+            for _ in range(CONSULTAS_LEVES):
+                leitura(db_path)
+            print(f"| {nome} | {(time.perf_counter() - inicio) / CONSULTAS_LEVES * 1e6:.0f} |")
+        print()
+        print(f"Pool: {conexoes.info_pool()}")
+
+
+if __name__ == "__main__":
+    main()
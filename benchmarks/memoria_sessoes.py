@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Memória por sessão simultânea do dashboard.
+
+Copia o app (os .py da raiz e modelos/) de uma revisão do git para um diretório
+temporário, com o snapshot atual de output/ e um vagas.db de EXTRACOES
+extrações do período do snapshot. Em um processo novo (módulos e caches do
+Streamlit só daquela revisão), abre N sessões do AppTest (a primeira execução
+de cada uma, com a inicialização do próprio AppTest, fica fora da medição) e
+então faz as N rerodarem ao mesmo tempo, uma thread cada, como N pessoas
+mexendo no dashboard juntas. O pico do tracemalloc até o fim do último script
+(antes de o AppTest montar a árvore de elementos, que é o lado do navegador) é
+a memória que os N reruns simultâneos precisam no servidor; "por sessão a
+mais" é a inclinação entre 1 e o maior N. O tempo, também até o fim dos
+scripts, é medido numa rodada sem tracemalloc. Como no servidor, o script é
+compilado uma vez por processo (o AppTest recompila a cada execução, e essa
+compilação sozinha passava de 6 MiB).
+
+A segunda tabela isola o que cada rerun busca no cache (resumo, vagas,
+frame de turmas e histórico) na árvore de trabalho, com as unidades do
+snapshot replicadas ESCALAS vezes: pico de memória e tempo de uma chamada com
+o cache quente, pelo st.cache_data (cópia) e pelo compartilhado.recurso.
+
+Uso: python benchmarks/memoria_sessoes.py [revisão ...]
+     (`.` ou nenhuma revisão: a árvore de trabalho; ex.: `HEAD~1 .` para comparar)
+"""
+
+import copy
+import json
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+EXTRACOES = 2000
+INTERVALO_HORAS = 4
+SESSOES = (1, 4, 8)
+SCRIPTS = ("dashboard_cloud.py", "dashboard.py")
+ESCALAS = (1, 10, 100)
+CHAMADAS = 5
+
+
+def copiar_app(revisao, destino):
+    """Os .py da raiz e modelos/ da revisão (árvore de trabalho se None)"""
+    if revisao is None:
+        for arquivo in BASE_DIR.glob("*.py"):
+            shutil.copy(arquivo, destino)
+        shutil.copytree(BASE_DIR / "modelos", destino / "modelos")
+        return
+    arquivos = subprocess.run(
+        ["git", "ls-tree", "--name-only", revisao], cwd=BASE_DIR, capture_output=True, text=True, check=True
+    ).stdout.split()
+    incluir = [a for a in arquivos if a.endswith(".py")] + ["modelos"]
+    tar = subprocess.run(["git", "archive", revisao, *incluir], cwd=BASE_DIR, capture_output=True, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", str(destino)], input=tar, check=True)
+
+
+def montar_output(destino):
+    """Snapshot atual e vagas.db com EXTRACOES extrações do período dele (a cada INTERVALO_HORAS)"""
+    output = destino / "output"
+    output.mkdir()
+    for nome in ("resumo_ultimo.json", "vagas_ultimo.json"):
+        shutil.copy(BASE_DIR / "output" / nome, output)
+    with open(output / "resumo_ultimo.json", encoding="utf-8") as f:
+        resumo = json.load(f)
+    ultima = datetime.fromisoformat(resumo["data_extracao"])
+
+    shutil.copy(BASE_DIR / "output" / "vagas.db", output)
+    conn = sqlite3.connect(output / "vagas.db")
+    modelo = conn.execute("SELECT MAX(id) FROM 'extrações' WHERE periodo = ?", (resumo["periodo"],)).fetchone()[0]
+    conn.execute("CREATE TEMP TABLE modelo AS SELECT * FROM vagas WHERE extracao_id = ?", (modelo,))
+    conn.execute("DELETE FROM vagas WHERE extracao_id IN (SELECT id FROM 'extrações' WHERE periodo = ?)", (resumo["periodo"],))
+    conn.execute("DELETE FROM 'extrações' WHERE periodo = ?", (resumo["periodo"],))
+    colunas = [linha[1] for linha in conn.execute("PRAGMA table_info(vagas)") if linha[1] not in ("id", "extracao_id")]
+    lista = ", ".join(colunas)
+    for i in range(EXTRACOES):
+        data = ultima - timedelta(hours=INTERVALO_HORAS * (EXTRACOES - 1 - i))
+        cursor = conn.execute(
+            "INSERT INTO 'extrações' (data_extracao, periodo) VALUES (?, ?)", (data.isoformat(), resumo["periodo"])
+        )
+        conn.execute(
+            f"INSERT INTO vagas (extracao_id, {lista}) SELECT ?, {lista} FROM modelo", (cursor.lastrowid,)
+        )
+    conn.commit()
+    conn.close()
+
+
+def rerodar(apps):
+    """Rerun simultâneo de todas as sessões: (segundos, pico do tracemalloc) até o último script terminar"""
+    from streamlit.testing.v1 import local_script_runner
+
+    montar_arvore = local_script_runner.parse_tree_from_messages
+    fim = {}
+
+    def scripts_terminados():
+        fim["segundos"] = time.perf_counter() - inicio
+        fim["pico"] = tracemalloc.get_traced_memory()[1]
+
+    barreira = threading.Barrier(len(apps), action=scripts_terminados)
+
+    def esperar_todos(mensagens):
+        barreira.wait()
+        return montar_arvore(mensagens)
+
+    local_script_runner.parse_tree_from_messages = esperar_todos
+    try:
+        inicio = time.perf_counter()
+        threads = [threading.Thread(target=app.run) for app in apps]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        local_script_runner.parse_tree_from_messages = montar_arvore
+    return fim["segundos"], fim["pico"]
+
+
+def compilar_uma_vez():
+    """Bytecode dos scripts guardado no processo, como o ScriptCache do servidor"""
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    compilar = ScriptCache.get_bytecode
+    compilados = {}
+
+    def get_bytecode(self, script_path):
+        if script_path not in compilados:
+            compilados[script_path] = compilar(self, script_path)
+        return compilados[script_path]
+
+    ScriptCache.get_bytecode = get_bytecode
+
+
+def medir(diretorio):
+    """Roda no processo filho: uma linha JSON por (script, sessões)"""
+    from streamlit.testing.v1 import AppTest
+
+    compilar_uma_vez()
+    sys.path.insert(0, str(diretorio))
+    for script in SCRIPTS:
+        caminho = str(Path(diretorio) / script)
+        # Primeira execução fora da medição: caches e a migração do banco novo (dia_campanha)
+        AppTest.from_file(caminho, default_timeout=300).run()
+        for sessoes in SESSOES:
+            apps = [AppTest.from_file(caminho, default_timeout=300).run() for _ in range(sessoes)]
+            segundos, _ = rerodar(apps)
+            tracemalloc.start()
+            base = tracemalloc.get_traced_memory()[0]
+            _, pico = rerodar(apps)
+            pico -= base
+            tracemalloc.stop()
+            erros = sum(len(app.exception) for app in apps)
+            print(json.dumps({"script": script, "sessoes": sessoes, "pico": pico, "segundos": segundos, "erros": erros}))
+
+
+def replicar(dados, fator):
+    """Replica as unidades `fator` vezes (códigos/nomes distintos)"""
+    novo = dict(dados, unidades=[])
+    for i in range(fator):
+        for unidade in dados["unidades"]:
+            u = copy.deepcopy(unidade)
+            if i:
+                u["codigo"] = f"{u['codigo']}-{i}"
+                u["nome"] = f"{u['nome']} #{i}"
+                for turma in u.get("turmas", []):
+                    turma["turma"] = f"{turma['turma']} #{i}"
+            novo["unidades"].append(u)
+    return novo
+
+
+def comparar_dados():
+    """Custo de buscar os dados do rerun no cache: cópia (st.cache_data) x objeto compartilhado"""
+    import streamlit as st
+
+    sys.path.insert(0, str(BASE_DIR))
+    import compartilhado
+    import periodos
+    import tabelas
+    from classificacao import classificar_dados
+
+    print()
+    print("| Escala | Turmas | Cache | Memória por rerun (MiB) | Tempo por rerun (ms) |")
+    print("|---|---|---|---|---|")
+    with tempfile.TemporaryDirectory() as tmp:
+        montar_output(Path(tmp))
+        output = Path(tmp) / "output"
+        with open(output / "resumo_ultimo.json", encoding="utf-8") as f:
+            resumo = classificar_dados(json.load(f))
+        with open(output / "vagas_ultimo.json", encoding="utf-8") as f:
+            vagas = classificar_dados(json.load(f))
+        historico = periodos.historico_periodo(resumo["periodo"], output / "vagas.db")
+
+        for escala in ESCALAS:
+            resumo_e, vagas_e = replicar(resumo, escala), replicar(vagas, escala)
+
+            def dados_rerun(versao):
+                return resumo_e, vagas_e, tabelas.df_turmas(vagas_e, strings_arrow=True), historico
+
+            turmas = sum(len(u["turmas"]) for u in vagas_e["unidades"])
+            for nome, funcao in (("st.cache_data", st.cache_data(dados_rerun)), ("compartilhado", compartilhado.recurso(dados_rerun))):
+                funcao(escala)
+                tracemalloc.start()
+                base = tracemalloc.get_traced_memory()[0]
+                funcao(escala)
+                pico = tracemalloc.get_traced_memory()[1] - base
+                tracemalloc.stop()
+                inicio = time.perf_counter()
+                for _ in range(CHAMADAS):
+                    funcao(escala)
+                segundos = (time.perf_counter() - inicio) / CHAMADAS
+                print(f"| {escala}x | {turmas:,} | {nome} | {pico / 2**20:.2f} | {segundos * 1000:.2f} |")
+
+
+def main():
+    if sys.argv[1:2] == ["--medir"]:
+        medir(sys.argv[2])
+        return
+
+    revisoes = [None if revisao == "." else revisao for revisao in sys.argv[1:]] or [None]
+    print(f"{EXTRACOES} extrações no histórico • {', '.join(map(str, SESSOES))} sessões simultâneas")
+    print()
+    print("| Revisão | Script | Sessões | Pico (MiB) | Por sessão a mais (MiB) | Tempo por rerun (ms) |")
+    print("|---|---|---|---|---|---|")
+    for revisao in revisoes:
+        with tempfile.TemporaryDirectory() as tmp:
+            destino = Path(tmp)
+            copiar_app(revisao, destino)
+            montar_output(destino)
+            saida = subprocess.run(
+                [sys.executable, __file__, "--medir", str(destino)], cwd=destino, capture_output=True, text=True,
+            )
+            medidas = [json.loads(linha) for linha in saida.stdout.splitlines() if linha.startswith("{")]
+            if not medidas:
+                print(saida.stderr[-2000:], file=sys.stderr)
+                continue
+            nome = revisao or "árvore de trabalho"
+            for script in SCRIPTS:
+                linhas = [m for m in medidas if m["script"] == script]
+                primeira, ultima = linhas[0], linhas[-1]
+                inclinacao = (ultima["pico"] - primeira["pico"]) / (ultima["sessoes"] - primeira["sessoes"])
+                for m in linhas:
+                    erros = f" ({m['erros']} erros)" if m["erros"] else ""
+                    print(
+                        f"| {nome} | {script} | {m['sessoes']} | {m['pico'] / 2**20:.1f} | "
+                        f"{inclinacao / 2**20:.2f} | {m['segundos'] / m['sessoes'] * 1000:.0f}{erros} |"
+                    )
+    comparar_dados()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Relatório de memória dos DataFrames cacheados pelos dashboards.
+
+Compara a construção antiga (lista de dicts -> DataFrame com strings object e
+int64, padrão do pandas 2.x) com a camada compacta de tabelas.py, na escala
+atual e replicando as unidades 10x e 100x.
+
+Uso: python benchmarks/memoria_tabelas.py
+"""
+
+import copy
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import tabelas  # noqa: E402
+from classificacao import classificar_dados  # noqa: E402
+
+ESCALAS = (1, 10, 100)
+
+
+def carregar():
+    with open(BASE_DIR / "output" / "vagas_ultimo.json", encoding="utf-8") as f:
+        vagas = classificar_dados(json.load(f))
+    with open(BASE_DIR / "output" / "resumo_ultimo.json", encoding="utf-8") as f:
+        resumo = classificar_dados(json.load(f))
+    return vagas, resumo
+
+
+def replicar(dados, fator):
+    """Replica as unidades `fator` vezes (códigos/nomes distintos)"""
+    novo = dict(dados, unidades=[])
+    for i in range(fator):
+        for unidade in dados["unidades"]:
+            u = copy.deepcopy(unidade)
+            if i:
+                u["codigo"] = f"{u['codigo']}-{i}"
+                u["nome"] = f"{u['nome']} #{i}"
+                u["unidade_curta"] = f"{u['unidade_curta']} #{i}"
+                for turma in u.get("turmas", []):
+                    turma["turma"] = f"{turma['turma']} #{i}"
+            novo["unidades"].append(u)
+    return novo
+
+
+def legado(df):
+    """Tipos que a construção antiga produzia (object + int64/float64)"""
+    tipos = {}
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(df[col]):
+            tipos[col] = object
+        elif pd.api.types.is_integer_dtype(df[col]):
+            tipos[col] = "int64"
+        elif pd.api.types.is_float_dtype(df[col]):
+            tipos[col] = "float64"
+    return df.astype(tipos)
+
+
+def texto_object(df):
+    """Colunas de texto não categóricas como object (comportamento do pandas 2.x)"""
+    tipos = {
+        col: object for col in df.columns
+        if not isinstance(df[col].dtype, pd.CategoricalDtype) and pd.api.types.is_string_dtype(df[col])
+    }
+    return df.astype(tipos)
+
+
+def bytes_frame(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def main():
+    vagas, resumo = carregar()
+    print(f"pandas {pd.__version__}\n")
+    construtores = {
+        "df_turmas": lambda v, r, **kw: tabelas.df_turmas(v, **kw),
+        "df_resumo": lambda v, r, **kw: tabelas.df_resumo(r, **kw),
+        "df_turmas_nivel4": lambda v, r, **kw: tabelas.df_turmas_nivel4(v, **kw),
+    }
+
+    print("| Frame | Escala | Linhas | Antes (KB) | Compacto (KB) | Compacto + Arrow (KB) | Redução (Arrow) |")
+    print("|---|---|---|---|---|---|---|")
+    for fator in ESCALAS:
+        v, r = replicar(vagas, fator), replicar(resumo, fator)
+        for nome, construir in construtores.items():
+            compacto = construir(v, r)
+            arrow = construir(v, r, strings_arrow=True)
+            antes = bytes_frame(legado(compacto))
+            depois = bytes_frame(texto_object(compacto))
+            print(
+                f"| {nome} | {fator}x | {len(compacto):,} | {antes / 1024:,.1f} | "
+                f"{depois / 1024:,.1f} | {bytes_frame(arrow) / 1024:,.1f} | {1 - depois / antes:.0%} ({1 - bytes_frame(arrow) / antes:.0%}) |"
+            )
+
+
+if __name__ == "__main__":
+    main()
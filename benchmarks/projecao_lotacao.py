@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Projeção de lotação (projecao.py): tempo do ajuste vetorizado e da projeção completa.
+
+"Ajuste" mede ajustar_inclinacao + dias_para_lotar sobre matrizes sintéticas
+turmas × extrações (crescimento linear com ruído e 5% de falhas). "Completa"
+mede projecao.projetar com bancos temporários de N extrações (as turmas da
+última extração de output/vagas.db, com matriculados crescentes): leitura do
+SQLite, montagem da matriz e ajuste de turmas e unidades.
+
+Uso: python benchmarks/projecao_lotacao.py
+"""
+
+import json
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import numpy as np  # noqa: E402
+
+import periodos  # noqa: E402
+import projecao  # noqa: E402
+from classificacao import classificar_dados  # noqa: E402
+
+MATRIZES = ((165, 6), (1000, 100), (5000, 300))
+EXTRACOES = (10, 100, 300)
+REPETICOES = 5
+
+
+def melhor_tempo(funcao):
+    tempos = []
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def matriz_sintetica(turmas, extracoes, rng):
+    dias = np.sort(rng.uniform(0, 120, extracoes))
+    taxa = rng.uniform(0, 0.5, turmas)
+    matriz = np.round(rng.uniform(0, 10, turmas)[:, None] + taxa[:, None] * dias + rng.normal(0, 1, (turmas, extracoes)))
+    matriz[rng.random((turmas, extracoes)) < 0.05] = np.nan
+    return dias, matriz, rng.integers(0, 30, turmas)
+
+
+def montar_banco(destino, extracoes, vagas):
+    """Cópia de vagas.db com `extracoes` extrações do período do snapshot, uma por dia"""
+    shutil.copy(periodos.DB_PATH, destino)
+    periodos.garantir_esquema(destino)
+    conn = sqlite3.connect(destino)
+    conn.execute("DELETE FROM vagas")
+    conn.execute("DELETE FROM 'extrações'")
+    cursor = conn.cursor()
+    for i in range(extracoes):
+        dados = json.loads(json.dumps(vagas))
+        dados["data_extracao"] = (np.datetime64("2025-10-01") + np.timedelta64(i, "D")).astype(str) + "T09:00:00"
+        for unidade in dados["unidades"]:
+            for turma in unidade["turmas"]:
+                turma["matriculados"] = int(turma["matriculados"] * (i + 1) / extracoes)
+        periodos.gravar_extracao(cursor, dados)
+    conn.commit()
+    conn.close()
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print("| Etapa | Turmas | Extrações | Tempo (ms) |")
+    print("|---|---|---|---|")
+    for turmas, extracoes in MATRIZES:
+        dias, matriz, restantes = matriz_sintetica(turmas, extracoes, rng)
+
+        def ajustar():
+            inclinacao, erro, _ = projecao.ajustar_inclinacao(dias, matriz)
+            projecao.dias_para_lotar(restantes, inclinacao, erro)
+
+        print(f"| ajuste | {turmas:,} | {extracoes:,} | {melhor_tempo(ajustar) * 1000:.1f} |")
+
+    with open(periodos.OUTPUT_DIR / "vagas_ultimo.json", encoding="utf-8") as f:
+        vagas = classificar_dados(json.load(f))
+    turmas = sum(len(u["turmas"]) for u in vagas["unidades"])
+    with tempfile.TemporaryDirectory() as tmp:
+        for extracoes in EXTRACOES:
+            db_path = Path(tmp) / f"vagas_{extracoes}.db"
+            montar_banco(db_path, extracoes, vagas)
+            segundos = melhor_tempo(lambda: projecao.projetar(vagas, db_path))
+            print(f"| completa | {turmas:,} | {extracoes:,} | {segundos * 1000:.1f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tempo de renderização dos relatórios HTML (templates de modelos/).
+
+Renderiza cada relatório na escala atual e replicando as unidades 10x e 100x
+(milhares de turmas). Para o relatório detalhado por unidade, o único que lista
+todas as turmas, compara com a montagem antiga (f-strings concatenadas turma a
+turma, com CSS próprio).
+
+Uso: python benchmarks/render_relatorios.py [repetições]
+"""
+
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import relatorios  # noqa: E402
+from enviar_agendado import gerar_html_relatorio  # noqa: E402
+from enviar_email import formatar_email  # noqa: E402
+from memoria_tabelas import carregar, replicar  # noqa: E402
+
+ESCALAS = (1, 10, 100)
+
+RELATORIOS = {
+    "gerar_pdf_html": relatorios.gerar_pdf_html,
+    "resumo_executivo": relatorios.gerar_relatorio_resumo_executivo,
+    "detalhado_unidade": relatorios.gerar_relatorio_detalhado_unidade,
+    "turmas_criticas": relatorios.gerar_relatorio_turmas_criticas,
+    "tendencias": relatorios.gerar_relatorio_tendencias,
+    "email agendado": lambda r, v: gerar_html_relatorio(r, v, "Resumo Executivo"),
+    "email extração": lambda r, v: formatar_email(r),
+}
+
+
+def detalhado_legado(resumo, vagas):
+    """Montagem antiga do relatório detalhado (uma f-string por turma)"""
+    html = "<!DOCTYPE html><html><head><style>body { font-size: 11px; }</style></head><body>"
+    for unidade in vagas['unidades']:
+        total_unid = next((u['total'] for u in resumo['unidades'] if u['codigo'] == unidade['codigo']), {})
+        ocup_unid = round(total_unid.get('matriculados', 0) / total_unid.get('vagas', 1) * 100, 1)
+        html += f"""
+        <div class="unidade-section">
+            <div class="unidade-header"><h3>🏫 {unidade['unidade_curta']} - Ocupação: {ocup_unid}%</h3></div>
+            <table>
+                <tr><th>Turma</th><th>Segmento</th><th>Vagas</th><th>Matr.</th><th>Disp.</th><th>Ocup.</th></tr>
+        """
+        for turma in unidade['turmas']:
+            ocup = round(turma['matriculados'] / turma['vagas'] * 100, 1) if turma['vagas'] > 0 else 0
+            classe = 'critico' if ocup < 50 else ('atencao' if ocup < 70 else ('bom' if ocup >= 80 else ''))
+            html += f"""
+                <tr class="{classe}">
+                    <td style="text-align: left;">{turma['turma'][:40]}</td>
+                    <td>{turma['segmento']}</td>
+                    <td>{turma['vagas']}</td>
+                    <td>{turma['matriculados']}</td>
+                    <td>{turma['vagas'] - turma['matriculados']}</td>
+                    <td><strong>{ocup}%</strong></td>
+                </tr>
+            """
+        html += "</table></div>"
+    return html + "</body></html>"
+
+
+def cronometrar(gerar, resumo, vagas, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        html = gerar(resumo, vagas)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), len(html.encode("utf-8"))
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    vagas, resumo = carregar()
+    print(f"mediana de {repeticoes} renderizações\n")
+    print("| Relatório | Escala | Turmas | Tempo (ms) | Tamanho (KB) |")
+    print("|---|---|---|---|---|")
+    for fator in ESCALAS:
+        v, r = replicar(vagas, fator), replicar(resumo, fator)
+        qtd_turmas = sum(len(u["turmas"]) for u in v["unidades"])
+        geradores = dict(RELATORIOS, **{"detalhado_unidade (antigo)": detalhado_legado})
+        for nome, gerar in geradores.items():
+            segundos, tamanho = cronometrar(gerar, r, v, repeticoes)
+            print(f"| {nome} | {fator}x | {qtd_turmas:,} | {segundos * 1000:,.1f} | {tamanho / 1024:,.1f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Classificação canônica das turmas: segmento, série, turno e nome curto da unidade.
+Aplicada uma única vez na extração (extrair_vagas.py); os dashboards apenas
+leem os campos `serie`, `turno` e `unidade_curta` já gravados.
+"""
+
+import re
+
+# Séries na ordem pedagógica (usada para ordenar gráficos e tabelas)
+SERIES_ORDEM = [
+    "Infantil II", "Infantil III", "Infantil IV", "Infantil V",
+    "1º ano", "2º ano", "3º ano", "4º ano", "5º ano",
+    "6º ano", "7º ano", "8º ano", "9º ano",
+    "1ª série EM", "2ª série EM", "3ª série EM",
+]
+SERIE_OUTRA = "Outra"
+
+TURNOS_ORDEM = ["Manhã", "Tarde", "Integral"]
+TURNO_OUTRO = "Outro"
+
+# Segmentos na ordem pedagógica, com os rótulos do extrator (identificar_segmento)
+SEGMENTOS_ORDEM = ["Ed. Infantil", "Fund. I", "Fund. II", "Ens. Médio"]
+# Rótulos gravados por versões antigas do extrator
+_SEGMENTOS_ANTIGOS = {"Fund. 1": "Fund. I", "Fund. 2": "Fund. II"}
+
+_ROMANOS = {"ii": "II", "iii": "III", "iv": "IV", "v": "V",
+            "2": "II", "3": "III", "4": "IV", "5": "V"}
+_RE_INFANTIL = re.compile(r"infantil\s*(iii|ii|iv|v|[2-5])\b")
+# Aceita "4º Ano", "4 ºAno", "2ºAno", "4° ano", "1ª Série", "1a série"
+_RE_ANO_SERIE = re.compile(r"\b([1-9])\s*[º°ªa]?\s*(ano|s[ée]rie)")
+_TURNOS = (("manhã", "Manhã"), ("manha", "Manhã"), ("tarde", "Tarde"), ("integral", "Integral"))
+# Letra da turma: "Turma A", "Turma c" ou, sem a palavra, "- A Manhã"
+_RE_LETRA_TURMA = re.compile(r"\bturma\s*([a-h])\b(?:\s+(manhã|manha|tarde|integral)\b)?", re.I)
+_RE_LETRA_HIFEN = re.compile(r"-\s*([a-h])\b(?:\s+(manhã|manha|tarde|integral)\b)?", re.I)
+
+
+def classificar_serie(nome_turma):
+    """Série canônica da turma: 'Infantil II', '4º ano', '1ª série EM' ou 'Outra'"""
+    nome = str(nome_turma or "").lower()
+
+    m = _RE_INFANTIL.search(nome)
+    if m:
+        return f"Infantil {_ROMANOS[m.group(1)]}"
+
+    m = _RE_ANO_SERIE.search(nome)
+    if m:
+        numero, tipo = m.group(1), m.group(2)
+        # "1ª Série" e "1º Ano Médio" (nomenclatura de 2025) são Ensino Médio
+        if tipo != "ano" or "médio" in nome or "medio" in nome:
+            if numero in "123":
+                return f"{numero}ª série EM"
+        else:
+            return f"{numero}º ano"
+
+    return SERIE_OUTRA
+
+
+def classificar_turno(nome_turma):
+    """Turno da turma: usa o sufixo ' - Manhã'/' - Tarde' do SIGA e, na falta, o nome todo"""
+    nome = str(nome_turma or "").lower()
+    sufixo = nome.rsplit("-", 1)[-1].strip()
+    for chave, turno in _TURNOS:
+        if sufixo.startswith(chave):
+            return turno
+    for chave, turno in _TURNOS:
+        if chave in nome:
+            return turno
+    return TURNO_OUTRO
+
+
+def segmento_canonico(segmento):
+    """'Fund. 1' -> 'Fund. I' (rótulos antigos); os demais ficam como estão"""
+    return _SEGMENTOS_ANTIGOS.get(segmento, segmento)
+
+
+def id_turma(codigo_unidade, nome_turma):
+    """Identificador estável da turma no ano letivo: '01-BV/4º ano/Manhã/A'.
+
+    O SIGA muda a grafia entre extrações ('1º Ano Médio - Turma A Manhã - Boa
+    Viagem' vira '1ª Série - Médio - Turma A Manhã'); série, turno e letra não
+    mudam. O turno colado à letra ('Turma A Tarde') prevalece sobre o sufixo.
+    Sem série ou letra reconhecível, o id usa o nome como está.
+    """
+    serie = classificar_serie(nome_turma)
+    nome = str(nome_turma or "")
+    m = _RE_LETRA_TURMA.search(nome) or _RE_LETRA_HIFEN.search(nome)
+    if serie == SERIE_OUTRA or not m:
+        return f"{codigo_unidade}/{nome}"
+    turno = dict(_TURNOS)[m.group(2).lower()] if m.group(2) else classificar_turno(nome)
+    return f"{codigo_unidade}/{serie}/{turno}/{m.group(1).upper()}"
+
+
+def nome_curto_unidade(nome_unidade):
+    """'1 - BV (Boa Viagem)' -> 'Boa Viagem'"""
+    nome = str(nome_unidade)
+    if "(" in nome:
+        return nome.split("(")[1].replace(")", "").strip()
+    return nome
+
+
+def classificar_dados(dados):
+    """Grava `unidade_curta` nas unidades e `serie`/`turno` nas turmas (in-place).
+
+    Campos já presentes são mantidos, então o custo em arquivos novos é só a varredura.
+    Segmentos com rótulo antigo ('Fund. 1') passam ao canônico ('Fund. I').
+    Serve tanto para vagas_*.json (com turmas) quanto para resumo_*.json.
+    """
+    for unidade in dados.get("unidades", []):
+        if "unidade_curta" not in unidade:
+            unidade["unidade_curta"] = nome_curto_unidade(unidade["nome"])
+        segmentos = unidade.get("segmentos")
+        if segmentos and any(seg in _SEGMENTOS_ANTIGOS for seg in segmentos):
+            unidade["segmentos"] = {segmento_canonico(seg): vals for seg, vals in segmentos.items()}
+        for turma in unidade.get("turmas", []):
+            if turma.get("segmento") in _SEGMENTOS_ANTIGOS:
+                turma["segmento"] = _SEGMENTOS_ANTIGOS[turma["segmento"]]
+            if "serie" not in turma:
+                turma["serie"] = classificar_serie(turma["turma"])
+            if "turno" not in turma:
+                turma["turno"] = classificar_turno(turma["turma"])
+    return dados
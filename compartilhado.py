@@ -0,0 +1,137 @@
+"""
+Dados do snapshot compartilhados entre as sessões do dashboard.
+
+O st.cache_data devolve uma cópia (pickle) do resultado a cada chamada: com
+várias pessoas olhando o dashboard, cada rerun de cada sessão desserializa de
+novo os dicts do snapshot, os DataFrames de turmas e do histórico e as specs
+dos gráficos. As funções marcadas com `@recurso` guardam o resultado uma vez
+por processo e devolvem o mesmo objeto para todas as sessões.
+
+Esses objetos são somente leitura: os dashboards filtram com seleções e
+`.copy()` (com o copy-on-write do pandas uma seleção nunca escreve no
+original; padrão no pandas 3, ligado aqui no pandas 2). Na sessão fica só o
+que é dela (filtros, tema, avisos).
+
+A versão vem do arquivo (`versao_arquivos`: mtime e tamanho do snapshot e de
+vagas.db), então uma extração nova aparece no próximo rerun sem esperar ttl.
+Ficam em memória só as MAX_VERSOES versões usadas por último; as outras saem
+inteiras quando uma versão nova chega.
+"""
+
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+# No pandas 3 o copy-on-write é sempre ligado (e a opção, obsoleta)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# Versões do snapshot mantidas em memória (a atual e a anterior, durante a troca)
+MAX_VERSOES = 2
+
+
+class RecursosCompartilhados:
+    """Objetos por (versão, chave), gerados uma vez e entregues sem cópia"""
+
+    def __init__(self, max_versoes=MAX_VERSOES):
+        self.max_versoes = max_versoes
+        self._versoes = OrderedDict()
+        self._gerando = {}
+        self._trava = threading.Lock()
+        self.geracoes = 0
+        self.reusos = 0
+        self.descartes = 0
+
+    def obter(self, versao, chave, gerar):
+        """Objeto `chave` da `versao`; `gerar()` roda uma vez (sessões simultâneas esperam a mesma geração)"""
+        with self._trava:
+            itens = self._itens(versao)
+            if chave in itens:
+                self.reusos += 1
+                return itens[chave]
+            trava_chave = self._gerando.setdefault((versao, chave), threading.Lock())
+
+        with trava_chave:
+            try:
+                with self._trava:
+                    itens = self._versoes.get(versao, {})
+                    if chave in itens:
+                        self.reusos += 1
+                        return itens[chave]
+                valor = gerar()
+                with self._trava:
+                    self.geracoes += 1
+                    # A versão pode ter sido descartada durante a geração: o valor só vale para esta chamada
+                    if versao in self._versoes:
+                        self._versoes[versao][chave] = valor
+            finally:
+                # Também se gerar() falhar: a próxima chamada tenta de novo com uma trava nova
+                with self._trava:
+                    if self._gerando.get((versao, chave)) is trava_chave:
+                        del self._gerando[(versao, chave)]
+        return valor
+
+    def _itens(self, versao):
+        itens = self._versoes.get(versao)
+        if itens is not None:
+            self._versoes.move_to_end(versao)
+            return itens
+        itens = self._versoes[versao] = {}
+        while len(self._versoes) > self.max_versoes:
+            self._versoes.popitem(last=False)
+            self.descartes += 1
+        return itens
+
+    def info(self):
+        with self._trava:
+            return {
+                "versoes": len(self._versoes), "itens": sum(len(itens) for itens in self._versoes.values()),
+                "geracoes": self.geracoes, "reusos": self.reusos, "descartes": self.descartes,
+                "max": self.max_versoes,
+            }
+
+    def limpar(self):
+        with self._trava:
+            self._versoes.clear()
+
+
+_recursos = RecursosCompartilhados()
+
+
+def versao_arquivos(*caminhos):
+    """Versão dos dados a partir dos arquivos (mtime e tamanho; arquivo ausente conta como None)"""
+    versao = []
+    for caminho in caminhos:
+        try:
+            info = Path(caminho).stat()
+        except FileNotFoundError:
+            versao.append(None)
+        else:
+            versao.append((info.st_mtime_ns, info.st_size))
+    return tuple(versao)
+
+
+def recurso(funcao):
+    """Como @st.cache_data, mas o resultado é o mesmo objeto para todas as sessões.
+
+    O primeiro argumento é a versão dos dados; os outros entram na chave, menos
+    os que começam com `_` (como no st.cache_data).
+    """
+    nomes = list(inspect.signature(funcao).parameters)[1:]
+    # Arquivo + nome: as duas páginas têm funções com o mesmo nome
+    origem = (funcao.__code__.co_filename, funcao.__qualname__)
+
+    @functools.wraps(funcao)
+    def compartilhada(versao, *args):
+        chave = origem + tuple(valor for nome, valor in zip(nomes, args) if not nome.startswith("_"))
+        return _recursos.obter(versao, chave, lambda: funcao(versao, *args))
+
+    return compartilhada
+
+
+def info_recursos():
+    return _recursos.info()
@@ -0,0 +1,110 @@
+"""
+Conexões somente leitura a vagas.db, reaproveitadas entre sessões.
+
+As leituras do dashboard (histórico, crescimento, projeção, séries por turma,
+comparativos) pegam uma conexão do pool em vez de abrir e fechar uma conexão
+de escrita a cada chamada. Cada conexão é aberta com `mode=ro` e `query_only`,
+então não disputa trava de escrita com a extração, e fica aberta com o cache de
+páginas e o cache de statements preparados (`cached_statements`) já quentes
+para a próxima consulta. Escritas (extração, importação, migrações) continuam
+com as suas próprias conexões.
+
+Se o arquivo do banco é trocado (outro inode), as conexões antigas são
+fechadas e o pool recomeça com o arquivo novo.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# Conexões ociosas guardadas por banco (sessões além disso abrem e fecham a sua)
+MAX_CONEXOES = 8
+# Cache de páginas por conexão, em KiB
+CACHE_KIB = 16 * 1024
+# Statements preparados guardados por conexão
+STATEMENTS = 256
+
+
+class PoolLeitura:
+    """Conexões somente leitura ociosas por banco, entregues por `conexao()`"""
+
+    def __init__(self, max_conexoes=MAX_CONEXOES):
+        self.max_conexoes = max_conexoes
+        self._livres = {}
+        self._arquivos = {}
+        self._trava = threading.Lock()
+        self.abertas = 0
+        self.reusos = 0
+
+    @contextmanager
+    def conexao(self, db_path):
+        """Conexão somente leitura de `db_path` (devolvida ao pool no fim do bloco)"""
+        db_path = str(Path(db_path).resolve())
+        conn = self._pegar(db_path)
+        try:
+            yield conn
+        except BaseException:
+            conn.close()
+            raise
+        else:
+            self._devolver(db_path, conn)
+
+    def _pegar(self, db_path):
+        info = Path(db_path).stat()
+        arquivo = (info.st_dev, info.st_ino)
+        with self._trava:
+            if self._arquivos.get(db_path) != arquivo:
+                # Banco novo ou arquivo trocado: as conexões antigas apontam para o arquivo anterior
+                for conn in self._livres.pop(db_path, []):
+                    conn.close()
+                self._arquivos[db_path] = arquivo
+            livres = self._livres.setdefault(db_path, [])
+            if livres:
+                self.reusos += 1
+                return livres.pop()
+            self.abertas += 1
+        return _abrir(db_path)
+
+    def _devolver(self, db_path, conn):
+        with self._trava:
+            livres = self._livres.setdefault(db_path, [])
+            if len(livres) < self.max_conexoes:
+                livres.append(conn)
+                return
+        conn.close()
+
+    def info(self):
+        return {
+            "abertas": self.abertas, "reusos": self.reusos,
+            "livres": sum(len(livres) for livres in self._livres.values()), "max": self.max_conexoes,
+        }
+
+    def limpar(self):
+        with self._trava:
+            for livres in self._livres.values():
+                for conn in livres:
+                    conn.close()
+            self._livres.clear()
+            self._arquivos.clear()
+
+
+def _abrir(db_path):
+    conn = sqlite3.connect(
+        Path(db_path).as_uri() + "?mode=ro", uri=True, check_same_thread=False, cached_statements=STATEMENTS
+    )
+    conn.execute("PRAGMA query_only = ON")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_KIB}")
+    return conn
+
+
+_pool = PoolLeitura()
+
+
+def leitura(db_path):
+    """`with leitura(db_path) as conn:` conexão somente leitura compartilhada"""
+    return _pool.conexao(db_path)
+
+
+def info_pool():
+    return _pool.info()
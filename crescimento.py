@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Crescimento das matrículas por dia, calculado no SQLite.
+
+As extrações do ano viram um rollup diário (a última extração de cada dia),
+e as métricas saem de funções de janela sobre esse rollup: variação para o
+dia anterior com dados, crescimento desde o primeiro dia, média diária e
+ritmo dos últimos 7 e 30 dias (janela RANGE sobre o dia juliano, então dias
+sem extração não distorcem a conta). Só a série diária volta para o Python:
+o tamanho do resultado depende do número de dias, não do de extrações.
+
+Uso: python crescimento.py [periodo]
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+import conexoes
+import periodos
+
+DB_PATH = periodos.DB_PATH
+
+COLUNAS_TAXA = ('variacao', 'crescimento_pct', 'media_diaria', 'ritmo_7d', 'ritmo_30d')
+
+QUERY_CRESCIMENTO = """
+WITH ultimas AS (
+    SELECT id, dia FROM (
+        SELECT id, date(data_extracao) AS dia,
+               ROW_NUMBER() OVER (PARTITION BY date(data_extracao) ORDER BY data_extracao DESC, id DESC) AS ordem
+        FROM 'extrações' WHERE periodo = ?
+    ) WHERE ordem = 1
+),
+diario AS (
+    SELECT u.dia, julianday(u.dia) AS n, SUM(v.vagas) AS vagas, SUM(v.matriculados) AS matriculados
+    FROM ultimas u JOIN vagas v ON v.extracao_id = u.id
+    GROUP BY u.dia
+),
+janelas AS (
+    SELECT dia, n, vagas, matriculados,
+           matriculados - LAG(matriculados) OVER geral AS variacao,
+           FIRST_VALUE(matriculados) OVER geral AS base,
+           n - FIRST_VALUE(n) OVER geral AS dias,
+           FIRST_VALUE(matriculados) OVER ultimos_7 AS base_7, n - FIRST_VALUE(n) OVER ultimos_7 AS dias_7,
+           FIRST_VALUE(matriculados) OVER ultimos_30 AS base_30, n - FIRST_VALUE(n) OVER ultimos_30 AS dias_30
+    FROM diario
+    WINDOW geral AS (ORDER BY n),
+           ultimos_7 AS (ORDER BY n RANGE BETWEEN 7 PRECEDING AND CURRENT ROW),
+           ultimos_30 AS (ORDER BY n RANGE BETWEEN 30 PRECEDING AND CURRENT ROW)
+)
+SELECT dia, vagas, matriculados, variacao,
+       matriculados - base AS crescimento,
+       ROUND(100.0 * (matriculados - base) / NULLIF(base, 0), 1) AS crescimento_pct,
+       CAST(dias AS INTEGER) AS dias,
+       ROUND(1.0 * (matriculados - base) / NULLIF(dias, 0), 1) AS media_diaria,
+       ROUND(1.0 * (matriculados - base_7) / NULLIF(dias_7, 0), 1) AS ritmo_7d,
+       ROUND(1.0 * (matriculados - base_30) / NULLIF(dias_30, 0), 1) AS ritmo_30d
+FROM janelas
+ORDER BY dia
+"""
+
+
+def crescimento_diario(periodo, db_path=DB_PATH):
+    """Uma linha por dia com extração no período: totais, variação, crescimento acumulado e ritmos.
+
+    `variacao` é a diferença para o dia anterior com dados; `media_diaria` e
+    `ritmo_7d`/`ritmo_30d` são matrículas por dia (NaN enquanto a janela tem um dia só).
+    """
+    if not Path(db_path).exists():
+        return pd.DataFrame()
+    with conexoes.leitura(db_path) as conn:
+        df = pd.read_sql_query(QUERY_CRESCIMENTO, conn, params=(str(periodo),))
+    df['dia'] = pd.to_datetime(df['dia'])
+    # Colunas só com NULL (um dia de dados) voltam como object
+    return df.astype({coluna: 'float64' for coluna in COLUNAS_TAXA})
+
+
+def main():
+    periodo = sys.argv[1] if len(sys.argv) > 1 else max(periodos.periodos_disponiveis(), default="")
+    df = crescimento_diario(periodo)
+    if df.empty:
+        print(f"Nenhuma extração de {periodo or '-'} em {DB_PATH.name}")
+        return
+    print(f"Crescimento diário de {periodo} ({len(df)} dias)")
+    print(df.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,28 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 import json
-import sqlite3
-import subprocess
-import os
-import time
 from pathlib import Path
 from datetime import datetime
 
+from classificacao import classificar_dados, nome_curto_unidade, SERIES_ORDEM
+import amostragem
+import artefatos
+import atualizacao
+import compartilhado
+import graficos
+import periodos
+import retencao
+import tabelas
+from tabelas import percentual
+
 # ===== CONSTANTES =====
 BASE_DIR = Path(__file__).parent
 BASE_PATH = BASE_DIR / "output"
 
+# Tema dos gráficos (graficos.TEMAS): o CSS deste dashboard é sempre escuro
+TEMA_GRAFICOS = "executivo"
+
 # Metas por unidade
 METAS_MATRICULAS = {
     "01-BV": 1250, "02-CD": 1200, "03-JG": 850, "04-CDR": 800
@@ -24,6 +33,16 @@ METAS_NOVATOS = {
 META_NOVATOS_TOTAL = 1000
 META_MATRICULAS_TOTAL = sum(METAS_MATRICULAS.values())  # 4100
 
+# Tabela de metas indexada pelo código da unidade (usada em merge vetorizado)
+DF_METAS = pd.DataFrame({
+    'Codigo': list(METAS_MATRICULAS),
+    'Meta': [METAS_MATRICULAS[c] for c in METAS_MATRICULAS],
+    'Meta_Novatos': [METAS_NOVATOS.get(c, 0) for c in METAS_MATRICULAS],
+})
+
+# Posição de cada série na ordem pedagógica (para ordenar tabelas e filtros)
+ORDEM_SERIE = {serie: i for i, serie in enumerate(SERIES_ORDEM)}
+
 # Cores premium
 COLORS = {
     'primary': '#667eea',
@@ -47,12 +66,6 @@ PLOTLY_LAYOUT = dict(
 )
 
 # ===== FUNÇÕES AUXILIARES =====
-def extrair_nome_curto(nome_completo):
-    """Extrai nome curto da unidade: '1 - BV (Boa Viagem)' -> 'Boa Viagem'"""
-    if '(' in str(nome_completo):
-        return nome_completo.split('(')[1].replace(')', '')
-    return str(nome_completo)
-
 def calcular_ocupacao(matriculados, vagas):
     """Calcula taxa de ocupação em porcentagem"""
     return round((matriculados / vagas * 100), 1) if vagas > 0 else 0.0
@@ -84,77 +97,6 @@ def status_meta(atingimento):
     elif atingimento >= 40: return 'Risco'
     return 'Crítico'
 
-def get_meta_unidade(unidade_nome, tipo='matriculas'):
-    """Obtém meta de matrículas ou novatos para uma unidade"""
-    metas = METAS_MATRICULAS if tipo == 'matriculas' else METAS_NOVATOS
-    for codigo, valor in metas.items():
-        if codigo in unidade_nome or any(nome in unidade_nome for nome in
-            ['Boa Viagem', 'Jaboatão', 'Candeias', 'Paulista', 'Janga', 'Cordeiro']):
-            if '01-BV' in codigo and ('01-BV' in unidade_nome or 'Boa Viagem' in unidade_nome):
-                return valor
-            elif '02-CD' in codigo and ('02-CD' in unidade_nome or 'Jaboatão' in unidade_nome or 'Candeias' in unidade_nome):
-                return valor
-            elif '03-JG' in codigo and ('03-JG' in unidade_nome or 'Paulista' in unidade_nome or 'Janga' in unidade_nome):
-                return valor
-            elif '04-CDR' in codigo and ('04-CDR' in unidade_nome or 'Cordeiro' in unidade_nome):
-                return valor
-    return 0
-
-def extrair_turno(turma_nome):
-    """Extrai turno do nome da turma"""
-    turma_lower = turma_nome.lower()
-    if "manhã" in turma_lower or "manha" in turma_lower:
-        return "Manhã"
-    elif "tarde" in turma_lower:
-        return "Tarde"
-    elif "integral" in turma_lower:
-        return "Integral"
-    return "Outro"
-
-def extrair_serie(turma_nome):
-    """Extrai série do nome da turma para cálculo de retenção"""
-    turma_lower = turma_nome.lower()
-    # Normaliza variações: remove espaço antes de º e garante espaço depois
-    import re
-    turma_normalizada = re.sub(r'\s*º\s*', 'º ', turma_lower)
-    # Educação Infantil (ordem V->IV->III->II para evitar substring match)
-    if "infantil v" in turma_lower or "infantil 5" in turma_lower:
-        return "Infantil V"
-    elif "infantil iv" in turma_lower or "infantil 4" in turma_lower:
-        return "Infantil IV"
-    elif "infantil iii" in turma_lower or "infantil 3" in turma_lower:
-        return "Infantil III"
-    elif "infantil ii" in turma_lower or "infantil 2" in turma_lower:
-        return "Infantil II"
-    # Fundamental I (usa turma_normalizada para variações)
-    elif "1º ano" in turma_normalizada or "1° ano" in turma_lower:
-        return "1º ano"
-    elif "2º ano" in turma_normalizada or "2° ano" in turma_lower:
-        return "2º ano"
-    elif "3º ano" in turma_normalizada or "3° ano" in turma_lower:
-        return "3º ano"
-    elif "4º ano" in turma_normalizada or "4° ano" in turma_lower:
-        return "4º ano"
-    elif "5º ano" in turma_normalizada or "5° ano" in turma_lower:
-        return "5º ano"
-    # Fundamental II
-    elif "6º ano" in turma_normalizada or "6° ano" in turma_lower:
-        return "6º ano"
-    elif "7º ano" in turma_normalizada or "7° ano" in turma_lower:
-        return "7º ano"
-    elif "8º ano" in turma_normalizada or "8° ano" in turma_lower:
-        return "8º ano"
-    elif "9º ano" in turma_normalizada or "9° ano" in turma_lower:
-        return "9º ano"
-    # Ensino Médio
-    elif "1ª série" in turma_lower or "1a série" in turma_lower:
-        return "1ª série EM"
-    elif "2ª série" in turma_lower or "2a série" in turma_lower:
-        return "2ª série EM"
-    elif "3ª série" in turma_lower or "3a série" in turma_lower:
-        return "3ª série EM"
-    return None
-
 def gerar_termometro_html(nome, valor_atual, meta, tipo='matriculas'):
     """Gera HTML de termômetro para metas"""
     atingimento = (valor_atual / meta * 100) if meta > 0 else 0
@@ -182,18 +124,19 @@ def gerar_termometro_html(nome, valor_atual, meta, tipo='matriculas'):
     """
 
 # ===== FUNÇÕES DE GRÁFICOS CACHEADAS =====
-@st.cache_data(ttl=300)
-def criar_grafico_ocupacao_unidade(_resumo_str):
-    """Cria gráfico de ocupação por unidade (cached)"""
-    resumo = json.loads(_resumo_str)
+# Specs sem tema (graficos.py) por versão dos dados, as mesmas para todas as sessões
+# (compartilhado.py); `_resumo` não entra na chave
+@compartilhado.recurso
+def criar_grafico_ocupacao_unidade(versao, _resumo):
+    """Spec do gráfico de ocupação por unidade (cached)"""
     df_unidades = pd.DataFrame([
         {
-            'Unidade': u['nome'].split('(')[1].replace(')', '') if '(' in u['nome'] else u['nome'],
+            'Unidade': u['unidade_curta'],
             'Ocupação': round(u['total']['matriculados'] / u['total']['vagas'] * 100, 1),
             'Matriculados': u['total']['matriculados'],
             'Vagas': u['total']['vagas']
         }
-        for u in resumo['unidades']
+        for u in _resumo['unidades']
     ])
 
     fig = go.Figure()
@@ -213,27 +156,23 @@ def criar_grafico_ocupacao_unidade(_resumo_str):
         marker_color=colors,
         text=[f"{o:.1f}%<br>({int(m)})" for o, m in zip(df_unidades['Ocupação'], df_unidades['Matriculados'])],
         textposition='outside',
-        textfont=dict(color='#ffffff', size=12, family='Inter')
+        textfont=dict(size=12, family='Inter')
     ))
 
     fig.update_layout(
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='#a0a0b0', family='Inter, sans-serif'),
         barmode='overlay',
         showlegend=False,
         height=380,
-        yaxis=dict(gridcolor='rgba(102, 126, 234, 0.1)', range=[0, 120], title=''),
-        xaxis=dict(gridcolor='rgba(102, 126, 234, 0.1)', title='')
+        yaxis=dict(range=[0, 120], title=''),
+        xaxis=dict(title='')
     )
-    return fig
+    return graficos.spec(fig)
 
-@st.cache_data(ttl=300)
-def criar_grafico_segmentos(_resumo_str):
-    """Cria gráfico de distribuição por segmento (cached)"""
-    resumo = json.loads(_resumo_str)
+@compartilhado.recurso
+def criar_grafico_segmentos(versao, _resumo):
+    """Spec do gráfico de distribuição por segmento (cached)"""
     segmentos_total = {}
-    for unidade in resumo['unidades']:
+    for unidade in _resumo['unidades']:
         for seg, vals in unidade['segmentos'].items():
             if seg not in segmentos_total:
                 segmentos_total[seg] = {'matriculados': 0, 'vagas': 0}
@@ -245,8 +184,7 @@ def criar_grafico_segmentos(_resumo_str):
         for seg, v in segmentos_total.items()
     ])
 
-    ordem = ['Ed. Infantil', 'Fund. 1', 'Fund. 2', 'Ens. Médio']
-    df_seg['ordem'] = df_seg['Segmento'].map({s: i for i, s in enumerate(ordem)})
+    df_seg['ordem'] = df_seg['Segmento'].map({s: i for i, s in enumerate(tabelas.ORDEM_SEGMENTOS)})
     df_seg = df_seg.sort_values('ordem')
 
     fig = go.Figure()
@@ -265,32 +203,27 @@ def criar_grafico_segmentos(_resumo_str):
         y=df_seg['Matriculados'],
         marker_color='#667eea',
         text=df_seg['Matriculados'],
-        textposition='outside',
-        textfont=dict(color='#ffffff')
+        textposition='outside'
     ))
     fig.update_layout(
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='#a0a0b0', family='Inter, sans-serif'),
         barmode='group',
         showlegend=True,
         legend=dict(orientation='h', y=-0.15, x=0.5, xanchor='center'),
         height=380,
-        yaxis=dict(gridcolor='rgba(102, 126, 234, 0.1)', title=''),
-        xaxis=dict(gridcolor='rgba(102, 126, 234, 0.1)', title='')
+        yaxis=dict(title=''),
+        xaxis=dict(title='')
     )
-    return fig
+    return graficos.spec(fig)
 
-@st.cache_data(ttl=300)
-def criar_heatmap_ocupacao(_resumo_str):
-    """Cria heatmap de ocupação (cached)"""
-    resumo = json.loads(_resumo_str)
-    ordem_seg = ['Ed. Infantil', 'Fund. 1', 'Fund. 2', 'Ens. Médio']
+@compartilhado.recurso
+def criar_heatmap_ocupacao(versao, _resumo):
+    """Spec do heatmap de ocupação (cached)"""
+    ordem_seg = tabelas.ORDEM_SEGMENTOS
 
     matriz = []
     unidades = []
-    for unidade in resumo['unidades']:
-        nome_curto = unidade['nome'].split('(')[1].replace(')', '') if '(' in unidade['nome'] else unidade['nome']
+    for unidade in _resumo['unidades']:
+        nome_curto = unidade['unidade_curta']
         unidades.append(nome_curto)
         row = []
         for seg in ordem_seg:
@@ -311,67 +244,103 @@ def criar_heatmap_ocupacao(_resumo_str):
             [0.7, '#a3e635'], [0.8, '#22c55e'], [1, '#065f46']
         ],
         hovertemplate='Unidade: %{y}<br>Segmento: %{x}<br>Ocupação: %{z:.1f}%<extra></extra>',
-        colorbar=dict(
-            title=dict(text='Ocupação %', font=dict(color='#a0a0b0')),
-            tickfont=dict(color='#a0a0b0')
-        )
+        colorbar=dict(title=dict(text='Ocupação %'))
     ))
     fig.update_layout(
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='#a0a0b0', family='Inter, sans-serif'),
         height=350,
         xaxis=dict(side='bottom'),
         yaxis=dict(autorange='reversed')
     )
-    return fig
+    return graficos.spec(fig)
 
-@st.cache_data(ttl=300)
-def criar_df_turmas_count(_vagas_str):
+@compartilhado.recurso
+def criar_df_turmas_count(versao, _vagas):
     """Cria DataFrame com contagem de turmas por unidade (cached)"""
-    df = criar_df_turmas(_vagas_str)
-    result = df.groupby('Unidade').agg({
+    df = criar_df_turmas(versao, _vagas)
+    result = df.groupby(['Unidade', 'Unidade_curta'], observed=True).agg({
         'Turma': 'count',
         'Vagas': 'sum',
         'Matriculados': 'sum'
     }).reset_index()
-    result.columns = ['Unidade', 'Total Turmas', 'Vagas', 'Matriculados']
-    result['Nome_curto'] = result['Unidade'].apply(extrair_nome_curto)
+    result.columns = ['Unidade', 'Nome_curto', 'Total Turmas', 'Vagas', 'Matriculados']
     return result
 
-@st.cache_data(ttl=300)
-def criar_df_turmas_detail(_vagas_str):
+@compartilhado.recurso
+def criar_df_turmas_detail(versao, _vagas):
     """Cria DataFrame com detalhamento de turmas (cached)"""
-    df = criar_df_turmas(_vagas_str)
-    df['Turno'] = df['Turma'].apply(extrair_turno)
-    result = df.groupby(['Unidade', 'Segmento', 'Turno']).agg({
+    df = criar_df_turmas(versao, _vagas)
+    result = df.groupby(['Unidade_curta', 'Segmento', 'Turno'], observed=True).agg({
         'Turma': 'count',
         'Vagas': 'sum',
         'Matriculados': 'sum'
     }).reset_index()
     result.columns = ['Unidade', 'Segmento', 'Turno', 'Qtd Turmas', 'Vagas', 'Matriculados']
-    result['Unidade'] = result['Unidade'].apply(extrair_nome_curto)
     result['Ocupação %'] = (result['Matriculados'] / result['Vagas'] * 100).round(1)
-    ordem_seg = {'Ed. Infantil': 1, 'Fund. 1': 2, 'Fund. 2': 3, 'Ens. Médio': 4}
-    result['ordem_seg'] = result['Segmento'].map(ordem_seg).fillna(5)
+    ordem_seg = {seg: i for i, seg in enumerate(tabelas.ORDEM_SEGMENTOS, 1)}
+    result['ordem_seg'] = result['Segmento'].astype(str).map(ordem_seg).fillna(5)
     result = result.sort_values(['Unidade', 'ordem_seg', 'Turno'])
     return result
 
 @st.cache_data(ttl=300)
-def criar_df_perf_unidade(_resumo_str):
+def carregar_periodos(versao):
+    """Anos gravados em vagas.db (só leitura: os arquivos de cada ano entram pelo extrator ou `python periodos.py`)"""
+    return periodos.periodos_disponiveis(BASE_PATH / "vagas.db")
+
+@st.cache_data(ttl=300)
+def carregar_comparativo(versao, anos):
+    """Unidade × segmento com as métricas de cada ano (uma consulta em vagas.db)"""
+    return periodos.comparar_periodos(anos, BASE_PATH / "vagas.db")
+
+@st.cache_data(ttl=300)
+def carregar_comparativo_mesmo_dia(versao, periodo, data_extracao):
+    """Snapshot atual contra o ano anterior no mesmo dia da campanha (busca indexada em vagas.db)"""
+    return periodos.comparar_mesmo_dia(periodo, data_extracao, BASE_PATH / "vagas.db")
+
+def tabela_comparativo_unidades(df_comp, metrica, var, anos, cor_cabecalho):
+    """HTML da tabela por unidade: `metrica` em cada ano e a variação do primeiro ao último"""
+    colunas = [f"{metrica}_{ano}" for ano in anos]
+    df_unidade = df_comp.groupby("Unidade", sort=False)[colunas + [var]].sum().reset_index()
+
+    html = "<table style='width:100%; font-size:12px; border-collapse:collapse;'>"
+    html += f"<tr style='background:{cor_cabecalho}; color:white;'><th style='padding:8px;'>Unidade</th>"
+    html += "".join(f"<th>{ano}</th>" for ano in anos) + "<th>Variação</th></tr>"
+    for _, r in df_unidade.iterrows():
+        cor_var = "#10b981" if r[var] >= 0 else "#ef4444"
+        sinal = "+" if r[var] >= 0 else ""
+        html += f"<tr style='background:#1a1a2e;'><td style='padding:6px; color:#e0e0ff;'>{r['Unidade']}</td>"
+        html += "".join(f"<td style='text-align:center; color:#94a3b8;'>{int(r[c])}</td>" for c in colunas[:-1])
+        html += f"<td style='text-align:center; color:#e0e0ff; font-weight:600;'>{int(r[colunas[-1]])}</td>"
+        html += f"<td style='text-align:center; color:{cor_var}; font-weight:600;'>{sinal}{int(r[var])}</td></tr>"
+    # Total
+    totais = df_unidade[colunas + [var]].sum()
+    cor_total = "#10b981" if totais[var] >= 0 else "#ef4444"
+    sinal_t = "+" if totais[var] >= 0 else ""
+    html += "<tr style='background:#2d2d44; font-weight:700;'><td style='padding:8px; color:#ffffff;'>TOTAL</td>"
+    html += "".join(f"<td style='text-align:center; color:#ffffff;'>{int(totais[c])}</td>" for c in colunas)
+    html += f"<td style='text-align:center; color:{cor_total};'>{sinal_t}{int(totais[var])}</td></tr>"
+    html += "</table>"
+    return html
+
+@st.cache_data(ttl=300)
+def carregar_retencao(versao):
+    """Matriz de retenção (retencao.py) da versão dos arquivos de cada ano"""
+    return retencao.carregar_matriz(BASE_PATH)
+
+@compartilhado.recurso
+def criar_df_perf_unidade(versao, _resumo):
     """Cria DataFrame com performance por unidade (cached)"""
-    df = criar_df_resumo(_resumo_str)
-    result = df.groupby('Unidade').agg({
+    df = criar_df_resumo(versao, _resumo)
+    result = df.groupby(['Codigo', 'Unidade', 'Unidade_curta'], observed=True).agg({
         'Vagas': 'sum', 'Matriculados': 'sum', 'Novatos': 'sum', 'Veteranos': 'sum'
     }).reset_index()
-    result['Meta'] = result['Unidade'].apply(lambda x: get_meta_unidade(x, 'matriculas'))
+    result = result.merge(DF_METAS, on='Codigo', how='left')
+    result[['Meta', 'Meta_Novatos']] = result[['Meta', 'Meta_Novatos']].fillna(0).astype(int)
     result['Gap'] = result['Matriculados'] - result['Meta']
-    result['Atingimento'] = (result['Matriculados'] / result['Meta'] * 100).round(1)
-    result['Ocupacao'] = result.apply(lambda r: calcular_ocupacao(r['Matriculados'], r['Vagas']), axis=1)
-    result['Meta_Novatos'] = result['Unidade'].apply(lambda x: get_meta_unidade(x, 'novatos'))
+    result['Atingimento'] = percentual(result['Matriculados'], result['Meta'])
+    result['Ocupacao'] = percentual(result['Matriculados'], result['Vagas'])
     result['Gap_Novatos'] = result['Novatos'] - result['Meta_Novatos']
-    result['Ating_Novatos'] = (result['Novatos'] / result['Meta_Novatos'] * 100).round(1)
-    result['Nome_curto'] = result['Unidade'].apply(extrair_nome_curto)
+    result['Ating_Novatos'] = percentual(result['Novatos'], result['Meta_Novatos'])
+    result = result.rename(columns={'Unidade_curta': 'Nome_curto'})
     return result
 
 # ===== CONFIGURAÇÃO DA PÁGINA =====
@@ -554,187 +523,150 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Carrega dados atuais
-@st.cache_data(ttl=60)
-def carregar_dados():
-    resumo_path = BASE_PATH / "resumo_ultimo.json"
-    vagas_path = BASE_PATH / "vagas_ultimo.json"
-
-    if not resumo_path.exists() or not vagas_path.exists():
-        st.error(f"Arquivos de dados não encontrados em: {BASE_PATH}")
-        st.info("Verifique se os arquivos resumo_ultimo.json e vagas_ultimo.json existem na pasta output/")
-        st.stop()
-
-    with open(resumo_path, encoding='utf-8') as f:
+# Carrega dados atuais (um objeto por versão dos arquivos, compartilhado entre as sessões)
+@compartilhado.recurso
+def carregar_dados(versao):
+    with open(BASE_PATH / "resumo_ultimo.json", encoding='utf-8') as f:
         resumo = json.load(f)
-    with open(vagas_path, encoding='utf-8') as f:
+    with open(BASE_PATH / "vagas_ultimo.json", encoding='utf-8') as f:
         vagas = json.load(f)
+    # Snapshots anteriores à classificação na extração não têm serie/turno/unidade_curta
+    classificar_dados(resumo)
+    classificar_dados(vagas)
     return resumo, vagas
 
 # Carrega histórico do banco
-@st.cache_data(ttl=60)
-def carregar_historico():
+@compartilhado.recurso
+def carregar_historico(versao, periodo):
+    """Séries por extração do ano letivo `periodo` (vagas.db guarda também os anos anteriores)"""
     db_path = BASE_PATH / "vagas.db"
     if not db_path.exists():
         return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), 0
+    return periodos.historico_periodo(periodo, db_path)
 
-    conn = sqlite3.connect(db_path)
-
-    query_unidades = """
-    SELECT e.data_extracao, v.unidade_codigo, v.unidade_nome,
-           SUM(v.vagas) as vagas, SUM(v.matriculados) as matriculados,
-           SUM(v.novatos) as novatos, SUM(v.veteranos) as veteranos,
-           SUM(v.disponiveis) as disponiveis
-    FROM vagas v JOIN 'extrações' e ON v.extracao_id = e.id
-    GROUP BY e.id, v.unidade_codigo ORDER BY e.data_extracao
-    """
-    df_unidades = pd.read_sql_query(query_unidades, conn)
-
-    query_total = """
-    SELECT e.data_extracao, SUM(v.vagas) as vagas, SUM(v.matriculados) as matriculados,
-           SUM(v.novatos) as novatos, SUM(v.veteranos) as veteranos, SUM(v.disponiveis) as disponiveis
-    FROM vagas v JOIN 'extrações' e ON v.extracao_id = e.id
-    GROUP BY e.id ORDER BY e.data_extracao
-    """
-    df_total = pd.read_sql_query(query_total, conn)
-
-    query_segmento = """
-    SELECT e.data_extracao, v.segmento, SUM(v.vagas) as vagas,
-           SUM(v.matriculados) as matriculados, SUM(v.disponiveis) as disponiveis
-    FROM vagas v JOIN 'extrações' e ON v.extracao_id = e.id
-    GROUP BY e.id, v.segmento ORDER BY e.data_extracao
-    """
-    df_segmento = pd.read_sql_query(query_segmento, conn)
-
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM 'extrações'")
-    num_extracoes = cursor.fetchone()[0]
-    conn.close()
-
-    for df in [df_unidades, df_total, df_segmento]:
-        if not df.empty:
-            df['data_extracao'] = pd.to_datetime(df['data_extracao'])
-            df['data_formatada'] = df['data_extracao'].dt.strftime('%d/%m %H:%M')
-
-    return df_unidades, df_total, df_segmento, num_extracoes
-
-@st.cache_data(ttl=300)
-def criar_df_turmas(_vagas_data_str):
+@compartilhado.recurso
+def criar_df_turmas(versao, _vagas):
     """Cria DataFrame com todas as turmas (cached)"""
-    vagas_data = json.loads(_vagas_data_str)
-    rows = []
-    for unidade in vagas_data["unidades"]:
-        for turma in unidade.get("turmas", []):
-            rows.append({
-                "Unidade": unidade["nome"],
-                "Segmento": turma["segmento"],
-                "Turma": turma["turma"],
-                "Vagas": turma["vagas"],
-                "Matriculados": turma["matriculados"],
-                "Novatos": turma["novatos"],
-                "Veteranos": turma["veteranos"],
-                "Pre-matriculados": turma["pre_matriculados"],
-                "Disponiveis": turma["disponiveis"],
-            })
-    return pd.DataFrame(rows)
+    return tabelas.df_turmas(_vagas, strings_arrow=True)
 
-@st.cache_data(ttl=300)
-def criar_df_resumo(_resumo_data_str):
+@compartilhado.recurso
+def criar_df_resumo(versao, _resumo):
     """Cria DataFrame com resumo por unidade/segmento (cached)"""
-    resumo_data = json.loads(_resumo_data_str)
-    rows = []
-    for unidade in resumo_data["unidades"]:
-        for segmento, dados in unidade["segmentos"].items():
-            rows.append({
-                "Unidade": unidade["nome"],
-                "Segmento": segmento,
-                "Vagas": dados["vagas"],
-                "Novatos": dados["novatos"],
-                "Veteranos": dados["veteranos"],
-                "Matriculados": dados["matriculados"],
-                "Disponiveis": dados["disponiveis"],
-            })
-    return pd.DataFrame(rows)
+    return tabelas.df_resumo(_resumo, strings_arrow=True)
 
 def gerar_relatorio_pdf(resumo, df_perf, df_turmas, total):
     """Gera relatório PDF executivo em formato HTML para impressão"""
-    data_hoje = datetime.now().strftime('%d/%m/%Y às %H:%M')
-    data_extracao = resumo['data_extracao'][:16].replace('T', ' ')
+    # Jinja2 e os templates só carregam no primeiro download, não na abertura da página
+    import modelos_html
+    from modelos_html import classes, linhas
+
     ocupacao_geral = round(total['matriculados'] / total['vagas'] * 100, 1) if total['vagas'] > 0 else 0
     ating_meta = round(total['matriculados'] / 4100 * 100, 1)
     ating_novatos = round(total['novatos'] / 1000 * 100, 1)
 
-    html = f"""<!DOCTYPE html><html><head><meta charset="UTF-8"><title>Relatório Executivo - Colégio Elo</title>
-    <style>@page{{size:A4;margin:1.5cm}}body{{font-family:'Segoe UI',Arial,sans-serif;color:#1e3a5f;line-height:1.4;font-size:11px}}
-    .header{{text-align:center;border-bottom:3px solid #667eea;padding-bottom:15px;margin-bottom:20px}}
-    .header h1{{color:#667eea;margin:0;font-size:24px}}.header p{{color:#64748b;margin:5px 0 0 0;font-size:12px}}
-    .kpi-grid{{display:grid;grid-template-columns:repeat(3,1fr);gap:10px;margin-bottom:20px}}
-    .kpi-box{{background:linear-gradient(135deg,#f8fafc 0%,#e2e8f0 100%);padding:12px;border-radius:8px;text-align:center;border-left:4px solid #667eea}}
-    .kpi-box.green{{border-left-color:#10b981}}.kpi-box.yellow{{border-left-color:#f59e0b}}.kpi-box.red{{border-left-color:#ef4444}}
-    .kpi-label{{color:#64748b;font-size:9px;text-transform:uppercase}}.kpi-value{{color:#1e3a5f;font-size:22px;font-weight:700;margin:5px 0}}
-    .kpi-detail{{color:#94a3b8;font-size:9px}}.section{{margin-bottom:20px}}.section h2{{color:#667eea;font-size:14px;border-bottom:2px solid #e2e8f0;padding-bottom:5px;margin-bottom:10px}}
-    table{{width:100%;border-collapse:collapse;font-size:10px}}th{{background:#667eea;color:white;padding:8px 5px;text-align:left}}
-    td{{padding:6px 5px;border-bottom:1px solid #e2e8f0}}tr:nth-child(even){{background:#f8fafc}}
-    .status-ok{{color:#10b981;font-weight:600}}.status-warn{{color:#f59e0b;font-weight:600}}.status-crit{{color:#ef4444;font-weight:600}}
-    .unidade-grid{{display:grid;grid-template-columns:repeat(4,1fr);gap:10px;margin-bottom:15px}}
-    .unidade-box{{background:#f8fafc;padding:10px;border-radius:8px;text-align:center}}
-    .unidade-nome{{font-weight:600;color:#1e3a5f;font-size:11px}}.unidade-ating{{font-size:18px;font-weight:700;margin:5px 0}}
-    .footer{{text-align:center;color:#94a3b8;font-size:9px;margin-top:20px;padding-top:10px;border-top:1px solid #e2e8f0}}
-    @media print{{body{{-webkit-print-color-adjust:exact;print-color-adjust:exact}}}}</style></head><body>
-    <div class="header"><h1>Relatório Executivo - Colégio Elo</h1><p>Período: {resumo['periodo']} | Gerado em: {data_hoje} | Dados de: {data_extracao}</p></div>
-    <div class="kpi-grid">
-    <div class="kpi-box {'green' if ocupacao_geral >= 80 else 'yellow' if ocupacao_geral >= 60 else 'red'}"><div class="kpi-label">Ocupação Geral</div><div class="kpi-value">{ocupacao_geral:.1f}%</div><div class="kpi-detail">{total['matriculados']:,} / {total['vagas']:,} vagas</div></div>
-    <div class="kpi-box {'green' if ating_meta >= 100 else 'yellow' if ating_meta >= 80 else 'red'}"><div class="kpi-label">Meta Matrículas (4.100)</div><div class="kpi-value">{ating_meta}%</div><div class="kpi-detail">{total['matriculados']:,} alunos ({total['matriculados'] - 4100:+,})</div></div>
-    <div class="kpi-box {'green' if ating_novatos >= 100 else 'yellow' if ating_novatos >= 80 else 'red'}"><div class="kpi-label">Meta Novatos (1.000)</div><div class="kpi-value">{ating_novatos}%</div><div class="kpi-detail">{total['novatos']:,} novatos ({total['novatos'] - 1000:+,})</div></div>
-    </div>
-    <div class="kpi-grid">
-    <div class="kpi-box"><div class="kpi-label">Total Matriculados</div><div class="kpi-value">{total['matriculados']:,}</div></div>
-    <div class="kpi-box"><div class="kpi-label">Veteranos</div><div class="kpi-value">{total['veteranos']:,}</div></div>
-    <div class="kpi-box"><div class="kpi-label">Vagas Disponíveis</div><div class="kpi-value">{total['disponiveis']:,}</div></div>
-    </div>
-    <div class="section"><h2>Atingimento por Unidade</h2><div class="unidade-grid">"""
-
-    for _, row in df_perf.iterrows():
-        cor = '#10b981' if row['Gap'] >= 0 else '#f59e0b' if row['Atingimento'] >= 80 else '#ef4444'
-        sinal = '+' if row['Gap'] >= 0 else ''
-        sinal_nov = '+' if row['Gap_Novatos'] >= 0 else ''
-        html += f"""<div class="unidade-box" style="border-left:4px solid {cor};"><div class="unidade-nome">{row['Nome_curto']}</div><div class="unidade-ating" style="color:{cor};">{row['Atingimento']:.1f}%</div><div style="font-size:9px;color:#64748b;">Matr: {int(row['Matriculados'])} / {int(row['Meta'])} ({sinal}{int(row['Gap'])})<br>Nov: {int(row['Novatos'])} / {int(row['Meta_Novatos'])} ({sinal_nov}{int(row['Gap_Novatos'])})</div></div>"""
-
-    html += """</div></div><div class="section"><h2>Performance por Unidade</h2><table><thead><tr><th>Unidade</th><th>Vagas</th><th>Matr.</th><th>Ocupação</th><th>Ating.</th><th>Novatos</th><th>Meta Nov.</th><th>Vet.</th><th>Disp.</th></tr></thead><tbody>"""
-
-    for _, row in df_perf.iterrows():
-        status_class = 'status-ok' if row['Atingimento'] >= 100 else 'status-warn' if row['Atingimento'] >= 80 else 'status-crit'
-        html += f"""<tr><td><strong>{row['Nome_curto']}</strong></td><td>{int(row['Vagas'])}</td><td>{int(row['Matriculados'])}</td><td>{row['Ocupacao']:.1f}%</td><td class="{status_class}">{row['Atingimento']:.1f}%</td><td>{int(row['Novatos'])}</td><td>{int(row['Meta_Novatos'])}</td><td>{int(row['Veteranos'])}</td><td>{int(row['Vagas']) - int(row['Matriculados'])}</td></tr>"""
-
-    html += """</tbody></table></div>"""
+    def classe_kpi(valor, verde, amarelo):
+        return 'green' if valor >= verde else 'yellow' if valor >= amarelo else 'red'
 
+    cor = (
+        pd.Series('#ef4444', index=df_perf.index)
+        .mask(df_perf['Atingimento'] >= 80, '#f59e0b')
+        .mask(df_perf['Gap'] >= 0, '#10b981')
+    )
     turmas_lotadas = df_turmas[df_turmas['Ocupação %'] >= 95].head(10)
-    if len(turmas_lotadas) > 0:
-        html += """<div class="section"><h2>Turmas Lotadas (≥95%)</h2><table><thead><tr><th>Unidade</th><th>Turma</th><th>Ocupação</th><th>Matr.</th><th>Vagas</th></tr></thead><tbody>"""
-        for _, t in turmas_lotadas.iterrows():
-            unidade_curta = t['Unidade'].split('(')[1].replace(')', '') if '(' in t['Unidade'] else t['Unidade']
-            html += f"""<tr><td>{unidade_curta}</td><td>{t['Turma']}</td><td class="status-crit">{t['Ocupação %']:.0f}%</td><td>{int(t['Matriculados'])}</td><td>{int(t['Vagas'])}</td></tr>"""
-        html += """</tbody></table></div>"""
-
     turmas_vazias = df_turmas[df_turmas['Ocupação %'] < 50].head(10)
-    if len(turmas_vazias) > 0:
-        html += """<div class="section"><h2>Turmas com Oportunidade (<50%)</h2><table><thead><tr><th>Unidade</th><th>Turma</th><th>Ocupação</th><th>Disponíveis</th></tr></thead><tbody>"""
-        for _, t in turmas_vazias.iterrows():
-            unidade_curta = t['Unidade'].split('(')[1].replace(')', '') if '(' in t['Unidade'] else t['Unidade']
-            html += f"""<tr><td>{unidade_curta}</td><td>{t['Turma']}</td><td class="status-warn">{t['Ocupação %']:.0f}%</td><td>{int(t['Disponiveis'])}</td></tr>"""
-        html += """</tbody></table></div>"""
 
-    html += """<div class="footer"><p>Colégio Elo - Relatório Executivo Confidencial</p><p>Para imprimir: Ctrl+P (ou Cmd+P) → Salvar como PDF</p></div></body></html>"""
-    return html.replace(",", ".")
+    return modelos_html.renderizar(
+        "relatorio_executivo.html",
+        periodo=resumo['periodo'],
+        gerado_em=datetime.now().strftime('%d/%m/%Y às %H:%M'),
+        data_extracao=resumo['data_extracao'][:16].replace('T', ' '),
+        total=total,
+        ocupacao_geral=ocupacao_geral,
+        ating_meta=ating_meta,
+        ating_novatos=ating_novatos,
+        classe_ocupacao=classe_kpi(ocupacao_geral, 80, 60),
+        classe_meta=classe_kpi(ating_meta, 100, 80),
+        classe_novatos=classe_kpi(ating_novatos, 100, 80),
+        cards=linhas(
+            df_perf['Nome_curto'], cor, df_perf['Atingimento'], df_perf['Matriculados'].astype(int),
+            df_perf['Meta'].astype(int), df_perf['Gap'].astype(int), df_perf['Novatos'].astype(int),
+            df_perf['Meta_Novatos'].astype(int), df_perf['Gap_Novatos'].astype(int),
+        ),
+        performance=linhas(
+            df_perf['Nome_curto'], df_perf['Vagas'].astype(int), df_perf['Matriculados'].astype(int),
+            df_perf['Ocupacao'], df_perf['Atingimento'],
+            classes(df_perf['Atingimento'], [(100, 'status-ok'), (80, 'status-warn')], padrao='status-crit'),
+            df_perf['Novatos'].astype(int), df_perf['Meta_Novatos'].astype(int), df_perf['Veteranos'].astype(int),
+            (df_perf['Vagas'] - df_perf['Matriculados']).astype(int),
+        ),
+        lotadas=linhas(
+            turmas_lotadas['Unidade_curta'], turmas_lotadas['Turma'], turmas_lotadas['Ocupação %'],
+            turmas_lotadas['Matriculados'].astype(int), turmas_lotadas['Vagas'].astype(int),
+        ),
+        vazias=linhas(
+            turmas_vazias['Unidade_curta'], turmas_vazias['Turma'], turmas_vazias['Ocupação %'],
+            turmas_vazias['Disponiveis'].astype(int),
+        ),
+    )
+
+# Extração do botão "Atualizar": um subprocesso por servidor, acompanhado por todas as sessões que clicaram
+@st.cache_resource
+def obter_atualizacao():
+    return atualizacao.AtualizacaoDados()
+
+
+@st.fragment(run_every=2)
+def acompanhar_atualizacao():
+    """Progresso da extração em segundo plano; troca para os dados novos assim que eles são gravados"""
+    estado = obter_atualizacao().status()
+    if estado is None:
+        st.session_state['acompanhar_atualizacao'] = False
+        st.rerun()
+    # Sem evento "gravado" quando os dados vieram de outra extração (reaproveitados): troca ao concluir
+    concluida = estado['estado'] == atualizacao.CONCLUIDA
+    if (estado['gravado'] or concluida) and st.session_state.get('atualizacao_aplicada') != estado['id']:
+        st.session_state['atualizacao_aplicada'] = estado['id']
+        # Sem limpar caches: os dados são versionados pelos arquivos (compartilhado.versao_arquivos)
+        st.rerun()
+
+    if estado['estado'] == atualizacao.RODANDO:
+        ultimo = estado['eventos'][-1] if estado['eventos'] else {'mensagem': 'Iniciando extração do SIGA...'}
+        st.progress(
+            ultimo.get('etapa', 0) / ultimo.get('etapas', 1),
+            text=f"⏳ {ultimo['mensagem']} ({estado['segundos']}s)"
+        )
+        lidas = [f"{e['unidade']}: {e['turmas']} turmas" for e in estado['eventos'] if e['fase'] == 'turmas']
+        if lidas:
+            st.caption(" · ".join(lidas))
+    elif concluida:
+        st.session_state['acompanhar_atualizacao'] = False
+        st.session_state['aviso_atualizacao'] = estado['reaproveitado'] or True
+        st.rerun()
+    else:
+        st.error("⏰ Timeout: extração demorou mais de 10 minutos" if estado['interrompida'] else "❌ Erro na extração")
+        with st.expander("Ver detalhes do erro"):
+            st.code(estado['log'] or "Sem detalhes")
+        if st.button("Fechar", key="fechar_atualizacao"):
+            st.session_state['acompanhar_atualizacao'] = False
+            st.rerun()
+
+# Fora do carregar_dados: o recurso compartilhado não mexe na página de nenhuma sessão
+if not (BASE_PATH / "resumo_ultimo.json").exists() or not (BASE_PATH / "vagas_ultimo.json").exists():
+    st.error(f"Arquivos de dados não encontrados em: {BASE_PATH}")
+    st.info("Verifique se os arquivos resumo_ultimo.json e vagas_ultimo.json existem na pasta output/")
+    st.stop()
+
+# Versão dos dados: muda quando a extração grava o snapshot ou vagas.db
+versao_dados = compartilhado.versao_arquivos(
+    BASE_PATH / "resumo_ultimo.json", BASE_PATH / "vagas_ultimo.json", BASE_PATH / "vagas.db"
+)
 
 try:
-    resumo, vagas = carregar_dados()
-    df_hist_unidades, df_hist_total, df_hist_segmento, num_extracoes = carregar_historico()
-    # Passa como JSON string para permitir caching
-    vagas_str = json.dumps(vagas)
-    resumo_str = json.dumps(resumo)
-    df_turmas_all = criar_df_turmas(vagas_str)
-    df_resumo_all = criar_df_resumo(resumo_str)
+    # Objetos compartilhados entre as sessões: somente leitura (filtros trabalham em cópias)
+    resumo, vagas = carregar_dados(versao_dados)
+    df_hist_unidades, df_hist_total, df_hist_segmento, num_extracoes = carregar_historico(versao_dados, resumo["periodo"])
+    df_turmas_all = criar_df_turmas(versao_dados, vagas)
+    df_resumo_all = criar_df_resumo(versao_dados, resumo)
 except FileNotFoundError:
     st.error("Arquivos de dados não encontrados. Execute a extração primeiro.")
     st.stop()
@@ -755,8 +687,7 @@ unidade_selecionada = st.sidebar.selectbox("Unidade", unidades_lista)
 segmentos_lista = ["Todos"] + list(df_resumo_all["Segmento"].unique())
 segmento_selecionado = st.sidebar.selectbox("Segmento", segmentos_lista)
 
-# Filtro de Turno (usa função global extrair_turno)
-df_turmas_all["Turno"] = df_turmas_all["Turma"].apply(extrair_turno)
+# Filtro de Turno (classificado na extração)
 turnos_lista = ["Todos"] + list(df_turmas_all["Turno"].unique())
 turno_selecionado = st.sidebar.selectbox("Turno", turnos_lista)
 
@@ -786,10 +717,12 @@ st.sidebar.divider()
 # ===== SIDEBAR - EXPORTAR =====
 st.sidebar.header("Exportar")
 
-csv = df_turmas_all.to_csv(index=False).encode('utf-8')
+# CSV gerado só no clique e reaproveitado por versão do snapshot (artefatos.py)
 st.sidebar.download_button(
     label="Baixar CSV completo",
-    data=csv,
+    data=lambda: artefatos.obter_artefato(
+        "turmas.csv", artefatos.versao_snapshot(resumo), lambda: df_turmas_all.to_csv(index=False)
+    ),
     file_name=f"vagas_colegio_elo_{resumo['data_extracao'][:10]}.csv",
     mime="text/csv",
 )
@@ -823,49 +756,21 @@ with col_btn:
         if is_cloud:
             st.warning("⚠️ Atualização disponível apenas na versão local. Este dashboard online exibe dados estáticos.")
         else:
-            status_container = st.empty()
-            status_container.info("⏳ Iniciando extração do SIGA...")
-
-            try:
-                # Tenta encontrar o Python do venv
-                venv_python = BASE_DIR / "venv" / "bin" / "python"
-                if not venv_python.exists():
-                    venv_python = "python3"  # Fallback para python do sistema
-
-                extrator_script = BASE_DIR / "extrair_vagas.py"
-
-                if not extrator_script.exists():
-                    status_container.error(f"Script não encontrado: {extrator_script}")
-                else:
-                    status_container.info("⏳ Extraindo dados do SIGA... (pode levar alguns minutos)")
-
-                    result = subprocess.run(
-                        [str(venv_python), str(extrator_script)],
-                        capture_output=True,
-                        text=True,
-                        timeout=600,
-                        cwd=str(BASE_DIR),
-                        env={**os.environ, "PYTHONUNBUFFERED": "1"}
-                    )
-
-                    if result.returncode == 0:
-                        status_container.success("✅ Dados atualizados com sucesso!")
-                        st.cache_data.clear()
-                        import time
-                        time.sleep(1)
-                        st.rerun()
-                    else:
-                        status_container.error(f"❌ Erro na extração")
-                        with st.expander("Ver detalhes do erro"):
-                            st.code(result.stderr or result.stdout or "Sem detalhes")
-
-            except subprocess.TimeoutExpired:
-                status_container.error("⏰ Timeout: extração demorou mais de 10 minutos")
-            except Exception as e:
-                status_container.error(f"❌ Erro: {str(e)}")
-                with st.expander("Ver detalhes"):
-                    import traceback
-                    st.code(traceback.format_exc())
+            # Python do venv (ou o do sistema); a extração roda em segundo plano e o progresso aparece abaixo
+            venv_python = BASE_DIR / "venv" / "bin" / "python"
+            if not venv_python.exists():
+                venv_python = "python3"
+            if not obter_atualizacao().iniciar([venv_python, extrator_script], BASE_DIR):
+                st.toast("Já existe uma extração em andamento")
+            st.session_state['acompanhar_atualizacao'] = True
+
+if st.session_state.get('acompanhar_atualizacao'):
+    acompanhar_atualizacao()
+elif aviso := st.session_state.pop('aviso_atualizacao', False):
+    if aviso is True:
+        st.success("✅ Dados atualizados com sucesso!")
+    else:
+        st.info(f"ℹ️ {aviso}")
 
 # Info bar
 st.markdown(f"""
@@ -925,13 +830,13 @@ col_left, col_right = st.columns(2)
 
 with col_left:
     st.markdown("<h3 style='color: #f1f5f9; font-weight: 600;'>Ocupação por Unidade</h3>", unsafe_allow_html=True)
-    fig1 = criar_grafico_ocupacao_unidade(resumo_str)
-    st.plotly_chart(fig1, use_container_width=True)
+    fig1 = criar_grafico_ocupacao_unidade(versao_dados, resumo)
+    st.plotly_chart(graficos.aplicar_tema(fig1, TEMA_GRAFICOS), use_container_width=True)
 
 with col_right:
     st.markdown("<h3 style='color: #f1f5f9; font-weight: 600;'>Distribuição por Segmento</h3>", unsafe_allow_html=True)
-    fig2 = criar_grafico_segmentos(resumo_str)
-    st.plotly_chart(fig2, use_container_width=True)
+    fig2 = criar_grafico_segmentos(versao_dados, resumo)
+    st.plotly_chart(graficos.aplicar_tema(fig2, TEMA_GRAFICOS), use_container_width=True)
 
 st.markdown("<br>", unsafe_allow_html=True)
 
@@ -939,7 +844,7 @@ st.markdown("<br>", unsafe_allow_html=True)
 st.markdown("<h3 style='color: #f1f5f9; font-weight: 600;'>💡 Insights Executivos</h3>", unsafe_allow_html=True)
 
 # Calcula métricas por unidade com metas (cached)
-df_perf_unidade = criar_df_perf_unidade(resumo_str)
+df_perf_unidade = criar_df_perf_unidade(versao_dados, resumo)
 
 # Calcula totais (usa constantes globais)
 gap_total = total['matriculados'] - META_MATRICULAS_TOTAL
@@ -1068,236 +973,172 @@ st.markdown("""
 <h3 style='color: #ffffff; font-weight: 700;'>⚠️ Alertas de Ação por Unidade</h3>
 """, unsafe_allow_html=True)
 
-# Seletor de quantidade
-col_config1, col_config2 = st.columns([3, 1])
-with col_config2:
-    qtd_alertas = st.selectbox("Exibir", [5, 10, 15, 20, "Todos"], index=0, key="qtd_alertas")
-
-# Turmas com ocupação calculada (usa funções globais)
-turmas_criticas = df_turmas_all.copy()
-turmas_criticas['Ocupacao'] = turmas_criticas.apply(lambda r: calcular_ocupacao(r['Matriculados'], r['Vagas']), axis=1)
-turmas_criticas['Unidade_curta'] = turmas_criticas['Unidade'].apply(extrair_nome_curto)
-
-# Tabs por unidade
-unidades_unicas = sorted(turmas_criticas['Unidade_curta'].unique())
-tabs_alertas = st.tabs(unidades_unicas)
-
-for i, tab in enumerate(tabs_alertas):
-    with tab:
-        unidade = unidades_unicas[i]
-        df_unidade = turmas_criticas[turmas_criticas['Unidade_curta'] == unidade]
-
-        # Turmas lotadas e vazias desta unidade
-        lotadas = df_unidade[df_unidade['Ocupacao'] >= 95].sort_values('Ocupacao', ascending=False)
-        vazias = df_unidade[df_unidade['Ocupacao'] < 50].sort_values('Ocupacao')
-
-        # Limita quantidade
-        limite = None if qtd_alertas == "Todos" else qtd_alertas
-        lotadas_exibir = lotadas if limite is None else lotadas.head(limite)
-        vazias_exibir = vazias if limite is None else vazias.head(limite)
-
-        col_a1, col_a2 = st.columns(2)
-
-        with col_a1:
-            st.markdown(f"""
-            <div style='background: rgba(239, 68, 68, 0.15); padding: 1rem; border-radius: 12px; border-left: 5px solid #ef4444; margin-bottom: 0.8rem;'>
-                <p style='color: #ffffff; font-weight: 700; font-size: 1rem; margin: 0;'>🔴 TURMAS LOTADAS (≥95%)</p>
-                <p style='color: #fca5a5; font-size: 0.85rem; margin: 0.3rem 0 0 0;'>{len(lotadas)} turmas encontradas</p>
-            </div>
-            """, unsafe_allow_html=True)
-
-            if len(lotadas_exibir) > 0:
-                for _, t in lotadas_exibir.iterrows():
-                    seg_nome = t['Segmento'] if len(str(t['Segmento'])) > 4 else t['Segmento']
-                    st.markdown(f"""
-                    <div style='background: rgba(30, 41, 59, 0.9); padding: 0.7rem 1rem; border-radius: 10px; margin-bottom: 0.4rem; border: 1px solid rgba(239, 68, 68, 0.3);'>
-                        <div style='display: flex; justify-content: space-between; align-items: center;'>
-                            <span style='color: #ffffff; font-weight: 600;'>{t['Turma']}</span>
-                            <span style='color: #ef4444; font-weight: 800; font-size: 1.1rem;'>{t['Ocupacao']:.0f}% <span style='font-size: 0.75rem; color: #fca5a5;'>({int(t['Matriculados'])} alunos)</span></span>
+@st.fragment
+def fragmento_alertas_unidade():
+    """Alertas por unidade; trocar a quantidade exibida reexecuta só este trecho"""
+    # Seletor de quantidade
+    col_config1, col_config2 = st.columns([3, 1])
+    with col_config2:
+        qtd_alertas = st.selectbox("Exibir", [5, 10, 15, 20, "Todos"], index=0, key="qtd_alertas")
+
+    # Turmas com ocupação calculada (usa funções globais)
+    turmas_criticas = df_turmas_all.copy()
+    turmas_criticas['Ocupacao'] = turmas_criticas.apply(lambda r: calcular_ocupacao(r['Matriculados'], r['Vagas']), axis=1)
+
+    # Tabs por unidade
+    unidades_unicas = sorted(turmas_criticas['Unidade_curta'].unique())
+    tabs_alertas = st.tabs(unidades_unicas)
+
+    for i, tab in enumerate(tabs_alertas):
+        with tab:
+            unidade = unidades_unicas[i]
+            df_unidade = turmas_criticas[turmas_criticas['Unidade_curta'] == unidade]
+
+            # Turmas lotadas e vazias desta unidade
+            lotadas = df_unidade[df_unidade['Ocupacao'] >= 95].sort_values('Ocupacao', ascending=False)
+            vazias = df_unidade[df_unidade['Ocupacao'] < 50].sort_values('Ocupacao')
+
+            # Limita quantidade
+            limite = None if qtd_alertas == "Todos" else qtd_alertas
+            lotadas_exibir = lotadas if limite is None else lotadas.head(limite)
+            vazias_exibir = vazias if limite is None else vazias.head(limite)
+
+            col_a1, col_a2 = st.columns(2)
+
+            with col_a1:
+                st.markdown(f"""
+                <div style='background: rgba(239, 68, 68, 0.15); padding: 1rem; border-radius: 12px; border-left: 5px solid #ef4444; margin-bottom: 0.8rem;'>
+                    <p style='color: #ffffff; font-weight: 700; font-size: 1rem; margin: 0;'>🔴 TURMAS LOTADAS (≥95%)</p>
+                    <p style='color: #fca5a5; font-size: 0.85rem; margin: 0.3rem 0 0 0;'>{len(lotadas)} turmas encontradas</p>
+                </div>
+                """, unsafe_allow_html=True)
+
+                if len(lotadas_exibir) > 0:
+                    for _, t in lotadas_exibir.iterrows():
+                        seg_nome = t['Segmento'] if len(str(t['Segmento'])) > 4 else t['Segmento']
+                        st.markdown(f"""
+                        <div style='background: rgba(30, 41, 59, 0.9); padding: 0.7rem 1rem; border-radius: 10px; margin-bottom: 0.4rem; border: 1px solid rgba(239, 68, 68, 0.3);'>
+                            <div style='display: flex; justify-content: space-between; align-items: center;'>
+                                <span style='color: #ffffff; font-weight: 600;'>{t['Turma']}</span>
+                                <span style='color: #ef4444; font-weight: 800; font-size: 1.1rem;'>{t['Ocupacao']:.0f}% <span style='font-size: 0.75rem; color: #fca5a5;'>({int(t['Matriculados'])} alunos)</span></span>
+                            </div>
+                            <p style='color: #94a3b8; font-size: 0.8rem; margin: 0.3rem 0 0 0;'>{seg_nome} • {int(t['Matriculados'])}/{int(t['Vagas'])} vagas preenchidas</p>
                         </div>
-                        <p style='color: #94a3b8; font-size: 0.8rem; margin: 0.3rem 0 0 0;'>{seg_nome} • {int(t['Matriculados'])}/{int(t['Vagas'])} vagas preenchidas</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                if limite and len(lotadas) > limite:
-                    st.caption(f"... e mais {len(lotadas) - limite} turmas")
-            else:
-                st.markdown("<p style='color: #10b981; font-size: 0.9rem; padding: 0.5rem;'>✅ Nenhuma turma lotada nesta unidade</p>", unsafe_allow_html=True)
+                        """, unsafe_allow_html=True)
+                    if limite and len(lotadas) > limite:
+                        st.caption(f"... e mais {len(lotadas) - limite} turmas")
+                else:
+                    st.markdown("<p style='color: #10b981; font-size: 0.9rem; padding: 0.5rem;'>✅ Nenhuma turma lotada nesta unidade</p>", unsafe_allow_html=True)
 
-        with col_a2:
-            st.markdown(f"""
-            <div style='background: rgba(251, 191, 36, 0.15); padding: 1rem; border-radius: 12px; border-left: 5px solid #f59e0b; margin-bottom: 0.8rem;'>
-                <p style='color: #ffffff; font-weight: 700; font-size: 1rem; margin: 0;'>🟡 BAIXA OCUPAÇÃO GERAL (<50%)</p>
-                <p style='color: #fcd34d; font-size: 0.85rem; margin: 0.3rem 0 0 0;'>{len(vazias)} turmas - foco em captação</p>
-            </div>
-            """, unsafe_allow_html=True)
-
-            if len(vazias_exibir) > 0:
-                for _, t in vazias_exibir.iterrows():
-                    vagas_disp = int(t['Vagas'] - t['Matriculados'])
-                    seg_nome = t['Segmento'] if len(str(t['Segmento'])) > 4 else t['Segmento']
-                    st.markdown(f"""
-                    <div style='background: rgba(30, 41, 59, 0.9); padding: 0.7rem 1rem; border-radius: 10px; margin-bottom: 0.4rem; border: 1px solid rgba(251, 191, 36, 0.3);'>
-                        <div style='display: flex; justify-content: space-between; align-items: center;'>
-                            <span style='color: #ffffff; font-weight: 600;'>{t['Turma']}</span>
-                            <span style='color: #f59e0b; font-weight: 800; font-size: 1.1rem;'>{t['Ocupacao']:.0f}% <span style='font-size: 0.75rem; color: #fcd34d;'>({int(t['Matriculados'])} alunos)</span></span>
+            with col_a2:
+                st.markdown(f"""
+                <div style='background: rgba(251, 191, 36, 0.15); padding: 1rem; border-radius: 12px; border-left: 5px solid #f59e0b; margin-bottom: 0.8rem;'>
+                    <p style='color: #ffffff; font-weight: 700; font-size: 1rem; margin: 0;'>🟡 BAIXA OCUPAÇÃO GERAL (<50%)</p>
+                    <p style='color: #fcd34d; font-size: 0.85rem; margin: 0.3rem 0 0 0;'>{len(vazias)} turmas - foco em captação</p>
+                </div>
+                """, unsafe_allow_html=True)
+
+                if len(vazias_exibir) > 0:
+                    for _, t in vazias_exibir.iterrows():
+                        vagas_disp = int(t['Vagas'] - t['Matriculados'])
+                        seg_nome = t['Segmento'] if len(str(t['Segmento'])) > 4 else t['Segmento']
+                        st.markdown(f"""
+                        <div style='background: rgba(30, 41, 59, 0.9); padding: 0.7rem 1rem; border-radius: 10px; margin-bottom: 0.4rem; border: 1px solid rgba(251, 191, 36, 0.3);'>
+                            <div style='display: flex; justify-content: space-between; align-items: center;'>
+                                <span style='color: #ffffff; font-weight: 600;'>{t['Turma']}</span>
+                                <span style='color: #f59e0b; font-weight: 800; font-size: 1.1rem;'>{t['Ocupacao']:.0f}% <span style='font-size: 0.75rem; color: #fcd34d;'>({int(t['Matriculados'])} alunos)</span></span>
+                            </div>
+                            <p style='color: #94a3b8; font-size: 0.8rem; margin: 0.3rem 0 0 0;'>{seg_nome} • {vagas_disp} vagas disponíveis</p>
                         </div>
-                        <p style='color: #94a3b8; font-size: 0.8rem; margin: 0.3rem 0 0 0;'>{seg_nome} • {vagas_disp} vagas disponíveis</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                if limite and len(vazias) > limite:
-                    st.caption(f"... e mais {len(vazias) - limite} turmas")
-            else:
-                st.markdown("<p style='color: #10b981; font-size: 0.9rem; padding: 0.5rem;'>✅ Todas as turmas acima de 50%</p>", unsafe_allow_html=True)
+                        """, unsafe_allow_html=True)
+                    if limite and len(vazias) > limite:
+                        st.caption(f"... e mais {len(vazias) - limite} turmas")
+                else:
+                    st.markdown("<p style='color: #10b981; font-size: 0.9rem; padding: 0.5rem;'>✅ Todas as turmas acima de 50%</p>", unsafe_allow_html=True)
 
-st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown("<br>", unsafe_allow_html=True)
+
+
+fragmento_alertas_unidade()
 
-# ===== COMPARATIVO 2025 vs 2026 =====
-st.markdown("<h3 style='color: #f1f5f9; font-weight: 600;'>📊 Comparativo 2025 vs 2026 - Novatos e Veteranos</h3>", unsafe_allow_html=True)
-
-# Tenta carregar dados de 2025
-resumo_2025_path = Path(__file__).parent / "output" / "resumo_2025.json"
-if resumo_2025_path.exists():
-    with open(resumo_2025_path, "r", encoding="utf-8") as f:
-        resumo_2025 = json.load(f)
-
-    # Prepara dados para comparação
-    dados_comp = []
-    segmentos_validos = ["Ed. Infantil", "Fund. 1", "Fund. 2", "Ens. Médio"]
-
-    for unidade_2026 in resumo.get("unidades", []):
-        codigo = unidade_2026["codigo"]
-        nome_curto = codigo.split("-")[1] if "-" in codigo else codigo
-
-        # Encontra mesma unidade em 2025
-        unidade_2025 = next((u for u in resumo_2025.get("unidades", []) if u["codigo"] == codigo), None)
-
-        for seg in segmentos_validos:
-            dados_2026 = unidade_2026.get("segmentos", {}).get(seg, {})
-            dados_2025_seg = unidade_2025.get("segmentos", {}).get(seg, {}) if unidade_2025 else {}
-
-            nov_2026 = dados_2026.get("novatos", 0)
-            vet_2026 = dados_2026.get("veteranos", 0)
-            matr_2026 = dados_2026.get("matriculados", 0)
-
-            nov_2025 = dados_2025_seg.get("novatos", 0)
-            vet_2025 = dados_2025_seg.get("veteranos", 0)
-            matr_2025 = dados_2025_seg.get("matriculados", 0)
-
-            dados_comp.append({
-                "Unidade": nome_curto,
-                "Segmento": seg,
-                "Novatos_2025": nov_2025,
-                "Novatos_2026": nov_2026,
-                "Var_Nov": nov_2026 - nov_2025,
-                "Var_Nov_Pct": ((nov_2026 - nov_2025) / nov_2025 * 100) if nov_2025 > 0 else 0,
-                "Veteranos_2025": vet_2025,
-                "Veteranos_2026": vet_2026,
-                "Var_Vet": vet_2026 - vet_2025,
-                "Var_Vet_Pct": ((vet_2026 - vet_2025) / vet_2025 * 100) if vet_2025 > 0 else 0,
-                "Total_2025": matr_2025,
-                "Total_2026": matr_2026,
-                "Var_Total": matr_2026 - matr_2025,
-            })
-
-    df_comp = pd.DataFrame(dados_comp)
+# ===== COMPARATIVO ENTRE ANOS =====
+st.markdown("<h3 style='color: #f1f5f9; font-weight: 600;'>📊 Comparativo entre Anos - Novatos e Veteranos</h3>", unsafe_allow_html=True)
+
+# Todos os anos ficam em vagas.db (periodos.py), versionado em versao_dados; a retenção usa os arquivos de cada ano
+arquivos_anos = retencao.arquivos_por_ano(BASE_PATH, resumo["periodo"])
+versao_anos = retencao.versao_dados(arquivos_anos)
+anos_disponiveis = carregar_periodos(versao_dados)
+anos_comp, df_comp = [], None
+if len(anos_disponiveis) >= 2:
+    base_comp = st.radio(
+        "Base de comparação", ["Última extração de cada ano", "Mesmo dia da campanha"],
+        horizontal=True, key="base_comparativo",
+    )
+    if base_comp == "Mesmo dia da campanha":
+        # Matrícula é cumulativa: compara com o ano anterior no mesmo ponto da campanha
+        ano_anterior = str(int(resumo["periodo"]) - 1)
+        df_comp, extracao_atual, extracao_anterior = carregar_comparativo_mesmo_dia(
+            versao_dados, resumo["periodo"], resumo["data_extracao"]
+        )
+        dia_atual = periodos.dia_campanha(resumo["periodo"], resumo["data_extracao"])
+        if df_comp is None:
+            st.info(f"📋 Não há extração de {ano_anterior} até o dia {dia_atual} da campanha "
+                    f"(início em {periodos.inicio_campanha(ano_anterior):%d/%m/%Y}).")
+        else:
+            anos_comp = [ano_anterior, str(resumo["periodo"])]
+            data_anterior = datetime.fromisoformat(extracao_anterior[1])
+            st.caption(f"Dia {dia_atual} da campanha de {resumo['periodo']} vs. extração de "
+                       f"{data_anterior:%d/%m/%Y} (dia {extracao_anterior[2]} da campanha de {ano_anterior})")
+    else:
+        anos_comp = sorted(st.multiselect(
+            "Anos comparados", anos_disponiveis, default=anos_disponiveis[-2:], key="anos_comparativo"
+        ))
+        if len(anos_comp) >= 2:
+            df_comp = carregar_comparativo(versao_dados, tuple(anos_comp))
+        else:
+            st.info("Selecione pelo menos dois anos para comparar.")
+
+if df_comp is not None:
+    df_comp = df_comp.copy()
+    ano_ini, ano_fim = anos_comp[0], anos_comp[-1]
+    for metrica, var in (("Novatos", "Var_Nov"), ("Veteranos", "Var_Vet"), ("Matriculados", "Var_Total")):
+        df_comp[var] = df_comp[f"{metrica}_{ano_fim}"] - df_comp[f"{metrica}_{ano_ini}"]
 
     # Tabela comparativa por unidade
     col_comp1, col_comp2 = st.columns(2)
 
     with col_comp1:
         st.markdown("<h4 style='color: #e2e8f0;'>Comparativo de Novatos</h4>", unsafe_allow_html=True)
-
-        # Agrupa por unidade
-        df_nov_unidade = df_comp.groupby("Unidade").agg({
-            "Novatos_2025": "sum",
-            "Novatos_2026": "sum",
-            "Var_Nov": "sum"
-        }).reset_index()
-
-        html_nov = "<table style='width:100%; font-size:12px; border-collapse:collapse;'>"
-        html_nov += "<tr style='background:#667eea; color:white;'><th style='padding:8px;'>Unidade</th><th>2025</th><th>2026</th><th>Variação</th></tr>"
-        for _, r in df_nov_unidade.iterrows():
-            cor_var = "#10b981" if r["Var_Nov"] >= 0 else "#ef4444"
-            sinal = "+" if r["Var_Nov"] >= 0 else ""
-            html_nov += f"<tr style='background:#1a1a2e;'><td style='padding:6px; color:#e0e0ff;'>{r['Unidade']}</td>"
-            html_nov += f"<td style='text-align:center; color:#94a3b8;'>{int(r['Novatos_2025'])}</td>"
-            html_nov += f"<td style='text-align:center; color:#e0e0ff; font-weight:600;'>{int(r['Novatos_2026'])}</td>"
-            html_nov += f"<td style='text-align:center; color:{cor_var}; font-weight:600;'>{sinal}{int(r['Var_Nov'])}</td></tr>"
-        # Total
-        total_2025 = df_nov_unidade["Novatos_2025"].sum()
-        total_2026 = df_nov_unidade["Novatos_2026"].sum()
-        var_total = total_2026 - total_2025
-        cor_total = "#10b981" if var_total >= 0 else "#ef4444"
-        sinal_t = "+" if var_total >= 0 else ""
-        html_nov += f"<tr style='background:#2d2d44; font-weight:700;'><td style='padding:8px; color:#ffffff;'>TOTAL</td>"
-        html_nov += f"<td style='text-align:center; color:#ffffff;'>{int(total_2025)}</td>"
-        html_nov += f"<td style='text-align:center; color:#ffffff;'>{int(total_2026)}</td>"
-        html_nov += f"<td style='text-align:center; color:{cor_total};'>{sinal_t}{int(var_total)}</td></tr>"
-        html_nov += "</table>"
-        st.markdown(html_nov, unsafe_allow_html=True)
+        st.markdown(tabela_comparativo_unidades(df_comp, "Novatos", "Var_Nov", anos_comp, "#667eea"), unsafe_allow_html=True)
 
     with col_comp2:
         st.markdown("<h4 style='color: #e2e8f0;'>Comparativo de Veteranos</h4>", unsafe_allow_html=True)
-
-        df_vet_unidade = df_comp.groupby("Unidade").agg({
-            "Veteranos_2025": "sum",
-            "Veteranos_2026": "sum",
-            "Var_Vet": "sum"
-        }).reset_index()
-
-        html_vet = "<table style='width:100%; font-size:12px; border-collapse:collapse;'>"
-        html_vet += "<tr style='background:#764ba2; color:white;'><th style='padding:8px;'>Unidade</th><th>2025</th><th>2026</th><th>Variação</th></tr>"
-        for _, r in df_vet_unidade.iterrows():
-            cor_var = "#10b981" if r["Var_Vet"] >= 0 else "#ef4444"
-            sinal = "+" if r["Var_Vet"] >= 0 else ""
-            html_vet += f"<tr style='background:#1a1a2e;'><td style='padding:6px; color:#e0e0ff;'>{r['Unidade']}</td>"
-            html_vet += f"<td style='text-align:center; color:#94a3b8;'>{int(r['Veteranos_2025'])}</td>"
-            html_vet += f"<td style='text-align:center; color:#e0e0ff; font-weight:600;'>{int(r['Veteranos_2026'])}</td>"
-            html_vet += f"<td style='text-align:center; color:{cor_var}; font-weight:600;'>{sinal}{int(r['Var_Vet'])}</td></tr>"
-        # Total
-        total_2025_v = df_vet_unidade["Veteranos_2025"].sum()
-        total_2026_v = df_vet_unidade["Veteranos_2026"].sum()
-        var_total_v = total_2026_v - total_2025_v
-        cor_total_v = "#10b981" if var_total_v >= 0 else "#ef4444"
-        sinal_tv = "+" if var_total_v >= 0 else ""
-        html_vet += f"<tr style='background:#2d2d44; font-weight:700;'><td style='padding:8px; color:#ffffff;'>TOTAL</td>"
-        html_vet += f"<td style='text-align:center; color:#ffffff;'>{int(total_2025_v)}</td>"
-        html_vet += f"<td style='text-align:center; color:#ffffff;'>{int(total_2026_v)}</td>"
-        html_vet += f"<td style='text-align:center; color:{cor_total_v};'>{sinal_tv}{int(var_total_v)}</td></tr>"
-        html_vet += "</table>"
-        st.markdown(html_vet, unsafe_allow_html=True)
+        st.markdown(tabela_comparativo_unidades(df_comp, "Veteranos", "Var_Vet", anos_comp, "#764ba2"), unsafe_allow_html=True)
 
     # Tabela detalhada por segmento
     st.markdown("<h4 style='color: #e2e8f0; margin-top: 20px;'>Detalhamento por Segmento</h4>", unsafe_allow_html=True)
 
+    colunas_seg = (("Novatos", "Novatos", "Var_Nov"), ("Veteranos", "Veteranos", "Var_Vet"), ("Total", "Matriculados", "Var_Total"))
     html_seg = "<div style='max-height:350px; overflow-y:auto;'>"
     html_seg += "<table style='width:100%; font-size:11px; border-collapse:collapse;'>"
     html_seg += "<tr style='background:linear-gradient(90deg, #667eea, #764ba2); color:white; position:sticky; top:0;'>"
     html_seg += "<th style='padding:8px;'>Unidade</th><th>Segmento</th>"
-    html_seg += "<th>Novatos 25</th><th>Novatos 26</th><th>Var.</th>"
-    html_seg += "<th>Veteranos 25</th><th>Veteranos 26</th><th>Var.</th>"
-    html_seg += "<th>Total 25</th><th>Total 26</th><th>Var.</th></tr>"
+    for rotulo, _, _ in colunas_seg:
+        html_seg += "".join(f"<th>{rotulo} {ano[-2:]}</th>" for ano in anos_comp) + "<th>Var.</th>"
+    html_seg += "</tr>"
 
     for _, r in df_comp.iterrows():
-        cor_nov = "#10b981" if r["Var_Nov"] >= 0 else "#ef4444"
-        cor_vet = "#10b981" if r["Var_Vet"] >= 0 else "#ef4444"
-        cor_tot = "#10b981" if r["Var_Total"] >= 0 else "#ef4444"
-        s_nov = "+" if r["Var_Nov"] >= 0 else ""
-        s_vet = "+" if r["Var_Vet"] >= 0 else ""
-        s_tot = "+" if r["Var_Total"] >= 0 else ""
-
-        html_seg += f"<tr style='background:#1a1a2e; border-bottom:1px solid #2d2d44;'>"
+        html_seg += "<tr style='background:#1a1a2e; border-bottom:1px solid #2d2d44;'>"
         html_seg += f"<td style='padding:6px; color:#e0e0ff;'>{r['Unidade']}</td>"
         html_seg += f"<td style='color:#94a3b8;'>{r['Segmento']}</td>"
-        html_seg += f"<td style='text-align:center; color:#94a3b8;'>{int(r['Novatos_2025'])}</td>"
-        html_seg += f"<td style='text-align:center; color:#e0e0ff;'>{int(r['Novatos_2026'])}</td>"
-        html_seg += f"<td style='text-align:center; color:{cor_nov}; font-weight:600;'>{s_nov}{int(r['Var_Nov'])}</td>"
-        html_seg += f"<td style='text-align:center; color:#94a3b8;'>{int(r['Veteranos_2025'])}</td>"
-        html_seg += f"<td style='text-align:center; color:#e0e0ff;'>{int(r['Veteranos_2026'])}</td>"
-        html_seg += f"<td style='text-align:center; color:{cor_vet}; font-weight:600;'>{s_vet}{int(r['Var_Vet'])}</td>"
-        html_seg += f"<td style='text-align:center; color:#94a3b8;'>{int(r['Total_2025'])}</td>"
-        html_seg += f"<td style='text-align:center; color:#e0e0ff;'>{int(r['Total_2026'])}</td>"
-        html_seg += f"<td style='text-align:center; color:{cor_tot}; font-weight:600;'>{s_tot}{int(r['Var_Total'])}</td></tr>"
+        for _, metrica, var in colunas_seg:
+            for ano in anos_comp:
+                cor_ano = "#e0e0ff" if ano == ano_fim else "#94a3b8"
+                html_seg += f"<td style='text-align:center; color:{cor_ano};'>{int(r[f'{metrica}_{ano}'])}</td>"
+            cor_var = "#10b981" if r[var] >= 0 else "#ef4444"
+            sinal = "+" if r[var] >= 0 else ""
+            html_seg += f"<td style='text-align:center; color:{cor_var}; font-weight:600;'>{sinal}{int(r[var])}</td>"
+        html_seg += "</tr>"
 
     html_seg += "</table></div>"
     st.markdown(html_seg, unsafe_allow_html=True)
@@ -1305,133 +1146,62 @@ if resumo_2025_path.exists():
     # Análise comparativa
     st.markdown("<h4 style='color: #e2e8f0; margin-top: 20px;'>📈 Análise Comparativa</h4>", unsafe_allow_html=True)
 
-    total_nov_2025 = df_comp["Novatos_2025"].sum()
-    total_nov_2026 = df_comp["Novatos_2026"].sum()
-    total_vet_2025 = df_comp["Veteranos_2025"].sum()
-    total_vet_2026 = df_comp["Veteranos_2026"].sum()
-    total_matr_2025 = df_comp["Total_2025"].sum()
-    total_matr_2026 = df_comp["Total_2026"].sum()
-
-    var_nov_pct = ((total_nov_2026 - total_nov_2025) / total_nov_2025 * 100) if total_nov_2025 > 0 else 0
-    var_vet_pct = ((total_vet_2026 - total_vet_2025) / total_vet_2025 * 100) if total_vet_2025 > 0 else 0
-    var_matr_pct = ((total_matr_2026 - total_matr_2025) / total_matr_2025 * 100) if total_matr_2025 > 0 else 0
-
-    analise_html = f"""
-    <div style='background: rgba(102, 126, 234, 0.1); padding: 15px; border-radius: 10px; border-left: 4px solid #667eea;'>
-        <p style='color: #e0e0ff; margin: 5px 0;'><strong>Novatos:</strong> {int(total_nov_2025)} (2025) → {int(total_nov_2026)} (2026) |
-        <span style='color: {"#10b981" if var_nov_pct >= 0 else "#ef4444"};'>{"+" if var_nov_pct >= 0 else ""}{var_nov_pct:.1f}%</span></p>
-        <p style='color: #e0e0ff; margin: 5px 0;'><strong>Veteranos:</strong> {int(total_vet_2025)} (2025) → {int(total_vet_2026)} (2026) |
-        <span style='color: {"#10b981" if var_vet_pct >= 0 else "#ef4444"};'>{"+" if var_vet_pct >= 0 else ""}{var_vet_pct:.1f}%</span></p>
-        <p style='color: #e0e0ff; margin: 5px 0;'><strong>Total Matrículas:</strong> {int(total_matr_2025)} (2025) → {int(total_matr_2026)} (2026) |
-        <span style='color: {"#10b981" if var_matr_pct >= 0 else "#ef4444"};'>{"+" if var_matr_pct >= 0 else ""}{var_matr_pct:.1f}%</span></p>
-    </div>
-    """
+    analise_html = "<div style='background: rgba(102, 126, 234, 0.1); padding: 15px; border-radius: 10px; border-left: 4px solid #667eea;'>"
+    for rotulo, metrica in (("Novatos", "Novatos"), ("Veteranos", "Veteranos"), ("Total Matrículas", "Matriculados")):
+        totais = [int(df_comp[f"{metrica}_{ano}"].sum()) for ano in anos_comp]
+        var_pct = ((totais[-1] - totais[0]) / totais[0] * 100) if totais[0] > 0 else 0
+        evolucao = " → ".join(f"{total} ({ano})" for total, ano in zip(totais, anos_comp))
+        analise_html += f"""
+        <p style='color: #e0e0ff; margin: 5px 0;'><strong>{rotulo}:</strong> {evolucao} |
+        <span style='color: {"#10b981" if var_pct >= 0 else "#ef4444"};'>{"+" if var_pct >= 0 else ""}{var_pct:.1f}%</span></p>"""
+    analise_html += "\n    </div>"
     st.markdown(analise_html, unsafe_allow_html=True)
 
-else:
-    st.info("📋 Para visualizar o comparativo 2025 vs 2026, execute o script `extrair_2025.py` para extrair os dados de 2025 do ActiveSoft.")
+elif len(anos_disponiveis) < 2:
+    st.info("📋 Para visualizar o comparativo entre anos, extraia os dados de um ano anterior (ex.: `extrair_2025.py`, que gera `dados_2025.json`) e execute `python periodos.py` para gravá-los em `vagas.db`.")
 
 st.markdown("<br>", unsafe_allow_html=True)
 
 # ===== RETENÇÃO REAL POR SÉRIE =====
-st.markdown("<h3 style='color: #f1f5f9; font-weight: 600;'>📈 Retenção Real por Série (2025 → 2026)</h3>", unsafe_allow_html=True)
-st.caption("Retenção = alunos da série anterior (2025) que avançaram e permaneceram na escola (2026)")
-
-# Carrega dados detalhados de 2025 e 2026
-dados_2025_path = Path(__file__).parent / "output" / "dados_2025.json"
-dados_2026_path = Path(__file__).parent / "output" / "vagas_ultimo.json"
-
-if dados_2025_path.exists() and dados_2026_path.exists():
-    with open(dados_2025_path, "r", encoding="utf-8") as f:
-        dados_2025_full = json.load(f)
-    with open(dados_2026_path, "r", encoding="utf-8") as f:
-        dados_2026_full = json.load(f)
-
-    # Mapeamento de progressão: série atual -> série anterior (usa extrair_serie global)
-    PROGRESSAO = {
-        "Infantil III": "Infantil II",
-        "Infantil IV": "Infantil III",
-        "Infantil V": "Infantil IV",
-        "1º ano": "Infantil V",
-        "2º ano": "1º ano",
-        "3º ano": "2º ano",
-        "4º ano": "3º ano",
-        "5º ano": "4º ano",
-        "6º ano": "5º ano",
-        "7º ano": "6º ano",
-        "8º ano": "7º ano",
-        "9º ano": "8º ano",
-        "1ª série EM": "9º ano",
-        "2ª série EM": "1ª série EM",
-        "3ª série EM": "2ª série EM",
-    }
-
-    # Agrupa dados por unidade e série
-    def agrupar_por_serie(dados, ano):
-        resultado = {}
-        for unidade in dados.get("unidades", []):
-            codigo = unidade["codigo"]
-            if codigo not in resultado:
-                resultado[codigo] = {}
-            for turma in unidade.get("turmas", []):
-                serie = extrair_serie(turma.get("turma", ""))
-                if serie:
-                    if serie not in resultado[codigo]:
-                        resultado[codigo][serie] = {"matriculados": 0, "veteranos": 0, "novatos": 0}
-                    resultado[codigo][serie]["matriculados"] += turma.get("matriculados", 0)
-                    resultado[codigo][serie]["veteranos"] += turma.get("veteranos", 0)
-                    resultado[codigo][serie]["novatos"] += turma.get("novatos", 0)
-        return resultado
-
-    dados_2025_serie = agrupar_por_serie(dados_2025_full, "2025")
-    dados_2026_serie = agrupar_por_serie(dados_2026_full, "2026")
-
-    # Calcula retenção real por série
-    retencao_data = []
-    for codigo_unidade in dados_2026_serie.keys():
-        nome_unidade = codigo_unidade.split("-")[1] if "-" in codigo_unidade else codigo_unidade
-        for serie_atual, serie_anterior in PROGRESSAO.items():
-            # Veteranos na série atual (2026) vieram da série anterior (2025)
-            vet_2026 = dados_2026_serie.get(codigo_unidade, {}).get(serie_atual, {}).get("veteranos", 0)
-            # Total de alunos na série anterior em 2025
-            total_2025 = dados_2025_serie.get(codigo_unidade, {}).get(serie_anterior, {}).get("matriculados", 0)
-
-            if total_2025 > 0:
-                retencao = (vet_2026 / total_2025) * 100
-                retencao_data.append({
-                    "Unidade": nome_unidade,
-                    "Série 2026": serie_atual,
-                    "Base 2025": serie_anterior,
-                    "Alunos 2025": total_2025,
-                    "Veteranos 2026": vet_2026,
-                    "Retenção %": round(retencao, 1)
-                })
-
-    if retencao_data:
-        df_retencao = pd.DataFrame(retencao_data)
+st.markdown("<h3 style='color: #f1f5f9; font-weight: 600;'>📈 Retenção Real por Série</h3>", unsafe_allow_html=True)
+
+# Matriz unidade × série × par de anos (retencao.py), recalculada só quando os arquivos mudam
+if len(arquivos_anos) >= 2:
+    df_matriz_retencao = carregar_retencao(versao_anos)
+    pares_retencao = retencao.pares_anos(df_matriz_retencao)
+    ano_base, ano_retencao = pares_retencao[0] if pares_retencao else (None, None)
+    if len(pares_retencao) > 1:
+        ano_base, ano_retencao = st.selectbox(
+            "Anos comparados", pares_retencao, format_func=lambda par: f"{par[0]} → {par[1]}", key="par_retencao"
+        )
+    st.caption(f"Retenção = alunos da série anterior ({ano_base}) que avançaram e permaneceram na escola ({ano_retencao})")
+    df_retencao = df_matriz_retencao[
+        (df_matriz_retencao["Ano base"] == ano_base) & (df_matriz_retencao["Ano"] == ano_retencao)
+    ]
 
+    if not df_retencao.empty:
         # Tabela resumo por unidade
         col_ret1, col_ret2 = st.columns(2)
 
         with col_ret1:
             st.markdown("<h4 style='color: #e2e8f0;'>Retenção por Unidade</h4>", unsafe_allow_html=True)
             df_ret_unidade = df_retencao.groupby("Unidade").agg({
-                "Alunos 2025": "sum",
-                "Veteranos 2026": "sum"
+                "Alunos base": "sum",
+                "Veteranos": "sum"
             }).reset_index()
-            df_ret_unidade["Retenção %"] = (df_ret_unidade["Veteranos 2026"] / df_ret_unidade["Alunos 2025"] * 100).round(1)
+            df_ret_unidade["Retenção %"] = percentual(df_ret_unidade["Veteranos"], df_ret_unidade["Alunos base"])
 
             html_ret = "<table style='width:100%; font-size:12px; border-collapse:collapse;'>"
-            html_ret += "<tr style='background:#10b981; color:white;'><th style='padding:8px;'>Unidade</th><th>Base 2025</th><th>Rematriculados 2026</th><th>Retenção</th></tr>"
+            html_ret += f"<tr style='background:#10b981; color:white;'><th style='padding:8px;'>Unidade</th><th>Base {ano_base}</th><th>Rematriculados {ano_retencao}</th><th>Retenção</th></tr>"
             for _, r in df_ret_unidade.iterrows():
                 cor = "#10b981" if r["Retenção %"] >= 80 else "#f59e0b" if r["Retenção %"] >= 60 else "#ef4444"
                 html_ret += f"<tr style='background:#1a1a2e;'><td style='padding:6px; color:#e0e0ff;'>{r['Unidade']}</td>"
-                html_ret += f"<td style='text-align:center; color:#94a3b8;'>{int(r['Alunos 2025'])}</td>"
-                html_ret += f"<td style='text-align:center; color:#e0e0ff;'>{int(r['Veteranos 2026'])}</td>"
+                html_ret += f"<td style='text-align:center; color:#94a3b8;'>{int(r['Alunos base'])}</td>"
+                html_ret += f"<td style='text-align:center; color:#e0e0ff;'>{int(r['Veteranos'])}</td>"
                 html_ret += f"<td style='text-align:center; color:{cor}; font-weight:600;'>{r['Retenção %']:.1f}%</td></tr>"
             # Total
-            total_base = df_ret_unidade["Alunos 2025"].sum()
-            total_ret = df_ret_unidade["Veteranos 2026"].sum()
+            total_base = df_ret_unidade["Alunos base"].sum()
+            total_ret = df_ret_unidade["Veteranos"].sum()
             ret_total = (total_ret / total_base * 100) if total_base > 0 else 0
             cor_total = "#10b981" if ret_total >= 80 else "#f59e0b" if ret_total >= 60 else "#ef4444"
             html_ret += f"<tr style='background:#2d2d44; font-weight:700;'><td style='padding:8px; color:#ffffff;'>TOTAL</td>"
@@ -1444,7 +1214,7 @@ if dados_2025_path.exists() and dados_2026_path.exists():
         with col_ret2:
             st.markdown("<h4 style='color: #e2e8f0;'>Séries com Maior Evasão</h4>", unsafe_allow_html=True)
             # Séries com menor retenção (maior evasão)
-            df_evasao = df_retencao[df_retencao["Alunos 2025"] >= 5].sort_values("Retenção %").head(8)
+            df_evasao = df_retencao[df_retencao["Alunos base"] >= 5].sort_values("Retenção %").head(8)
             if len(df_evasao) > 0:
                 html_eva = "<table style='width:100%; font-size:11px; border-collapse:collapse;'>"
                 html_eva += "<tr style='background:#ef4444; color:white;'><th style='padding:6px;'>Unidade</th><th>Série</th><th>Base</th><th>Rematriculados</th><th>Evasão</th></tr>"
@@ -1452,18 +1222,18 @@ if dados_2025_path.exists() and dados_2026_path.exists():
                     evasao = 100 - r["Retenção %"]
                     cor = "#ef4444" if evasao >= 40 else "#f59e0b" if evasao >= 20 else "#10b981"
                     html_eva += f"<tr style='background:#1a1a2e;'><td style='padding:5px; color:#e0e0ff;'>{r['Unidade']}</td>"
-                    html_eva += f"<td style='color:#94a3b8;'>{r['Série 2026']}</td>"
-                    html_eva += f"<td style='text-align:center; color:#94a3b8;'>{int(r['Alunos 2025'])}</td>"
-                    html_eva += f"<td style='text-align:center; color:#e0e0ff;'>{int(r['Veteranos 2026'])}</td>"
+                    html_eva += f"<td style='color:#94a3b8;'>{r['Série']}</td>"
+                    html_eva += f"<td style='text-align:center; color:#94a3b8;'>{int(r['Alunos base'])}</td>"
+                    html_eva += f"<td style='text-align:center; color:#e0e0ff;'>{int(r['Veteranos'])}</td>"
                     html_eva += f"<td style='text-align:center; color:{cor}; font-weight:600;'>{evasao:.1f}%</td></tr>"
                 html_eva += "</table>"
                 st.markdown(html_eva, unsafe_allow_html=True)
                 st.caption("Mostrando séries com base mínima de 5 alunos")
 
     else:
-        st.warning("Não foi possível calcular a retenção. Verifique os dados de 2025 e 2026.")
+        st.warning(f"Não foi possível calcular a retenção. Verifique os dados de {ano_base} e {ano_retencao}.")
 else:
-    st.info("📋 Para calcular a retenção real, são necessários os dados de 2025 (`extrair_2025.py`) e 2026.")
+    st.info("📋 Para calcular a retenção real, são necessários os dados de pelo menos dois anos (ex.: `dados_2025.json` via `extrair_2025.py`).")
 
 st.markdown("<br>", unsafe_allow_html=True)
 
@@ -1473,25 +1243,31 @@ st.markdown("<h3 style='color: #f1f5f9; font-weight: 600;'>Taxa de Ocupação po
 df_ocupacao = df_resumo_filtrado.copy()
 df_ocupacao["Ocupacao"] = (df_ocupacao["Matriculados"] / df_ocupacao["Vagas"] * 100).round(1)
 
-fig_ocup = px.bar(
-    df_ocupacao,
-    x="Unidade" if unidade_selecionada == "Todas" else "Segmento",
-    y="Ocupacao",
-    color="Segmento" if unidade_selecionada == "Todas" else "Unidade",
-    barmode="group",
-    color_discrete_sequence=[COLORS['primary'], COLORS['success'], COLORS['warning'], COLORS['danger']],
-    labels={"Ocupacao": "Taxa de Ocupação (%)"},
-    text="Ocupacao"
-)
+# Barras com graph_objects: só o plotly.express custaria ~180 ms na abertura do dashboard
+eixo_ocup = "Unidade" if unidade_selecionada == "Todas" else "Segmento"
+cor_ocup = "Segmento" if unidade_selecionada == "Todas" else "Unidade"
+cores_ocup = [COLORS['primary'], COLORS['success'], COLORS['warning'], COLORS['danger']]
+fig_ocup = go.Figure([
+    go.Bar(
+        name=str(nome),
+        x=grupo[eixo_ocup],
+        y=grupo["Ocupacao"],
+        text=grupo["Ocupacao"],
+        marker_color=cores_ocup[i % len(cores_ocup)],
+        hovertemplate=f"{cor_ocup}: {nome}<br>{eixo_ocup}: %{{x}}<br>Ocupação: %{{y:.1f}}%<extra></extra>"
+    )
+    for i, (nome, grupo) in enumerate(df_ocupacao.groupby(cor_ocup, sort=False, observed=True))
+])
 fig_ocup.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
 fig_ocup.update_layout(
     paper_bgcolor='rgba(0,0,0,0)',
     plot_bgcolor='rgba(0,0,0,0)',
     font=dict(color='#a0a0b0', family='Inter, sans-serif'),
     height=400,
-    yaxis=dict(gridcolor='rgba(102, 126, 234, 0.1)', range=[0, 120]),
-    xaxis=dict(gridcolor='rgba(102, 126, 234, 0.1)'),
-    legend=dict(bgcolor='rgba(0,0,0,0)', font=dict(color='#a0a0b0'))
+    barmode='group',
+    yaxis=dict(gridcolor='rgba(102, 126, 234, 0.1)', range=[0, 120], title="Taxa de Ocupação (%)"),
+    xaxis=dict(gridcolor='rgba(102, 126, 234, 0.1)', title=eixo_ocup),
+    legend=dict(bgcolor='rgba(0,0,0,0)', font=dict(color='#a0a0b0'), title=cor_ocup)
 )
 st.plotly_chart(fig_ocup, use_container_width=True)
 
@@ -1523,24 +1299,27 @@ with col_nv1:
 
 with col_nv2:
     # Barra por unidade/segmento
-    df_nv = df_resumo_filtrado.groupby("Unidade" if unidade_selecionada == "Todas" else "Segmento").agg({
+    eixo_nv = "Unidade" if unidade_selecionada == "Todas" else "Segmento"
+    df_nv = df_resumo_filtrado.groupby(eixo_nv, observed=True).agg({
         "Novatos": "sum",
         "Veteranos": "sum"
     }).reset_index()
 
-    fig_nv_bar = px.bar(
-        df_nv,
-        x="Unidade" if unidade_selecionada == "Todas" else "Segmento",
-        y=["Novatos", "Veteranos"],
-        barmode="stack",
-        color_discrete_map={"Novatos": COLORS['warning'], "Veteranos": COLORS['primary']},
-        labels={"value": "Quantidade", "variable": "Tipo"}
-    )
+    fig_nv_bar = go.Figure([
+        go.Bar(
+            name=tipo, x=df_nv[eixo_nv], y=df_nv[tipo], marker_color=cor,
+            hovertemplate=f"{tipo}<br>{eixo_nv}: %{{x}}<br>Quantidade: %{{y}}<extra></extra>"
+        )
+        for tipo, cor in (("Novatos", COLORS['warning']), ("Veteranos", COLORS['primary']))
+    ])
     fig_nv_bar.update_layout(
         paper_bgcolor='rgba(0,0,0,0)',
         plot_bgcolor='rgba(0,0,0,0)',
         font=dict(color='#a0a0b0', family='Inter, sans-serif'),
         height=350,
+        barmode='stack',
+        xaxis=dict(title=eixo_nv),
+        yaxis=dict(title="Quantidade"),
         legend=dict(bgcolor='rgba(0,0,0,0)', font=dict(color='#a0a0b0'), title='')
     )
     st.plotly_chart(fig_nv_bar, use_container_width=True)
@@ -1568,7 +1347,7 @@ def classificacao_termometro(ocupacao):
     else: return 'Congelada'
 
 # Calcula ocupação por unidade (usa df_perf_unidade já cacheado)
-df_termo = df_perf_unidade[['Unidade', 'Ocupacao', 'Matriculados', 'Vagas']].copy()
+df_termo = df_perf_unidade[['Nome_curto', 'Ocupacao', 'Matriculados', 'Vagas']].copy()
 df_termo.columns = ['Unidade', 'Ocupação', 'Matriculados', 'Vagas']
 cols_termo = st.columns(len(df_termo))
 
@@ -1576,7 +1355,7 @@ for idx, (_, row) in enumerate(df_termo.iterrows()):
     ocupacao = row['Ocupação']
     cor = cor_termometro(ocupacao)
     classif = classificacao_termometro(ocupacao)
-    unidade_nome = row['Unidade'].split('(')[1].replace(')', '') if '(' in row['Unidade'] else row['Unidade']
+    unidade_nome = row['Unidade']
 
     with cols_termo[idx]:
         # Termômetro visual
@@ -1600,8 +1379,8 @@ st.markdown("<br>", unsafe_allow_html=True)
 
 # ===== MAPA DE CALOR DE OCUPAÇÃO GERAL =====
 st.markdown("<h3 style='color: #f1f5f9; font-weight: 600;'>📊 Mapa de Calor - Ocupação por Unidade e Segmento</h3>", unsafe_allow_html=True)
-fig_heatmap = criar_heatmap_ocupacao(resumo_str)
-st.plotly_chart(fig_heatmap, use_container_width=True)
+fig_heatmap = criar_heatmap_ocupacao(versao_dados, resumo)
+st.plotly_chart(graficos.aplicar_tema(fig_heatmap, TEMA_GRAFICOS), use_container_width=True)
 
 # Legenda das faixas de ocupação
 st.markdown("""
@@ -1624,14 +1403,17 @@ if num_extracoes >= 2:
     tab1, tab2 = st.tabs(["Visão Geral", "Por Unidade"])
 
     with tab1:
-        df_hist_total['ocupacao'] = round(df_hist_total['matriculados'] / df_hist_total['vagas'] * 100, 1)
+        df_ocup = amostragem.reduzir_historico(df_hist_total.assign(
+            ocupacao=round(df_hist_total['matriculados'] / df_hist_total['vagas'] * 100, 1)
+        ), 'ocupacao')
 
         fig_hist = go.Figure()
 
         fig_hist.add_trace(go.Scatter(
-            x=df_hist_total['data_formatada'],
-            y=df_hist_total['ocupacao'],
-            mode='lines+markers',
+            x=df_ocup['data_extracao'],
+            y=df_ocup['ocupacao'],
+            mode=amostragem.modo_linha(len(df_ocup)),
+            hovertemplate='%{x|%d/%m %H:%M}: %{y}%<extra></extra>',
             name='Ocupação',
             line=dict(color=COLORS['primary'], width=3),
             marker=dict(size=10, color=COLORS['primary']),
@@ -1644,6 +1426,7 @@ if num_extracoes >= 2:
             plot_bgcolor='rgba(0,0,0,0)',
             font=dict(color='#a0a0b0', family='Inter, sans-serif'),
             height=300,
+            xaxis=dict(tickformat='%d/%m'),
             yaxis=dict(gridcolor='rgba(102, 126, 234, 0.1)', title='Ocupação %', range=[0, 100])
         )
 
@@ -1653,14 +1436,14 @@ if num_extracoes >= 2:
         fig_unid = go.Figure()
         cores_unid = [COLORS['primary'], COLORS['success'], COLORS['warning'], '#ec4899']
 
-        for i, unidade in enumerate(df_hist_unidades['unidade_nome'].unique()):
-            df_u = df_hist_unidades[df_hist_unidades['unidade_nome'] == unidade]
-            nome = unidade.split('(')[1].replace(')', '') if '(' in unidade else unidade
+        series_unid = amostragem.reduzir_historico(df_hist_unidades, 'matriculados', por='unidade_nome')
+        for i, (unidade, df_u) in enumerate(series_unid.groupby('unidade_nome', sort=False)):
+            nome = nome_curto_unidade(unidade)
 
             fig_unid.add_trace(go.Scatter(
-                x=df_u['data_formatada'],
+                x=df_u['data_extracao'],
                 y=df_u['matriculados'],
-                mode='lines+markers',
+                mode=amostragem.modo_linha(len(df_u)),
                 name=nome,
                 line=dict(color=cores_unid[i % len(cores_unid)], width=2),
                 marker=dict(size=8)
@@ -1781,7 +1564,7 @@ st.markdown("<br>", unsafe_allow_html=True)
 # ===== RANKING DE PERFORMANCE POR UNIDADE =====
 st.markdown("<h4 style='color: #e2e8f0; font-weight: 600;'>Ranking de Unidades por Performance</h4>", unsafe_allow_html=True)
 
-df_ranking = df_relatorio.groupby('Unidade').agg({
+df_ranking = df_relatorio.groupby('Unidade_curta', observed=True).agg({
     'Vagas': 'sum',
     'Matriculados': 'sum',
     'Novatos': 'sum',
@@ -1793,11 +1576,7 @@ df_ranking['Ocupação'] = (df_ranking['Matriculados'] / df_ranking['Vagas'] * 1
 df_ranking['% Veteranos'] = (df_ranking['Veteranos'] / df_ranking['Matriculados'] * 100).round(1)
 df_ranking['Captação'] = (df_ranking['Novatos'] / df_ranking['Vagas'] * 100).round(1)
 df_ranking = df_ranking.sort_values('Ocupação', ascending=False)
-
-# Extrai nome curto
-df_ranking['Unidade'] = df_ranking['Unidade'].apply(
-    lambda x: x.split('(')[1].replace(')', '') if '(' in x else x
-)
+df_ranking = df_ranking.rename(columns={'Unidade_curta': 'Unidade'})
 
 st.dataframe(
     df_ranking[['Unidade', 'Vagas', 'Matriculados', 'Ocupação', '% Veteranos', 'Captação', 'Disponiveis']],
@@ -1830,25 +1609,19 @@ st.markdown("<br>", unsafe_allow_html=True)
 # ===== RELATÓRIO DETALHADO DAS TURMAS =====
 st.markdown("<h4 style='color: #e2e8f0; font-weight: 600;'>Detalhamento por Turma</h4>", unsafe_allow_html=True)
 
-# Adiciona coluna Série para filtro
-df_relatorio['Série'] = df_relatorio['Turma'].apply(extrair_serie)
-
 # ===== RESUMO: QUANTIDADE DE TURMAS =====
 # Por Unidade
-turmas_por_unidade = df_relatorio.groupby('Unidade')['Turma'].nunique().reset_index()
+turmas_por_unidade = df_relatorio.groupby('Unidade_curta', observed=True)['Turma'].nunique().reset_index()
 turmas_por_unidade.columns = ['Unidade', 'Qtd Turmas']
-turmas_por_unidade['Unidade'] = turmas_por_unidade['Unidade'].apply(
-    lambda x: x.split('(')[1].replace(')', '') if '(' in x else x
-)
 
 # Por Segmento
-turmas_por_segmento = df_relatorio.groupby('Segmento')['Turma'].nunique().reset_index()
+turmas_por_segmento = df_relatorio.groupby('Segmento', observed=True)['Turma'].nunique().reset_index()
 turmas_por_segmento.columns = ['Segmento', 'Qtd Turmas']
 
 # Por Série
-turmas_por_serie = df_relatorio.groupby('Série')['Turma'].nunique().reset_index()
+turmas_por_serie = df_relatorio.groupby('Série', observed=True)['Turma'].nunique().reset_index()
 turmas_por_serie.columns = ['Série', 'Qtd Turmas']
-turmas_por_serie = turmas_por_serie.sort_values('Série')
+turmas_por_serie = turmas_por_serie.sort_values('Série', key=lambda col: col.astype(str).map(ORDEM_SERIE).fillna(len(ORDEM_SERIE)))
 
 # Total de turmas
 total_turmas = df_relatorio['Turma'].nunique()
@@ -1868,184 +1641,189 @@ st.markdown(f"""
 # ===== TABELA RESUMO POR SEGMENTO =====
 st.markdown("<p style='color: #e2e8f0; font-size: 0.9rem; font-weight: 600; margin: 10px 0 5px 0;'>Resumo por Segmento</p>", unsafe_allow_html=True)
 
-# Filtros para o resumo
-col_filtro_res1, col_filtro_res2 = st.columns(2)
+@st.fragment
+def fragmento_resumo_segmento():
+    """Resumo por segmento com filtros de unidade/segmento"""
+    # Filtros para o resumo
+    col_filtro_res1, col_filtro_res2 = st.columns(2)
 
-with col_filtro_res1:
-    opcoes_unidade_res = ["Todas", "Boa Viagem", "Cordeiro", "Paulista", "Jaboatão"]
-    filtro_unidade_res = st.selectbox("Unidade", opcoes_unidade_res, key="filtro_unidade_resumo")
+    with col_filtro_res1:
+        opcoes_unidade_res = ["Todas", "Boa Viagem", "Cordeiro", "Paulista", "Jaboatão"]
+        filtro_unidade_res = st.selectbox("Unidade", opcoes_unidade_res, key="filtro_unidade_resumo")
 
-with col_filtro_res2:
-    opcoes_seg_res = ["Todos"] + sorted(df_relatorio['Segmento'].unique().tolist())
-    filtro_seg_res = st.selectbox("Segmento", opcoes_seg_res, key="filtro_seg_resumo")
+    with col_filtro_res2:
+        opcoes_seg_res = ["Todos"] + sorted(df_relatorio['Segmento'].unique().tolist())
+        filtro_seg_res = st.selectbox("Segmento", opcoes_seg_res, key="filtro_seg_resumo")
 
-# Aplica filtros
-df_resumo_filtro = df_relatorio.copy()
+    # Aplica filtros
+    df_resumo_filtro = df_relatorio.copy()
 
-if filtro_unidade_res != "Todas":
-    df_resumo_filtro = df_resumo_filtro[df_resumo_filtro['Unidade'].str.contains(filtro_unidade_res, case=False)]
+    if filtro_unidade_res != "Todas":
+        df_resumo_filtro = df_resumo_filtro[df_resumo_filtro['Unidade'].str.contains(filtro_unidade_res, case=False)]
 
-if filtro_seg_res != "Todos":
-    df_resumo_filtro = df_resumo_filtro[df_resumo_filtro['Segmento'] == filtro_seg_res]
+    if filtro_seg_res != "Todos":
+        df_resumo_filtro = df_resumo_filtro[df_resumo_filtro['Segmento'] == filtro_seg_res]
 
-# Agrupa dados por segmento
-df_resumo_seg = df_resumo_filtro.groupby('Segmento').agg({
-    'Turma': 'nunique',
-    'Vagas': 'sum',
-    'Matriculados': 'sum',
-    'Novatos': 'sum',
-    'Veteranos': 'sum',
-    'Disponiveis': 'sum'
-}).reset_index()
-df_resumo_seg.columns = ['Segmento', 'Turmas', 'Vagas', 'Matr.', 'Nov.', 'Vet.', 'Disp.']
-df_resumo_seg['Ocup.'] = (df_resumo_seg['Matr.'] / df_resumo_seg['Vagas'] * 100).round(1)
-df_resumo_seg = df_resumo_seg[['Segmento', 'Turmas', 'Vagas', 'Matr.', 'Nov.', 'Vet.', 'Disp.', 'Ocup.']]
-df_resumo_seg = df_resumo_seg.sort_values('Ocup.', ascending=False)
-
-# Adiciona linha de TOTAL
-total_row = pd.DataFrame([{
-    'Segmento': 'TOTAL',
-    'Turmas': df_resumo_seg['Turmas'].sum(),
-    'Vagas': df_resumo_seg['Vagas'].sum(),
-    'Matr.': df_resumo_seg['Matr.'].sum(),
-    'Nov.': df_resumo_seg['Nov.'].sum(),
-    'Vet.': df_resumo_seg['Vet.'].sum(),
-    'Disp.': df_resumo_seg['Disp.'].sum(),
-    'Ocup.': round(df_resumo_seg['Matr.'].sum() / df_resumo_seg['Vagas'].sum() * 100, 1) if df_resumo_seg['Vagas'].sum() > 0 else 0
-}])
-df_resumo_seg = pd.concat([df_resumo_seg, total_row], ignore_index=True)
+    # Agrupa dados por segmento
+    df_resumo_seg = df_resumo_filtro.groupby('Segmento', observed=True).agg({
+        'Turma': 'nunique',
+        'Vagas': 'sum',
+        'Matriculados': 'sum',
+        'Novatos': 'sum',
+        'Veteranos': 'sum',
+        'Disponiveis': 'sum'
+    }).reset_index()
+    df_resumo_seg.columns = ['Segmento', 'Turmas', 'Vagas', 'Matr.', 'Nov.', 'Vet.', 'Disp.']
+    df_resumo_seg['Ocup.'] = (df_resumo_seg['Matr.'] / df_resumo_seg['Vagas'] * 100).round(1)
+    df_resumo_seg = df_resumo_seg[['Segmento', 'Turmas', 'Vagas', 'Matr.', 'Nov.', 'Vet.', 'Disp.', 'Ocup.']]
+    df_resumo_seg = df_resumo_seg.sort_values('Ocup.', ascending=False)
+
+    # Adiciona linha de TOTAL
+    total_row = pd.DataFrame([{
+        'Segmento': 'TOTAL',
+        'Turmas': df_resumo_seg['Turmas'].sum(),
+        'Vagas': df_resumo_seg['Vagas'].sum(),
+        'Matr.': df_resumo_seg['Matr.'].sum(),
+        'Nov.': df_resumo_seg['Nov.'].sum(),
+        'Vet.': df_resumo_seg['Vet.'].sum(),
+        'Disp.': df_resumo_seg['Disp.'].sum(),
+        'Ocup.': round(df_resumo_seg['Matr.'].sum() / df_resumo_seg['Vagas'].sum() * 100, 1) if df_resumo_seg['Vagas'].sum() > 0 else 0
+    }])
+    df_resumo_seg = pd.concat([df_resumo_seg, total_row], ignore_index=True)
 
-st.dataframe(
-    df_resumo_seg,
-    use_container_width=True,
-    hide_index=True,
-    column_config={
-        "Ocup.": st.column_config.NumberColumn(
-            "Ocup. %",
-            format="%.1f%%",
-        ),
-    }
-)
+    st.dataframe(
+        df_resumo_seg,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Ocup.": st.column_config.NumberColumn(
+                "Ocup. %",
+                format="%.1f%%",
+            ),
+        }
+    )
 
-st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown("<br>", unsafe_allow_html=True)
 
-# Filtros inline para o detalhamento
-col_filtro1, col_filtro2, col_filtro3, col_filtro4, col_filtro5 = st.columns(5)
 
-with col_filtro1:
-    unidades_det = ["Todas"] + sorted(df_relatorio['Unidade'].apply(
-        lambda x: x.split('(')[1].replace(')', '') if '(' in x else x
-    ).unique().tolist())
-    filtro_unidade_det = st.selectbox("Filtrar Unidade", unidades_det, key="filtro_unidade_det")
+fragmento_resumo_segmento()
 
-with col_filtro2:
-    segmentos_det = ["Todos"] + sorted(df_relatorio['Segmento'].unique().tolist())
-    filtro_segmento_det = st.selectbox("Filtrar Segmento", segmentos_det, key="filtro_segmento_det")
+@st.fragment
+def fragmento_detalhamento():
+    """Detalhamento por turma com filtros inline e ordenação"""
+    # Filtros inline para o detalhamento
+    col_filtro1, col_filtro2, col_filtro3, col_filtro4, col_filtro5 = st.columns(5)
 
-with col_filtro3:
-    series_det = ["Todas"] + sorted(df_relatorio['Série'].unique().tolist())
-    filtro_serie_det = st.selectbox("Filtrar Série", series_det, key="filtro_serie_det")
+    with col_filtro1:
+        unidades_det = ["Todas"] + sorted(df_relatorio['Unidade_curta'].unique().tolist())
+        filtro_unidade_det = st.selectbox("Filtrar Unidade", unidades_det, key="filtro_unidade_det")
 
-with col_filtro4:
-    turnos_det = ["Todos"] + sorted(df_relatorio['Turno'].unique().tolist())
-    filtro_turno_det = st.selectbox("Filtrar Turno", turnos_det, key="filtro_turno_det")
+    with col_filtro2:
+        segmentos_det = ["Todos"] + sorted(df_relatorio['Segmento'].unique().tolist())
+        filtro_segmento_det = st.selectbox("Filtrar Segmento", segmentos_det, key="filtro_segmento_det")
 
-with col_filtro5:
-    ordenacao = st.selectbox("Ordenar por", ["Ocupação (maior)", "Ocupação (menor)", "Vagas (maior)", "Disponíveis (maior)"], key="ordenacao_det")
+    with col_filtro3:
+        series_det = ["Todas"] + sorted(df_relatorio['Série'].unique().tolist(), key=lambda x: ORDEM_SERIE.get(x, len(ORDEM_SERIE)))
+        filtro_serie_det = st.selectbox("Filtrar Série", series_det, key="filtro_serie_det")
 
-# Aplica filtros do detalhamento
-df_det = df_relatorio.copy()
+    with col_filtro4:
+        turnos_det = ["Todos"] + sorted(df_relatorio['Turno'].unique().tolist())
+        filtro_turno_det = st.selectbox("Filtrar Turno", turnos_det, key="filtro_turno_det")
 
-# Garante que todas as colunas numéricas não têm NaN
-colunas_numericas = ['Vagas', 'Matriculados', 'Novatos', 'Veteranos', 'Disponiveis', 'Pre-matriculados', 'Ocupação %']
-for col in colunas_numericas:
-    if col in df_det.columns:
-        df_det[col] = pd.to_numeric(df_det[col], errors='coerce').fillna(0)
+    with col_filtro5:
+        ordenacao = st.selectbox("Ordenar por", ["Ocupação (maior)", "Ocupação (menor)", "Vagas (maior)", "Disponíveis (maior)"], key="ordenacao_det")
 
-if filtro_unidade_det != "Todas":
-    df_det = df_det[df_det['Unidade'].str.contains(filtro_unidade_det, case=False)]
+    # Aplica filtros do detalhamento
+    df_det = df_relatorio.copy()
 
-if filtro_segmento_det != "Todos":
-    df_det = df_det[df_det['Segmento'] == filtro_segmento_det]
+    # Garante que todas as colunas numéricas não têm NaN
+    colunas_numericas = ['Vagas', 'Matriculados', 'Novatos', 'Veteranos', 'Disponiveis', 'Pre-matriculados', 'Ocupação %']
+    for col in colunas_numericas:
+        if col in df_det.columns:
+            df_det[col] = pd.to_numeric(df_det[col], errors='coerce').fillna(0)
 
-if filtro_serie_det != "Todas":
-    df_det = df_det[df_det['Série'] == filtro_serie_det]
+    if filtro_unidade_det != "Todas":
+        df_det = df_det[df_det['Unidade_curta'] == filtro_unidade_det]
 
-if filtro_turno_det != "Todos":
-    df_det = df_det[df_det['Turno'] == filtro_turno_det]
+    if filtro_segmento_det != "Todos":
+        df_det = df_det[df_det['Segmento'] == filtro_segmento_det]
 
-# Aplica ordenação
-if ordenacao == "Ocupação (maior)":
-    df_det = df_det.sort_values('Ocupação %', ascending=False)
-elif ordenacao == "Ocupação (menor)":
-    df_det = df_det.sort_values('Ocupação %', ascending=True)
-elif ordenacao == "Vagas (maior)":
-    df_det = df_det.sort_values('Vagas', ascending=False)
-elif ordenacao == "Disponíveis (maior)":
-    df_det = df_det.sort_values('Disponiveis', ascending=False)
+    if filtro_serie_det != "Todas":
+        df_det = df_det[df_det['Série'] == filtro_serie_det]
 
-# Reorganiza colunas para exibição
-colunas_exibir = ['Unidade', 'Segmento', 'Turma', 'Turno', 'Vagas', 'Matriculados', 'Ocupação %', 'Novatos', 'Veteranos', 'Disponiveis', 'Pre-matriculados']
+    if filtro_turno_det != "Todos":
+        df_det = df_det[df_det['Turno'] == filtro_turno_det]
 
-# Verifica se todas as colunas existem
-colunas_disponiveis = [col for col in colunas_exibir if col in df_det.columns]
-if len(colunas_disponiveis) != len(colunas_exibir):
-    # Adiciona colunas faltantes com valor 0
-    for col in colunas_exibir:
-        if col not in df_det.columns:
-            df_det[col] = 0
+    # Aplica ordenação
+    if ordenacao == "Ocupação (maior)":
+        df_det = df_det.sort_values('Ocupação %', ascending=False)
+    elif ordenacao == "Ocupação (menor)":
+        df_det = df_det.sort_values('Ocupação %', ascending=True)
+    elif ordenacao == "Vagas (maior)":
+        df_det = df_det.sort_values('Vagas', ascending=False)
+    elif ordenacao == "Disponíveis (maior)":
+        df_det = df_det.sort_values('Disponiveis', ascending=False)
 
-df_exibir = df_det[colunas_exibir].copy()
+    # Reorganiza colunas para exibição
+    colunas_exibir = ['Unidade_curta', 'Segmento', 'Turma', 'Turno', 'Vagas', 'Matriculados', 'Ocupação %', 'Novatos', 'Veteranos', 'Disponiveis', 'Pre-matriculados']
 
-# Extrai nome curto da unidade
-df_exibir['Unidade'] = df_exibir['Unidade'].apply(lambda x: x.split('(')[1].replace(')', '') if '(' in str(x) else str(x))
-df_exibir.columns = ['Unidade', 'Segmento', 'Turma', 'Turno', 'Vagas', 'Matr.', 'Ocup.', 'Nov.', 'Vet.', 'Disp.', 'Pré']
+    # Verifica se todas as colunas existem
+    colunas_disponiveis = [col for col in colunas_exibir if col in df_det.columns]
+    if len(colunas_disponiveis) != len(colunas_exibir):
+        # Adiciona colunas faltantes com valor 0
+        for col in colunas_exibir:
+            if col not in df_det.columns:
+                df_det[col] = 0
 
-# Prepara DataFrame para exibição
-df_exibir['Ocup.'] = df_exibir['Ocup.'].apply(lambda x: f"{x:.1f}%" if pd.notna(x) else "0%")
+    df_exibir = df_det[colunas_exibir].copy()
 
-# Converte colunas numéricas para int
-for col in ['Vagas', 'Matr.', 'Nov.', 'Vet.', 'Disp.', 'Pré']:
-    df_exibir[col] = df_exibir[col].apply(lambda x: int(float(x)) if pd.notna(x) else 0)
+    df_exibir.columns = ['Unidade', 'Segmento', 'Turma', 'Turno', 'Vagas', 'Matr.', 'Ocup.', 'Nov.', 'Vet.', 'Disp.', 'Pré']
 
-# Exibe tabela usando Streamlit nativo
-if len(df_exibir) > 0:
-    st.dataframe(
-        df_exibir,
-        use_container_width=True,
-        height=450,
-        hide_index=True
-    )
-    st.caption(f"Exibindo {len(df_exibir)} turmas • Filtros: {filtro_unidade_det} | {filtro_segmento_det} | {filtro_turno_det}")
-else:
-    st.info("Nenhuma turma encontrada com os filtros selecionados.")
+    # Prepara DataFrame para exibição
+    df_exibir['Ocup.'] = df_exibir['Ocup.'].apply(lambda x: f"{x:.1f}%" if pd.notna(x) else "0%")
 
-st.markdown("<br>", unsafe_allow_html=True)
+    # Converte colunas numéricas para int
+    for col in ['Vagas', 'Matr.', 'Nov.', 'Vet.', 'Disp.', 'Pré']:
+        df_exibir[col] = df_exibir[col].apply(lambda x: int(float(x)) if pd.notna(x) else 0)
+
+    # Exibe tabela usando Streamlit nativo
+    if len(df_exibir) > 0:
+        st.dataframe(
+            df_exibir,
+            use_container_width=True,
+            height=450,
+            hide_index=True
+        )
+        st.caption(f"Exibindo {len(df_exibir)} turmas • Filtros: {filtro_unidade_det} | {filtro_segmento_det} | {filtro_turno_det}")
+    else:
+        st.info("Nenhuma turma encontrada com os filtros selecionados.")
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+
+fragmento_detalhamento()
 
-# Download do relatório filtrado
-csv_filtrado = df_relatorio.to_csv(index=False).encode('utf-8')
+# Download do relatório filtrado (gerado só no clique; depende dos filtros, então não vai para o cache em disco)
 col_dl1, col_dl2, col_dl3 = st.columns([1, 1, 1])
 with col_dl1:
     st.download_button(
         label="📥 Exportar CSV",
-        data=csv_filtrado,
+        data=lambda: df_relatorio.to_csv(index=False),
         file_name=f"relatorio_executivo_{resumo['data_extracao'][:10]}.csv",
         mime="text/csv",
     )
 with col_dl2:
-    excel_data = df_relatorio.to_csv(index=False, sep=';').encode('utf-8')
     st.download_button(
         label="📊 Exportar Excel",
-        data=excel_data,
+        data=lambda: df_relatorio.to_csv(index=False, sep=';'),
         file_name=f"relatorio_executivo_{resumo['data_extracao'][:10]}.csv",
         mime="text/csv",
     )
 with col_dl3:
     # Gera relatório PDF (HTML para impressão)
-    html_pdf = gerar_relatorio_pdf(resumo, df_perf_unidade, df_relatorio, total)
     st.download_button(
         label="📄 Relatório PDF",
-        data=html_pdf.encode('utf-8'),
+        data=lambda: gerar_relatorio_pdf(resumo, df_perf_unidade, df_relatorio, total),
         file_name=f"relatorio_executivo_{resumo['data_extracao'][:10]}.html",
         mime="text/html",
         help="Baixe e abra no navegador. Use Ctrl+P para salvar como PDF."
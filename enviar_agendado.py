@@ -16,6 +16,13 @@ from pathlib import Path
 from datetime import datetime, timedelta
 from io import BytesIO
 
+import artefatos
+import modelos_html
+import tabelas
+from classificacao import classificar_dados
+from modelos_html import classes, linhas
+from relatorios import slug_relatorio
+
 BASE_DIR = Path(__file__).parent
 OUTPUT_DIR = BASE_DIR / "output"
 
@@ -45,7 +52,7 @@ def carregar_dados():
         resumo = json.load(f)
     with open(OUTPUT_DIR / "vagas_ultimo.json") as f:
         vagas = json.load(f)
-    return resumo, vagas
+    return classificar_dados(resumo), classificar_dados(vagas)
 
 def deve_enviar_agora(schedule):
     """Verifica se deve enviar o relatório agora"""
@@ -79,117 +86,32 @@ def deve_enviar_agora(schedule):
 
     return False
 
+def nome_artefato_email(tipo_relatorio):
+    """Nome do HTML de email pré-renderizado (pre_renderizar.py)"""
+    return f"email_{slug_relatorio(tipo_relatorio)}.html"
+
 def gerar_html_relatorio(resumo, vagas, tipo_relatorio):
-    """Gera HTML do relatório"""
+    """Gera HTML do relatório (determinístico por snapshot, para poder ser pré-renderizado)"""
     total = resumo['total_geral']
+    data_extracao = datetime.fromisoformat(resumo['data_extracao'])
     ocupacao = round(total['matriculados'] / total['vagas'] * 100, 1)
-
-    # Cor da ocupação baseada no valor
-    cor_ocupacao = "#22c55e" if ocupacao >= 70 else ("#f97316" if ocupacao >= 50 else "#ef4444")
-
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <title>{tipo_relatorio} - Colégio Elo</title>
-        <style>
-            body {{ font-family: 'Segoe UI', Arial, sans-serif; margin: 0; padding: 30px; background: #f8fafc; }}
-            .container {{ max-width: 700px; margin: 0 auto; background: white; border-radius: 12px; box-shadow: 0 4px 20px rgba(0,0,0,0.1); overflow: hidden; }}
-            .header {{ background: linear-gradient(135deg, #1e4976 0%, #2563eb 100%); color: white; padding: 30px; }}
-            .header h1 {{ margin: 0; font-size: 24px; }}
-            .header p {{ margin: 10px 0 0 0; opacity: 0.9; }}
-            .content {{ padding: 30px; }}
-            .kpi-grid {{ display: grid; grid-template-columns: repeat(2, 1fr); gap: 15px; margin-bottom: 25px; }}
-            .kpi {{ background: #f8fafc; border-radius: 10px; padding: 20px; text-align: center; }}
-            .kpi-value {{ font-size: 32px; font-weight: 700; color: {cor_ocupacao}; }}
-            .kpi-label {{ font-size: 12px; color: #64748b; text-transform: uppercase; margin-top: 5px; }}
-            table {{ width: 100%; border-collapse: collapse; margin-top: 20px; }}
-            th {{ background: #1e4976; color: white; padding: 12px; text-align: center; font-size: 13px; }}
-            td {{ border: 1px solid #e2e8f0; padding: 10px; text-align: center; font-size: 13px; }}
-            tr:nth-child(even) {{ background: #f8fafc; }}
-            .ocupacao-alta {{ color: #22c55e; font-weight: bold; }}
-            .ocupacao-media {{ color: #f97316; font-weight: bold; }}
-            .ocupacao-baixa {{ color: #ef4444; font-weight: bold; }}
-            .footer {{ text-align: center; padding: 20px; color: #94a3b8; font-size: 12px; border-top: 1px solid #e2e8f0; }}
-            .btn {{ display: inline-block; background: #2563eb; color: white; padding: 12px 24px; border-radius: 8px; text-decoration: none; margin-top: 15px; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>📊 {tipo_relatorio}</h1>
-                <p>Colégio Elo • {datetime.now().strftime('%d/%m/%Y às %H:%M')}</p>
-            </div>
-
-            <div class="content">
-                <div class="kpi-grid">
-                    <div class="kpi">
-                        <div class="kpi-value">{ocupacao}%</div>
-                        <div class="kpi-label">Ocupação Geral</div>
-                    </div>
-                    <div class="kpi">
-                        <div class="kpi-value" style="color: #2563eb;">{total['matriculados']:,}</div>
-                        <div class="kpi-label">Matriculados</div>
-                    </div>
-                    <div class="kpi">
-                        <div class="kpi-value" style="color: #64748b;">{total['vagas']:,}</div>
-                        <div class="kpi-label">Vagas Totais</div>
-                    </div>
-                    <div class="kpi">
-                        <div class="kpi-value" style="color: #f97316;">{total['disponiveis']:,}</div>
-                        <div class="kpi-label">Disponíveis</div>
-                    </div>
-                </div>
-
-                <h3 style="color: #1e4976; margin-top: 25px;">Por Unidade</h3>
-                <table>
-                    <tr>
-                        <th>Unidade</th>
-                        <th>Vagas</th>
-                        <th>Matriculados</th>
-                        <th>Disponíveis</th>
-                        <th>Ocupação</th>
-                    </tr>
-    """
-
-    for unidade in resumo['unidades']:
-        nome = unidade['nome'].split('(')[1].replace(')', '') if '(' in unidade['nome'] else unidade['nome']
-        t = unidade['total']
-        ocup = round(t['matriculados'] / t['vagas'] * 100, 1)
-
-        classe_ocup = 'ocupacao-alta' if ocup >= 70 else ('ocupacao-media' if ocup >= 50 else 'ocupacao-baixa')
-
-        html += f"""
-                    <tr>
-                        <td style="text-align: left;"><strong>{nome}</strong></td>
-                        <td>{t['vagas']}</td>
-                        <td>{t['matriculados']}</td>
-                        <td>{t['disponiveis']}</td>
-                        <td class="{classe_ocup}">{ocup}%</td>
-                    </tr>
-        """
-
-    html += f"""
-                </table>
-
-                <div style="text-align: center; margin-top: 25px;">
-                    <a href="https://brunaviegas-siga-vagas-dashboard.streamlit.app" class="btn">
-                        Ver Dashboard Completo
-                    </a>
-                </div>
-            </div>
-
-            <div class="footer">
-                <p>Relatório automático enviado pelo SIGA Vagas Dashboard</p>
-                <p>Colégio Elo © {datetime.now().year}</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-
-    return html
+    unidades = tabelas.colunas_unidades(resumo)
+    ocup_unidades = tabelas.percentual(unidades['Matriculados'], unidades['Vagas'])
+
+    return modelos_html.renderizar(
+        "email_agendado.html",
+        tipo_relatorio=tipo_relatorio,
+        data_extracao=data_extracao.strftime('%d/%m/%Y às %H:%M'),
+        ano=data_extracao.year,
+        total=total,
+        ocupacao=ocupacao,
+        # Cor da ocupação baseada no valor
+        cor_ocupacao="#22c55e" if ocupacao >= 70 else ("#f97316" if ocupacao >= 50 else "#ef4444"),
+        unidades=linhas(
+            unidades['Unidade_curta'], unidades['Vagas'], unidades['Matriculados'], unidades['Disponiveis'],
+            ocup_unidades, classes(ocup_unidades, [(70, 'bom'), (50, 'atencao')], padrao='critico'),
+        ),
+    )
 
 def gerar_texto_whatsapp(resumo, tipo_relatorio):
     """Gera texto para WhatsApp"""
@@ -205,7 +127,7 @@ def gerar_texto_whatsapp(resumo, tipo_relatorio):
 
     msg += "*Por Unidade:*\n"
     for unidade in resumo['unidades']:
-        nome = unidade['nome'].split('(')[1].replace(')', '') if '(' in unidade['nome'] else unidade['nome']
+        nome = unidade['unidade_curta']
         t = unidade['total']
         ocup = round(t['matriculados'] / t['vagas'] * 100, 1)
         emoji = "🟢" if ocup >= 70 else ("🟡" if ocup >= 50 else "🔴")
@@ -326,8 +248,11 @@ def main():
     config_email = carregar_config_email()
     canais_enviados = []
 
-    # Gera conteúdo
-    html_content = gerar_html_relatorio(resumo, vagas, tipo_relatorio)
+    # Gera conteúdo (normalmente já pré-renderizado após a extração)
+    html_content = artefatos.obter_artefato(
+        nome_artefato_email(tipo_relatorio), artefatos.versao_snapshot(resumo),
+        lambda: gerar_html_relatorio(resumo, vagas, tipo_relatorio)
+    ).decode('utf-8')
     texto_whatsapp = gerar_texto_whatsapp(resumo, tipo_relatorio)
 
     # Envia por email
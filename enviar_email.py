@@ -10,6 +10,11 @@ from email.mime.multipart import MIMEMultipart
 from pathlib import Path
 from datetime import datetime
 
+import modelos_html
+import tabelas
+from classificacao import classificar_dados
+from modelos_html import classes, linhas
+
 def carregar_config():
     config_path = Path(__file__).parent / ".email-config"
     config = {}
@@ -23,104 +28,27 @@ def carregar_config():
 def carregar_resumo():
     resumo_path = Path(__file__).parent / "output" / "resumo_ultimo.json"
     with open(resumo_path) as f:
-        return json.load(f)
+        return classificar_dados(json.load(f))
 
 def formatar_email(resumo, alertas=None):
     total = resumo['total_geral']
     ocupacao = round(total['matriculados'] / total['vagas'] * 100, 1)
-
-    # Cor da ocupação baseada no valor
-    cor_ocupacao = "#ff4444" if ocupacao >= 80 else "#70AD47"
-
-    html = f"""
-    <html>
-    <head>
-        <style>
-            body {{ font-family: Arial, sans-serif; }}
-            h2 {{ color: #4472C4; }}
-            table {{ border-collapse: collapse; width: 100%; max-width: 600px; }}
-            th, td {{ border: 1px solid #ddd; padding: 10px; text-align: center; }}
-            th {{ background-color: #4472C4; color: white; }}
-            .total {{ background-color: #D6DCE5; font-weight: bold; }}
-            .ocupacao {{ font-size: 24px; color: {cor_ocupacao}; font-weight: bold; }}
-            .alerta-box {{ background-color: #fff3cd; border: 2px solid #ff4444; border-radius: 8px; padding: 15px; margin: 15px 0; }}
-            .alerta-titulo {{ color: #ff4444; font-size: 18px; font-weight: bold; margin-bottom: 10px; }}
-            .alerta-item {{ color: #856404; margin: 5px 0; }}
-            .alta {{ background-color: #ffcccc; color: #cc0000; font-weight: bold; }}
-        </style>
-    </head>
-    <body>
-        <h2>Relatório de Vagas - Colégio Elo</h2>
-        <p>Extração realizada em: <strong>{resumo['data_extracao'][:16].replace('T', ' ')}</strong></p>
-    """
-
-    # Adiciona box de alertas se houver
-    if alertas and len(alertas) > 0:
-        html += """
-        <div class="alerta-box">
-            <div class="alerta-titulo">🚨 ALERTAS DE OCUPAÇÃO ALTA (≥80%)</div>
-        """
-        for alerta in alertas:
-            html += f'<div class="alerta-item">{alerta}</div>'
-        html += "</div>"
-
-    html += f"""
-        <h3>Resumo Geral</h3>
-        <p class="ocupacao">Ocupação: {ocupacao}%</p>
-        <p>Matriculados: <strong>{total['matriculados']}</strong> de <strong>{total['vagas']}</strong> vagas</p>
-        <p>Disponíveis: <strong>{total['disponiveis']}</strong> | Novatos: <strong>{total['novatos']}</strong> | Veteranos: <strong>{total['veteranos']}</strong></p>
-
-        <h3>Por Unidade</h3>
-        <table>
-            <tr>
-                <th>Unidade</th>
-                <th>Vagas</th>
-                <th>Matriculados</th>
-                <th>Disponíveis</th>
-                <th>Ocupação</th>
-            </tr>
-    """
-
-    for unidade in resumo['unidades']:
-        nome = unidade['nome'].split('(')[1].replace(')', '') if '(' in unidade['nome'] else unidade['nome']
-        t = unidade['total']
-        ocup = round(t['matriculados'] / t['vagas'] * 100, 1)
-        classe_ocup = 'class="alta"' if ocup >= 80 else ''
-        html += f"""
-            <tr>
-                <td>{nome}</td>
-                <td>{t['vagas']}</td>
-                <td>{t['matriculados']}</td>
-                <td>{t['disponiveis']}</td>
-                <td {classe_ocup}>{ocup}%</td>
-            </tr>
-        """
-
-    html += f"""
-            <tr class="total">
-                <td>TOTAL</td>
-                <td>{total['vagas']}</td>
-                <td>{total['matriculados']}</td>
-                <td>{total['disponiveis']}</td>
-                <td>{ocupacao}%</td>
-            </tr>
-        </table>
-
-        <p style="margin-top: 20px;">
-            <a href="https://brunaviegas-siga-vagas-dashboard.streamlit.app"
-               style="background-color: #4472C4; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px;">
-                Ver Dashboard Completo
-            </a>
-        </p>
-
-        <p style="color: #888; font-size: 12px; margin-top: 30px;">
-            Email automático enviado pelo SIGA Vagas Extractor
-        </p>
-    </body>
-    </html>
-    """
-
-    return html
+    unidades = tabelas.colunas_unidades(resumo)
+    ocup_unidades = tabelas.percentual(unidades['Matriculados'], unidades['Vagas'])
+
+    return modelos_html.renderizar(
+        "email_extracao.html",
+        data=resumo['data_extracao'][:16].replace('T', ' '),
+        alertas=alertas,
+        total=total,
+        ocupacao=ocupacao,
+        # Cor da ocupação baseada no valor
+        cor_ocupacao="#ff4444" if ocupacao >= 80 else "#70AD47",
+        unidades=linhas(
+            unidades['Unidade_curta'], unidades['Vagas'], unidades['Matriculados'], unidades['Disponiveis'],
+            ocup_unidades, classes(ocup_unidades, [(80, 'alta')]),
+        ),
+    )
 
 def verificar_alertas(resumo):
     """Verifica se há alertas de ocupação BAIXA (quanto maior ocupação, melhor)"""
@@ -136,7 +64,7 @@ def verificar_alertas(resumo):
 
     # Verifica ocupação por unidade
     for unidade in resumo['unidades']:
-        nome = unidade['nome'].split('(')[1].replace(')', '') if '(' in unidade['nome'] else unidade['nome']
+        nome = unidade['unidade_curta']
         t = unidade['total']
         ocup = round(t['matriculados'] / t['vagas'] * 100, 1)
         if ocup < 50:
@@ -219,7 +147,7 @@ def enviar_whatsapp():
     # Resumo por unidade
     msg += "*Por Unidade:*\n"
     for unidade in resumo['unidades']:
-        nome = unidade['nome'].split('(')[1].replace(')', '') if '(' in unidade['nome'] else unidade['nome']
+        nome = unidade['unidade_curta']
         t = unidade['total']
         ocup = round(t['matriculados'] / t['vagas'] * 100, 1)
         emoji = "🔴" if ocup >= 80 else "🟢"
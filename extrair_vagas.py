@@ -5,12 +5,18 @@ Extrai dados das 4 unidades do Colégio Elo e salva em SQLite/JSON
 """
 
 import json
-import sqlite3
 import re
-from datetime import datetime
+import sys
+from datetime import datetime, timedelta
 from pathlib import Path
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
 
+from atualizacao import Progresso, TravaExtracao, dados_recentes
+from classificacao import classificar_dados
+from periodos import importar_arquivos, salvar_sqlite
+from pre_renderizar import pre_renderizar
+from retencao import carregar_matriz as atualizar_retencao
+
 # Configurações
 CONFIG = {
     "url": "https://siga.activesoft.com.br/login/",
@@ -298,79 +304,6 @@ def extrair_via_snapshot(page) -> list:
     return turmas
 
 
-def salvar_sqlite(dados: dict, db_path: Path):
-    """Salva os dados em SQLite"""
-
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    # Cria tabelas se não existirem
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS extrações (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            data_extracao TEXT,
-            periodo TEXT
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS vagas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            extracao_id INTEGER,
-            unidade_codigo TEXT,
-            unidade_nome TEXT,
-            segmento TEXT,
-            curso TEXT,
-            turma TEXT,
-            vagas INTEGER,
-            novatos INTEGER,
-            veteranos INTEGER,
-            matriculados INTEGER,
-            vagas_restantes INTEGER,
-            pre_matriculados INTEGER,
-            disponiveis INTEGER,
-            FOREIGN KEY (extracao_id) REFERENCES extrações(id)
-        )
-    """)
-
-    # Insere extração
-    cursor.execute(
-        "INSERT INTO extrações (data_extracao, periodo) VALUES (?, ?)",
-        (dados["data_extracao"], dados["periodo"])
-    )
-    extracao_id = cursor.lastrowid
-
-    # Insere turmas
-    for unidade in dados["unidades"]:
-        for turma in unidade["turmas"]:
-            cursor.execute("""
-                INSERT INTO vagas (
-                    extracao_id, unidade_codigo, unidade_nome, segmento, curso, turma,
-                    vagas, novatos, veteranos, matriculados, vagas_restantes,
-                    pre_matriculados, disponiveis
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                extracao_id,
-                unidade["codigo"],
-                unidade["nome"],
-                turma["segmento"],
-                turma["curso"],
-                turma["turma"],
-                turma["vagas"],
-                turma["novatos"],
-                turma["veteranos"],
-                turma["matriculados"],
-                turma["vagas_restantes"],
-                turma["pre_matriculados"],
-                turma["disponiveis"],
-            ))
-
-    conn.commit()
-    conn.close()
-
-    print(f"  Dados salvos em SQLite: {db_path}")
-
-
 def salvar_json(dados: dict, json_path: Path):
     """Salva os dados em JSON"""
 
@@ -393,6 +326,7 @@ def gerar_resumo(dados: dict) -> dict:
         resumo_unidade = {
             "codigo": unidade["codigo"],
             "nome": unidade["nome"],
+            "unidade_curta": unidade["unidade_curta"],
             "segmentos": {},
             "total": {
                 "vagas": 0,
@@ -441,8 +375,35 @@ def gerar_resumo(dados: dict) -> dict:
     return resumo
 
 
-def main():
-    """Função principal"""
+def main(forcar=False):
+    """Função principal: extrai, ou devolve os dados de uma extração recém-concluída.
+
+    Só um processo extrai por vez (TravaExtracao). Quem chega com outra extração
+    rodando espera por ela e fica com o resultado dela; quem chega até
+    atualizacao.FRESCOR depois de uma extração usa os dados dela, a não ser com
+    `forcar` (--forcar na linha de comando).
+    """
+    pedido = datetime.now()
+    with TravaExtracao() as trava:
+        # Forçado, só serve o resultado de uma extração que terminou depois do pedido
+        recentes = dados_recentes(pedido, timedelta(0)) if forcar else dados_recentes(pedido)
+        if recentes is None:
+            return extrair()
+
+        origem = "extração que estava em andamento" if trava.esperou else "extração recente"
+        mensagem = f"Usando os dados da {origem} ({datetime.fromisoformat(recentes['data_extracao']):%d/%m %H:%M})"
+        print(mensagem)
+        # Os eventos da extração que gerou esses dados ficam no arquivo de progresso
+        Progresso(recomecar=False)("reaproveitado", mensagem, data_extracao=recentes["data_extracao"])
+        return recentes
+
+
+def extrair():
+    """Extração completa no SIGA (chamada por main com a trava de extração)"""
+
+    # Eventos de progresso para o botão "Atualizar" dos dashboards (atualizacao.py)
+    progresso = Progresso()
+    etapas = len(CONFIG["unidades"]) + 1
 
     print("=" * 60)
     print("SIGA - Extrator de Resumo de Vagas por Turma")
@@ -464,6 +425,7 @@ def main():
         try:
             # 1. Login
             print("\n[1/5] Fazendo login...")
+            progresso("login", "Fazendo login no SIGA", etapa=0, etapas=etapas)
             page.goto(CONFIG["url"], wait_until="domcontentloaded", timeout=120000)
             page.wait_for_timeout(2000)
 
@@ -481,6 +443,7 @@ def main():
             # 2. Para cada unidade
             for idx, unidade in enumerate(CONFIG["unidades"]):
                 print(f"\n[{idx+2}/5] Processando {unidade['nome']}...")
+                progresso("unidade", f"Extraindo {unidade['nome']}", etapa=idx + 1, etapas=etapas, unidade=unidade["codigo"])
 
                 # Se é a primeira unidade, seleciona diretamente na página de login/unidade
                 if idx == 0:
@@ -560,6 +523,10 @@ def main():
                     })
 
                     print(f"  Extraídas {len(turmas)} turmas")
+                    progresso(
+                        "turmas", f"{len(turmas)} turmas lidas em {unidade['nome']}",
+                        etapa=idx + 1, etapas=etapas, unidade=unidade["codigo"], turmas=len(turmas)
+                    )
 
                 except PlaywrightTimeout as e:
                     print(f"  ERRO: Timeout ao carregar relatório para {unidade['nome']}")
@@ -567,6 +534,10 @@ def main():
                     screenshot_path = OUTPUT_DIR / f"erro_{unidade['codigo']}_{datetime.now().strftime('%H%M%S')}.png"
                     page.screenshot(path=str(screenshot_path))
                     print(f"    Screenshot salvo: {screenshot_path}")
+                    progresso(
+                        "turmas", f"Timeout em {unidade['nome']}; unidade sem turmas nesta extração",
+                        etapa=idx + 1, etapas=etapas, unidade=unidade["codigo"], turmas=0, erro=str(e)
+                    )
                     dados["unidades"].append({
                         "codigo": unidade["codigo"],
                         "nome": unidade["nome"],
@@ -576,6 +547,7 @@ def main():
 
         except Exception as e:
             print(f"\nERRO: {e}")
+            progresso("erro", f"Extração interrompida: {e}")
             raise
 
         finally:
@@ -583,9 +555,13 @@ def main():
 
     # 3. Salva dados
     print("\n[5/5] Salvando dados...")
+    progresso("salvando", "Salvando JSON e vagas.db", etapa=etapas, etapas=etapas)
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
+    # Série, turno e nome curto classificados uma única vez, aqui
+    classificar_dados(dados)
+
     # JSON completo
     json_path = OUTPUT_DIR / f"vagas_{timestamp}.json"
     salvar_json(dados, json_path)
@@ -606,6 +582,29 @@ def main():
     import shutil
     shutil.copy(json_path, ultimo_json)
     shutil.copy(resumo_path, ultimo_resumo)
+    progresso(
+        "gravado", "Dados novos gravados", etapa=etapas, etapas=etapas,
+        data_extracao=dados["data_extracao"], turmas=sum(len(u["turmas"]) for u in dados["unidades"])
+    )
+
+    # Anos anteriores (dados_<ano>.json) que ainda não estão em vagas.db, para o comparativo entre anos
+    importados = importar_arquivos(db_path, OUTPUT_DIR)
+    if importados:
+        print(f"  Anos importados para o SQLite: {', '.join(map(str, importados))}")
+
+    # Matriz de retenção por série (output/retencao.json), recalculada com o novo snapshot
+    try:
+        atualizar_retencao(OUTPUT_DIR)
+    except Exception as e:
+        print(f"  AVISO: matriz de retenção não atualizada ({e}); o dashboard recalcula ao abrir")
+
+    # Relatórios do snapshot prontos para os dashboards e o envio agendado
+    print("\nPré-renderizando relatórios...")
+    progresso("relatorios", "Pré-renderizando relatórios", etapa=etapas, etapas=etapas)
+    try:
+        pre_renderizar(resumo, dados)
+    except Exception as e:
+        print(f"  AVISO: pré-renderização falhou ({e}); os relatórios serão gerados sob demanda")
 
     # 4. Imprime resumo
     print("\n" + "=" * 60)
@@ -620,9 +619,10 @@ def main():
 
     print(f"\nTOTAL GERAL: {resumo['total_geral']['matriculados']} matriculados / {resumo['total_geral']['vagas']} vagas")
     print("=" * 60)
+    progresso("concluido", "Extração concluída", etapa=etapas, etapas=etapas)
 
     return dados
 
 
 if __name__ == "__main__":
-    main()
+    main(forcar="--forcar" in sys.argv[1:])
@@ -0,0 +1,76 @@
+"""
+Fila de geração de relatórios em segundo plano.
+
+Cada pedido é identificado por (tipo, formato, versão do snapshot). A geração
+roda num pool de threads fora do script do Streamlit e o resultado vai para o
+cache em disco de artefatos.py, compartilhado por todas as sessões: pedidos
+iguais enquanto um relatório está sendo gerado reaproveitam o mesmo job.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import artefatos
+import relatorios
+
+PRONTO = "pronto"
+GERANDO = "gerando"
+ERRO = "erro"
+
+
+def _renderizar_artefato(resumo, vagas, tipo_relatorio, formato, versao):
+    nome = relatorios.nome_artefato(tipo_relatorio, formato)
+    return artefatos.obter_artefato(
+        nome, versao, lambda: relatorios.renderizar(resumo, vagas, tipo_relatorio, formato)
+    )
+
+
+class FilaRelatorios:
+    """Pool de workers + registro dos jobs em andamento"""
+
+    def __init__(self, max_workers=2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="relatorio")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def enviar(self, resumo, vagas, tipo_relatorio, formato):
+        """Enfileira o relatório se ainda não estiver em disco nem em andamento; devolve a chave do job"""
+        versao = artefatos.versao_snapshot(resumo)
+        chave = (tipo_relatorio, formato, versao)
+        if self._caminho(chave).exists():
+            return chave
+        with self._lock:
+            # Jobs concluídos de snapshots anteriores não são mais consultados
+            for antiga in [k for k, j in self._jobs.items() if k[2] != versao and j.done()]:
+                del self._jobs[antiga]
+            job = self._jobs.get(chave)
+            # Sem job, ou job concluído cujo arquivo já foi podado: gera de novo.
+            # Jobs com erro ficam registrados até `descartar` (evita refazer a cada poll).
+            if job is None or (job.done() and job.exception() is None):
+                self._jobs[chave] = self._executor.submit(
+                    _renderizar_artefato, resumo, vagas, tipo_relatorio, formato, versao
+                )
+        return chave
+
+    def status(self, chave):
+        """(PRONTO, bytes) | (GERANDO, None) | (ERRO, mensagem)"""
+        with self._lock:
+            job = self._jobs.get(chave)
+        if job is not None and not job.done():
+            return GERANDO, None
+        if job is not None and job.exception() is not None:
+            return ERRO, str(job.exception())
+        caminho = self._caminho(chave)
+        if caminho.exists():
+            return PRONTO, caminho.read_bytes()
+        return GERANDO, None
+
+    def descartar(self, chave):
+        """Esquece o job (ex.: para tentar de novo depois de um erro)"""
+        with self._lock:
+            self._jobs.pop(chave, None)
+
+    @staticmethod
+    def _caminho(chave):
+        tipo_relatorio, formato, versao = chave
+        return artefatos.caminho_artefato(relatorios.nome_artefato(tipo_relatorio, formato), versao)
@@ -0,0 +1,85 @@
+"""
+Figuras Plotly cacheadas sem tema, com o tema aplicado na exibição.
+
+As funções de gráfico dos dashboards devolvem `spec(fig)`: o dicionário da
+figura só com dados e estilos fixos (cores de ocupação, linhas de meta), sem
+template e sem as cores de texto, grade e fundo. Esse dicionário vai para o
+st.cache_data por snapshot e parâmetros (picklar um dict é barato; uma
+go.Figure é revalidada ao sair do cache). Na exibição, `aplicar_tema` completa
+o dicionário com as cores do tema escolhido e monta a figura: trocar o tema ou
+mexer em outro widget não recalcula nenhum trace.
+"""
+
+import plotly.graph_objects as go
+
+TRANSPARENTE = "rgba(0,0,0,0)"
+
+
+def _tema(texto, texto_suave, grade, fundo_gauge, fonte=None):
+    """Cores que o tema completa em cada spec (valores já definidos na spec prevalecem)"""
+    fonte_base = {"color": texto_suave}
+    if fonte:
+        fonte_base["family"] = fonte
+    eixo = {"gridcolor": grade, "tickfont": {"color": texto_suave}}
+    barra_cores = {"tickfont": {"color": texto_suave}, "title": {"font": {"color": texto_suave}}}
+    return {
+        "layout": {
+            "paper_bgcolor": TRANSPARENTE,
+            "plot_bgcolor": TRANSPARENTE,
+            "font": fonte_base,
+            "title": {"font": {"color": texto}},
+            "xaxis": eixo,
+            "yaxis": eixo,
+            "legend": {"font": {"color": texto_suave}},
+        },
+        "traces": {
+            "bar": {"textfont": {"color": texto}},
+            "heatmap": {"colorbar": barra_cores},
+            "treemap": {"marker": {"colorbar": barra_cores}},
+            "indicator": {
+                "number": {"font": {"color": texto}},
+                "title": {"font": {"color": texto_suave}},
+                "gauge": {
+                    "bgcolor": fundo_gauge,
+                    "axis": {"tickcolor": texto_suave, "tickfont": {"color": texto_suave}},
+                    "threshold": {"line": {"color": texto}},
+                },
+            },
+        },
+    }
+
+
+TEMAS = {
+    # dashboard_cloud.py (segue o toggle de tema)
+    "escuro": _tema("#ffffff", "#94a3b8", "rgba(59, 130, 246, 0.1)", "rgba(15, 33, 55, 0.5)"),
+    "claro": _tema("#1e293b", "#64748b", "rgba(59, 130, 246, 0.15)", "rgba(241, 245, 249, 0.8)"),
+    # dashboard.py (página sempre escura)
+    "executivo": _tema("#ffffff", "#a0a0b0", "rgba(102, 126, 234, 0.1)", "rgba(30, 30, 48, 0.5)",
+                       fonte="Inter, sans-serif"),
+}
+
+
+def spec(fig):
+    """Dicionário da figura sem o template padrão (o que vai para o cache)"""
+    dados = fig.to_dict()
+    dados["layout"].pop("template", None)
+    return dados
+
+
+def _completar(valor, padroes):
+    """Cópia de `valor` com as chaves de `padroes` que faltam (recursivo em dicts)"""
+    completo = dict(valor)
+    for chave, padrao in padroes.items():
+        atual = completo.get(chave)
+        if atual is None:
+            completo[chave] = padrao
+        elif isinstance(atual, dict) and isinstance(padrao, dict):
+            completo[chave] = _completar(atual, padrao)
+    return completo
+
+
+def aplicar_tema(dados, tema):
+    """go.Figure a partir da spec cacheada com as cores do tema (a spec não é alterada)"""
+    cores = TEMAS[tema]
+    traces = [_completar(trace, cores["traces"].get(trace.get("type"), {})) for trace in dados["data"]]
+    return go.Figure({"data": traces, "layout": _completar(dados["layout"], cores["layout"])})
@@ -0,0 +1,76 @@
+"""
+Templates Jinja2 dos relatórios HTML e emails (diretório modelos/).
+
+Todos os templates estendem modelos/base.html, que embute a folha de estilo
+comum (modelos/estilo.css). O ambiente é criado uma vez por processo e os
+templates são compilados na importação, então cada relatório só executa o
+código já compilado. As tabelas recebem linhas montadas a partir de colunas
+(listas, arrays ou Series) com `linhas`, sem iterar DataFrames linha a linha,
+e com o texto escapado por coluna em vez de célula a célula.
+"""
+
+import html
+from pathlib import Path
+
+import numpy as np
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+DIR_MODELOS = Path(__file__).parent / "modelos"
+URL_DASHBOARD = "https://brunaviegas-siga-vagas-dashboard.streamlit.app"
+
+
+def milhar(valor, separador=",", sinal=False):
+    """1234 -> '1,234' ('1.234' com separador='.'; '+1,234' com sinal=True)"""
+    formato = "+," if sinal else ","
+    return format(int(valor), formato).replace(",", separador)
+
+
+def _coluna(coluna):
+    """Valores da coluna como objetos Python; texto já escapado para HTML"""
+    valores = coluna.tolist() if hasattr(coluna, "tolist") else list(coluna)
+    if valores and isinstance(valores[0], str):
+        # Um escape por valor distinto: segmentos, unidades e classes se repetem muito
+        escapados = {valor: html.escape(valor) for valor in set(valores)}
+        valores = [escapados[valor] for valor in valores]
+    return valores
+
+
+def linhas(*colunas):
+    """Tuplas de linha a partir de colunas de mesmo tamanho (listas, arrays ou Series).
+
+    O texto sai escapado coluna a coluna, então os laços de linhas dos templates
+    ficam dentro de {% autoescape false %} (sem um escape por célula).
+    """
+    return list(zip(*(_coluna(coluna) for coluna in colunas)))
+
+
+def classes(valores, faixas, padrao=""):
+    """Classe CSS por valor: a da primeira faixa (limite, classe) com valor >= limite"""
+    valores = np.asarray(valores, dtype=float)
+    return np.select(
+        [valores >= limite for limite, _ in faixas], [classe for _, classe in faixas], default=padrao
+    ).tolist()
+
+
+_ambiente = Environment(
+    loader=FileSystemLoader(DIR_MODELOS),
+    autoescape=select_autoescape(["html"]),
+    trim_blocks=True,
+    lstrip_blocks=True,
+    auto_reload=False,
+)
+_ambiente.filters["milhar"] = milhar
+_ambiente.globals["url_dashboard"] = URL_DASHBOARD
+
+
+def precompilar():
+    """Compila todos os templates (ficam no cache do ambiente)"""
+    for nome in _ambiente.list_templates(extensions=["html"]):
+        _ambiente.get_template(nome)
+
+
+def renderizar(nome, **contexto):
+    return _ambiente.get_template(nome).render(**contexto)
+
+
+precompilar()
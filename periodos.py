@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Todos os anos letivos em vagas.db e comparação entre anos.
+
+Cada extração fica em `extrações` com o seu `periodo`. Os arquivos de anos
+anteriores (output/dados_<ano>.json) e o snapshot atual entram no banco uma
+única vez, identificados por período + data da extração. Com os índices por
+período e por extração, a última extração de cada ano e as somas por unidade e
+segmento saem de uma consulta só, para qualquer conjunto de anos.
+
+Cada extração guarda também o dia da campanha de matrículas (dias desde o
+início da campanha do seu ano letivo), indexado com o período: o snapshot do
+ano anterior no mesmo ponto da campanha é uma busca no índice, sem varrer o
+histórico dos dois anos.
+
+Uso: python periodos.py   (importa os arquivos de output/ e lista os anos gravados)
+"""
+
+import json
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+
+import pandas as pd
+
+import conexoes
+import retencao
+from classificacao import (
+    SEGMENTOS_ORDEM, classificar_dados, classificar_serie, classificar_turno, id_turma, nome_curto_unidade,
+)
+
+OUTPUT_DIR = Path(__file__).parent / "output"
+DB_PATH = OUTPUT_DIR / "vagas.db"
+
+METRICAS = ("Vagas", "Novatos", "Veteranos", "Matriculados")
+
+# A campanha do ano letivo N (rematrícula + captação) começa em 1º de outubro de N-1
+INICIO_CAMPANHA = (10, 1)
+
+INDICES = (
+    "CREATE INDEX IF NOT EXISTS idx_extracoes_periodo ON 'extrações' (periodo, data_extracao)",
+    "CREATE INDEX IF NOT EXISTS idx_extracoes_campanha ON 'extrações' (periodo, dia_campanha)",
+    "CREATE INDEX IF NOT EXISTS idx_vagas_extracao ON vagas (extracao_id, unidade_codigo, segmento)",
+    "CREATE INDEX IF NOT EXISTS idx_vagas_turma ON vagas (turma_id, extracao_id)",
+)
+
+# Última extração do período até o dia de campanha pedido (busca no idx_extracoes_campanha)
+QUERY_EXTRACAO_NO_DIA = """
+SELECT id, data_extracao, dia_campanha FROM 'extrações'
+WHERE periodo = ? AND dia_campanha <= ?
+ORDER BY dia_campanha DESC, id DESC LIMIT 1
+"""
+
+QUERY_SOMAS_EXTRACAO = """
+SELECT unidade_codigo, segmento, SUM(vagas), SUM(novatos), SUM(veteranos), SUM(matriculados)
+FROM vagas WHERE extracao_id = ?
+GROUP BY unidade_codigo, segmento
+"""
+
+# Última extração de cada período pedido e somas por unidade/segmento
+QUERY_COMPARATIVO = """
+WITH ultimas AS (
+    SELECT id, periodo FROM (
+        SELECT id, periodo,
+               ROW_NUMBER() OVER (PARTITION BY periodo ORDER BY data_extracao DESC, id DESC) AS ordem
+        FROM 'extrações' WHERE periodo IN ({marcadores})
+    ) WHERE ordem = 1
+)
+SELECT u.periodo, v.unidade_codigo, v.segmento,
+       SUM(v.vagas), SUM(v.novatos), SUM(v.veteranos), SUM(v.matriculados)
+FROM ultimas u JOIN vagas v ON v.extracao_id = u.id
+GROUP BY u.periodo, v.unidade_codigo, v.segmento
+"""
+
+# Séries por extração do período: por unidade, total e por segmento (historico_periodo)
+QUERIES_HISTORICO = (
+    """
+    SELECT e.data_extracao, v.unidade_codigo, v.unidade_nome,
+           SUM(v.vagas) as vagas, SUM(v.matriculados) as matriculados,
+           SUM(v.novatos) as novatos, SUM(v.veteranos) as veteranos,
+           SUM(v.disponiveis) as disponiveis
+    FROM vagas v JOIN 'extrações' e ON v.extracao_id = e.id
+    WHERE e.periodo = ?
+    GROUP BY e.id, v.unidade_codigo ORDER BY e.data_extracao
+    """,
+    """
+    SELECT e.data_extracao, SUM(v.vagas) as vagas, SUM(v.matriculados) as matriculados,
+           SUM(v.novatos) as novatos, SUM(v.veteranos) as veteranos, SUM(v.disponiveis) as disponiveis
+    FROM vagas v JOIN 'extrações' e ON v.extracao_id = e.id
+    WHERE e.periodo = ?
+    GROUP BY e.id ORDER BY e.data_extracao
+    """,
+    """
+    SELECT e.data_extracao, v.segmento, SUM(v.vagas) as vagas,
+           SUM(v.matriculados) as matriculados, SUM(v.disponiveis) as disponiveis
+    FROM vagas v JOIN 'extrações' e ON v.extracao_id = e.id
+    WHERE e.periodo = ?
+    GROUP BY e.id, v.segmento ORDER BY e.data_extracao
+    """,
+)
+
+
+def preparar_banco(cursor):
+    """Cria tabelas e índices e atualiza bancos antigos (colunas de classificação, rótulos de segmento)"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS extrações (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data_extracao TEXT,
+            periodo TEXT,
+            dia_campanha INTEGER
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS vagas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            extracao_id INTEGER,
+            unidade_codigo TEXT,
+            unidade_nome TEXT,
+            segmento TEXT,
+            curso TEXT,
+            turma TEXT,
+            vagas INTEGER,
+            novatos INTEGER,
+            veteranos INTEGER,
+            matriculados INTEGER,
+            vagas_restantes INTEGER,
+            pre_matriculados INTEGER,
+            disponiveis INTEGER,
+            serie TEXT,
+            turno TEXT,
+            unidade_curta TEXT,
+            turma_id TEXT,
+            FOREIGN KEY (extracao_id) REFERENCES extrações(id)
+        )
+    """)
+    migrar_colunas_classificacao(cursor)
+    migrar_dia_campanha(cursor)
+    migrar_id_turma(cursor)
+    cursor.executemany(
+        "UPDATE vagas SET segmento = ? WHERE segmento = ?",
+        [("Fund. I", "Fund. 1"), ("Fund. II", "Fund. 2")]
+    )
+    for indice in INDICES:
+        cursor.execute(indice)
+
+
+def garantir_esquema(db_path=DB_PATH):
+    """Aplica preparar_banco num banco existente (colunas e índices novos) e grava"""
+    conn = sqlite3.connect(db_path)
+    preparar_banco(conn.cursor())
+    conn.commit()
+    conn.close()
+
+
+def tem_coluna(conn, tabela, coluna):
+    """Se `tabela` já tem `coluna`: as leituras só conferem, quem migra é quem grava (preparar_banco)"""
+    return any(linha[1] == coluna for linha in conn.execute(f"PRAGMA table_info('{tabela}')"))
+
+
+def migrar_colunas_classificacao(cursor):
+    """Adiciona serie/turno/unidade_curta em bancos antigos e preenche as linhas já gravadas"""
+    colunas = {row[1] for row in cursor.execute("PRAGMA table_info(vagas)")}
+    for coluna in ("serie", "turno", "unidade_curta"):
+        if coluna not in colunas:
+            cursor.execute(f"ALTER TABLE vagas ADD COLUMN {coluna} TEXT")
+
+    pendentes = cursor.execute(
+        "SELECT DISTINCT turma, unidade_nome FROM vagas WHERE serie IS NULL OR unidade_curta IS NULL"
+    ).fetchall()
+    if pendentes:
+        cursor.executemany(
+            "UPDATE vagas SET serie = ?, turno = ?, unidade_curta = ? WHERE turma = ? AND unidade_nome = ?",
+            [
+                (classificar_serie(turma), classificar_turno(turma), nome_curto_unidade(unidade_nome), turma, unidade_nome)
+                for turma, unidade_nome in pendentes
+            ]
+        )
+
+
+def migrar_dia_campanha(cursor):
+    """Adiciona `dia_campanha` em bancos antigos e preenche as extrações já gravadas"""
+    colunas = {row[1] for row in cursor.execute("PRAGMA table_info('extrações')")}
+    if "dia_campanha" not in colunas:
+        cursor.execute("ALTER TABLE 'extrações' ADD COLUMN dia_campanha INTEGER")
+
+    pendentes = cursor.execute(
+        "SELECT id, periodo, data_extracao FROM 'extrações' WHERE dia_campanha IS NULL"
+    ).fetchall()
+    if pendentes:
+        cursor.executemany(
+            "UPDATE 'extrações' SET dia_campanha = ? WHERE id = ?",
+            [(dia_campanha(periodo, data_extracao), id_) for id_, periodo, data_extracao in pendentes]
+        )
+
+
+def migrar_id_turma(cursor):
+    """Adiciona `turma_id` (classificacao.id_turma) em bancos antigos e preenche as linhas já gravadas"""
+    colunas = {row[1] for row in cursor.execute("PRAGMA table_info(vagas)")}
+    if "turma_id" not in colunas:
+        cursor.execute("ALTER TABLE vagas ADD COLUMN turma_id TEXT")
+
+    pendentes = cursor.execute(
+        "SELECT DISTINCT unidade_codigo, turma FROM vagas WHERE turma_id IS NULL"
+    ).fetchall()
+    if pendentes:
+        cursor.executemany(
+            "UPDATE vagas SET turma_id = ? WHERE unidade_codigo = ? AND turma = ? AND turma_id IS NULL",
+            [(id_turma(codigo, turma), codigo, turma) for codigo, turma in pendentes]
+        )
+
+
+def inicio_campanha(periodo):
+    """Data de início da campanha de matrículas do ano letivo `periodo`"""
+    return date(int(periodo) - 1, *INICIO_CAMPANHA)
+
+
+def dia_campanha(periodo, data_extracao):
+    """Dias desde o início da campanha do `periodo` (None para período não numérico)"""
+    if not str(periodo).isdigit():
+        return None
+    data = datetime.fromisoformat(str(data_extracao)).date()
+    return (data - inicio_campanha(periodo)).days
+
+
+def gravar_extracao(cursor, dados):
+    """Insere a extração (já classificada) e as suas turmas; devolve o id da extração"""
+    cursor.execute(
+        "INSERT INTO extrações (data_extracao, periodo, dia_campanha) VALUES (?, ?, ?)",
+        (dados["data_extracao"], str(dados["periodo"]), dia_campanha(dados["periodo"], dados["data_extracao"]))
+    )
+    extracao_id = cursor.lastrowid
+
+    linhas = [
+        (
+            extracao_id,
+            unidade["codigo"],
+            unidade["nome"],
+            turma["segmento"],
+            turma.get("curso"),
+            turma["turma"],
+            turma["vagas"],
+            turma["novatos"],
+            turma["veteranos"],
+            turma["matriculados"],
+            turma.get("vagas_restantes"),
+            turma.get("pre_matriculados", 0),
+            turma["disponiveis"],
+            turma["serie"],
+            turma["turno"],
+            unidade["unidade_curta"],
+            id_turma(unidade["codigo"], turma["turma"]),
+        )
+        for unidade in dados["unidades"]
+        for turma in unidade.get("turmas", [])
+    ]
+    cursor.executemany("""
+        INSERT INTO vagas (
+            extracao_id, unidade_codigo, unidade_nome, segmento, curso, turma,
+            vagas, novatos, veteranos, matriculados, vagas_restantes,
+            pre_matriculados, disponiveis, serie, turno, unidade_curta, turma_id
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, linhas)
+    return extracao_id
+
+
+def salvar_sqlite(dados: dict, db_path: Path = DB_PATH):
+    """Salva os dados em SQLite"""
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    preparar_banco(cursor)
+    gravar_extracao(cursor, dados)
+    conn.commit()
+    conn.close()
+
+    print(f"  Dados salvos em SQLite: {db_path}")
+
+
+def importar_arquivos(db_path=DB_PATH, output_dir=OUTPUT_DIR):
+    """Grava no banco os arquivos de cada ano (dados_<ano>.json, vagas_ultimo.json) que ainda não estão lá.
+
+    Devolve os anos importados.
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    preparar_banco(cursor)
+    gravadas = set(cursor.execute("SELECT periodo, data_extracao FROM 'extrações'").fetchall())
+    importados = []
+    for ano, arquivo in retencao.arquivos_por_ano(output_dir).items():
+        with open(arquivo, encoding="utf-8") as f:
+            dados = json.load(f)
+        if (str(dados["periodo"]), dados["data_extracao"]) in gravadas:
+            continue
+        gravar_extracao(cursor, classificar_dados(dados))
+        importados.append(ano)
+    conn.commit()
+    conn.close()
+    return importados
+
+
+def periodos_disponiveis(db_path=DB_PATH):
+    """Períodos com alguma extração gravada, em ordem crescente"""
+    with conexoes.leitura(db_path) as conn:
+        return [p for (p,) in conn.execute("SELECT DISTINCT periodo FROM 'extrações' ORDER BY periodo")]
+
+
+def comparar_periodos(periodos, db_path=DB_PATH):
+    """Uma linha por unidade × segmento com `<Métrica>_<ano>` para cada ano pedido.
+
+    Usa a última extração de cada ano; unidade ou segmento ausente num ano conta 0.
+    """
+    periodos = [str(p) for p in periodos]
+    with conexoes.leitura(db_path) as conn:
+        linhas = conn.execute(
+            QUERY_COMPARATIVO.format(marcadores=", ".join("?" * len(periodos))), periodos
+        ).fetchall()
+
+    return _tabela_larga(pd.DataFrame(linhas, columns=["Ano", "Codigo", "Segmento", *METRICAS]), periodos)
+
+
+def extracao_no_dia(periodo, dia, db_path=DB_PATH):
+    """(id, data_extracao, dia_campanha) da última extração do `periodo` até o dia `dia` da campanha, ou None"""
+    with conexoes.leitura(db_path) as conn:
+        if not tem_coluna(conn, "extrações", "dia_campanha"):
+            return None
+        return conn.execute(QUERY_EXTRACAO_NO_DIA, (str(periodo), dia)).fetchone()
+
+
+def comparar_mesmo_dia(periodo, data_extracao, db_path=DB_PATH):
+    """Extração de `data_extracao` contra o ano anterior no mesmo dia de campanha.
+
+    Devolve (tabela como em comparar_periodos, extração atual, extração anterior);
+    a tabela é None quando o ano anterior não tem extração até esse dia, e tudo
+    é None num banco sem `dia_campanha` (ainda não migrado).
+    """
+    periodo = str(periodo)
+    anterior = str(int(periodo) - 1)
+    dia = dia_campanha(periodo, data_extracao)
+    with conexoes.leitura(db_path) as conn:
+        # Banco ainda não migrado (dia_campanha é criado por quem grava): sem comparação
+        if not tem_coluna(conn, "extrações", "dia_campanha"):
+            return None, None, None
+        extracoes = {ano: conn.execute(QUERY_EXTRACAO_NO_DIA, (ano, dia)).fetchone() for ano in (anterior, periodo)}
+        if None in extracoes.values():
+            return None, extracoes[periodo], extracoes[anterior]
+        linhas = [
+            (ano, *linha)
+            for ano, (extracao_id, _, _) in extracoes.items()
+            for linha in conn.execute(QUERY_SOMAS_EXTRACAO, (extracao_id,))
+        ]
+    df = pd.DataFrame(linhas, columns=["Ano", "Codigo", "Segmento", *METRICAS])
+    return _tabela_larga(df, [anterior, periodo]), extracoes[periodo], extracoes[anterior]
+
+
+def historico_periodo(periodo, db_path=DB_PATH):
+    """Somas por extração do ano letivo `periodo`: (por unidade, total, por segmento, nº de extrações)"""
+    parametros = (str(periodo),)
+    with conexoes.leitura(db_path) as conn:
+        frames = [pd.read_sql_query(consulta, conn, params=parametros) for consulta in QUERIES_HISTORICO]
+        num_extracoes = conn.execute("SELECT COUNT(*) FROM 'extrações' WHERE periodo = ?", parametros).fetchone()[0]
+    # ISO8601: extrações gravadas e arquivos importados podem vir com ou sem microssegundos
+    for df in frames:
+        if not df.empty:
+            df['data_extracao'] = pd.to_datetime(df['data_extracao'], format='ISO8601')
+    return (*frames, num_extracoes)
+
+
+def _tabela_larga(df, periodos):
+    """Linhas (ano, unidade, segmento, métricas) -> uma linha por unidade × segmento, colunas `<Métrica>_<ano>`"""
+    df = df[df["Segmento"].isin(SEGMENTOS_ORDEM)]
+    codigos = sorted(df["Codigo"].unique())
+    indice = pd.MultiIndex.from_product([codigos, SEGMENTOS_ORDEM], names=["Codigo", "Segmento"])
+    largo = df.set_index(["Codigo", "Segmento", "Ano"])[list(METRICAS)].unstack("Ano")
+    largo = largo.reindex(index=indice, columns=pd.MultiIndex.from_product([METRICAS, periodos]))
+    largo.columns = [f"{metrica}_{ano}" for metrica, ano in largo.columns]
+    largo = largo.fillna(0).astype("int64").reset_index()
+    largo.insert(1, "Unidade", [c.split("-")[1] if "-" in c else c for c in largo["Codigo"]])
+    return largo
+
+
+def main():
+    importados = importar_arquivos()
+    if importados:
+        print(f"Importados para {DB_PATH.name}: {', '.join(map(str, importados))}")
+    conn = sqlite3.connect(DB_PATH)
+    consulta = "SELECT periodo, COUNT(*), MIN(dia_campanha), MAX(dia_campanha) FROM 'extrações' GROUP BY periodo ORDER BY periodo"
+    for periodo, extracoes, primeiro, ultimo in conn.execute(consulta):
+        print(f"  {periodo}: {extracoes} extrações (dias {primeiro} a {ultimo} da campanha)")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
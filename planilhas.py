@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Planilhas Excel gravadas em streaming (XlsxWriter em modo constant_memory).
+
+Cada aba é escrita linha a linha, na ordem, e o XlsxWriter descarrega cada linha
+no arquivo temporário da aba assim que a próxima começa: nenhuma aba fica inteira
+em memória. Os formatos (milhar, percentual, largura) são definidos uma vez por
+coluna com `set_column`, e não célula a célula. Com `historico=True` entram também
+as abas com todas as extrações de vagas.db, lidas do cursor SQLite sob demanda
+(uma conexão do pool somente leitura de conexoes.py); uma aba que passaria do
+limite de linhas do Excel continua em "<aba> (2)", "<aba> (3)"...
+
+Uso: python planilhas.py [saida.xlsx]   (snapshot atual + histórico completo)
+"""
+
+import itertools
+import json
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+import xlsxwriter
+
+import conexoes
+import tabelas
+from classificacao import classificar_dados
+
+OUTPUT_DIR = Path(__file__).parent / "output"
+DB_PATH = OUTPUT_DIR / "vagas.db"
+
+# Linhas de dados por aba: o limite do Excel (1.048.576) menos o cabeçalho
+MAX_LINHAS_ABA = 1_048_576 - 1
+
+# tipo da coluna -> (formato XlsxWriter, largura, método de escrita)
+TIPOS_COLUNA = {
+    "texto": (None, 16, "write_string"),
+    "turma": (None, 45, "write_string"),
+    "data": (None, 20, "write_string"),
+    "inteiro": ({"num_format": "#,##0"}, 13, "write_number"),
+    "percentual": ({"num_format": "0.0"}, 12, "write_number"),
+    "valor": ({"num_format": "#,##0"}, 12, "write"),  # texto ou número (aba de resumo)
+}
+
+COLUNAS_TURMAS = [
+    ("Unidade", "texto"), ("Segmento", "texto"), ("Turma", "turma"), ("Vagas", "inteiro"),
+    ("Novatos", "inteiro"), ("Veteranos", "inteiro"), ("Matriculados", "inteiro"),
+    ("Disponíveis", "inteiro"), ("Pré-Matr.", "inteiro"), ("Ocupação %", "percentual"),
+]
+
+COLUNAS_HISTORICO_TOTAL = [
+    ("Data da extração", "data"), ("Período", "texto"), ("Vagas", "inteiro"), ("Novatos", "inteiro"),
+    ("Veteranos", "inteiro"), ("Matriculados", "inteiro"), ("Disponíveis", "inteiro"),
+    ("Ocupação %", "percentual"),
+]
+
+COLUNAS_HISTORICO_TURMAS = [
+    ("Data da extração", "data"), ("Código", "texto"), ("Unidade", "texto"), ("Segmento", "texto"),
+    ("Turma", "turma"), ("Vagas", "inteiro"), ("Novatos", "inteiro"), ("Veteranos", "inteiro"),
+    ("Matriculados", "inteiro"), ("Pré-Matr.", "inteiro"), ("Disponíveis", "inteiro"),
+    ("Ocupação %", "percentual"),
+]
+
+_OCUPACAO_SQL = "COALESCE(ROUND(100.0 * SUM(v.matriculados) / NULLIF(SUM(v.vagas), 0), 1), 0)"
+
+QUERY_HISTORICO_TOTAL = f"""
+SELECT e.data_extracao, e.periodo, SUM(v.vagas), SUM(v.novatos), SUM(v.veteranos),
+       SUM(v.matriculados), SUM(v.disponiveis), {_OCUPACAO_SQL}
+FROM vagas v JOIN 'extrações' e ON v.extracao_id = e.id
+GROUP BY e.id ORDER BY e.data_extracao
+"""
+
+QUERY_HISTORICO_TURMAS = """
+SELECT e.data_extracao, v.unidade_codigo, v.unidade_nome, v.segmento, v.turma,
+       v.vagas, v.novatos, v.veteranos, v.matriculados, v.pre_matriculados, v.disponiveis,
+       COALESCE(ROUND(100.0 * v.matriculados / NULLIF(v.vagas, 0), 1), 0)
+FROM vagas v JOIN 'extrações' e ON v.extracao_id = e.id
+ORDER BY e.data_extracao, v.id
+"""
+
+
+def escrever_aba(workbook, nome, colunas, linhas):
+    """Aba `nome` com cabeçalho, formato por coluna e as linhas (iterável de tuplas); devolve o nº de linhas"""
+    aba = workbook.add_worksheet(nome)
+    negrito = workbook.add_format({"bold": True, "border": 1, "align": "center"})
+    escritores = []
+    for col, (titulo, tipo) in enumerate(colunas):
+        formato, largura, metodo = TIPOS_COLUNA[tipo]
+        # Sem formato próprio, a célula herda o da coluna: nada é formatado célula a célula
+        aba.set_column(col, col, largura, workbook.add_format(formato) if formato else None)
+        aba.write_string(0, col, titulo, negrito)
+        escritores.append(getattr(aba, metodo))
+    aba.freeze_panes(1, 0)
+
+    n = 0
+    for n, linha in enumerate(linhas, start=1):
+        for col, valor in enumerate(linha):
+            if valor is None:
+                # NULL do banco (colunas de vagas.db são anuláveis): write_number/write_string não aceitam None
+                aba.write_blank(n, col, None)
+            else:
+                escritores[col](n, col, valor)
+    if n:
+        aba.autofilter(0, 0, n, len(colunas) - 1)
+    return n
+
+
+def escrever_planilha(destino, abas):
+    """Grava as abas [(nome, colunas, linhas)] em `destino` (caminho ou arquivo binário)"""
+    workbook = xlsxwriter.Workbook(destino, {"constant_memory": True})
+    try:
+        for nome, colunas, linhas in abas:
+            escrever_aba(workbook, nome, colunas, linhas)
+    finally:
+        workbook.close()
+
+
+def _linhas_resumo(total, metricas):
+    ocupacao = tabelas.percentual([total["matriculados"]], [total["vagas"]])[0]
+    yield ("Ocupação", f"{ocupacao}%")
+    for titulo, valor in metricas:
+        yield (titulo, valor)
+
+
+def aba_resumo(resumo, completo=True):
+    """Aba de métricas gerais (`completo` inclui novatos e veteranos)"""
+    total = resumo["total_geral"]
+    metricas = [
+        ("Matriculados", total["matriculados"]),
+        ("Vagas Totais", total["vagas"]),
+        ("Disponíveis", total["vagas"] - total["matriculados"] if completo else total["disponiveis"]),
+    ]
+    if completo:
+        metricas += [("Novatos", total["novatos"]), ("Veteranos", total["veteranos"])]
+    nome = "Resumo Geral" if completo else "Resumo"
+    return nome, [("Métrica", "texto"), ("Valor", "valor")], _linhas_resumo(total, metricas)
+
+
+def aba_unidades(resumo, completo=True):
+    """Aba com os totais por unidade (`completo` inclui novatos e veteranos)"""
+    col = tabelas.colunas_unidades(resumo)
+    vagas, matriculados = np.asarray(col["Vagas"]), np.asarray(col["Matriculados"])
+    ocupacao = tabelas.percentual(matriculados, vagas).tolist()
+    if completo:
+        colunas = [("Unidade", "texto"), ("Vagas", "inteiro"), ("Novatos", "inteiro"), ("Veteranos", "inteiro"),
+                   ("Matriculados", "inteiro"), ("Disponíveis", "inteiro"), ("Ocupação %", "percentual")]
+        linhas = zip(col["Unidade_curta"], col["Vagas"], col["Novatos"], col["Veteranos"],
+                     col["Matriculados"], (vagas - matriculados).tolist(), ocupacao)
+    else:
+        colunas = [("Unidade", "texto"), ("Vagas", "inteiro"), ("Matriculados", "inteiro"),
+                   ("Disponíveis", "inteiro"), ("Ocupação %", "percentual")]
+        linhas = zip(col["Unidade_curta"], col["Vagas"], col["Matriculados"], col["Disponiveis"], ocupacao)
+    return "Por Unidade", colunas, linhas
+
+
+def aba_turmas(vagas, nome="Todas as Turmas", completo=True, ocupacao_max=None):
+    """Aba com uma linha por turma.
+
+    Sem `completo` ficam só vagas/matriculados/disponíveis, ordenadas pela menor
+    ocupação; `ocupacao_max` mantém só as turmas abaixo dessa ocupação. Nesse
+    modo devolve None quando nenhuma turma sobra (a aba não é criada).
+    """
+    col = tabelas.colunas_turmas(vagas)
+    qtd_vagas, matriculados = np.asarray(col["Vagas"], dtype=int), np.asarray(col["Matriculados"], dtype=int)
+    ocupacao = tabelas.percentual(matriculados, qtd_vagas)
+    todas = {
+        "Unidade": col["Unidade_curta"], "Segmento": col["Segmento"], "Turma": col["Turma"],
+        "Vagas": qtd_vagas, "Novatos": col["Novatos"], "Veteranos": col["Veteranos"],
+        "Matriculados": matriculados, "Disponíveis": qtd_vagas - matriculados,
+        "Pré-Matr.": col["Pre-matriculados"], "Ocupação %": ocupacao,
+    }
+    if completo:
+        colunas, ordem = COLUNAS_TURMAS, np.arange(len(ocupacao))
+    else:
+        manter = {"Unidade", "Segmento", "Turma", "Vagas", "Matriculados", "Disponíveis", "Ocupação %"}
+        colunas = [c for c in COLUNAS_TURMAS if c[0] in manter]
+        ordem = np.argsort(ocupacao, kind="stable")
+        if ocupacao_max is not None:
+            ordem = ordem[ocupacao[ordem] < ocupacao_max]
+        if not len(ordem):
+            return None
+    linhas = zip(*(np.asarray(todas[titulo])[ordem].tolist() for titulo, _ in colunas))
+    return nome, colunas, linhas
+
+
+def dividir_aba(nome, colunas, linhas, max_linhas=MAX_LINHAS_ABA):
+    """Abas `nome`, `nome (2)`, ... de até `max_linhas` linhas cada, consumindo `linhas` sob demanda.
+
+    A primeira aba sempre é criada (só com o cabeçalho se não houver linhas).
+    """
+    linhas = iter(linhas)
+    fim = object()
+    proxima, parte = fim, 1
+    while True:
+        inicio = [] if proxima is fim else [proxima]
+        yield (nome if parte == 1 else f"{nome} ({parte})"), colunas, itertools.islice(
+            itertools.chain(inicio, linhas), max_linhas
+        )
+        proxima = next(linhas, fim)
+        if proxima is fim:
+            return
+        parte += 1
+
+
+def abas_historico(db_path=DB_PATH, max_linhas=MAX_LINHAS_ABA):
+    """Abas com o total de cada extração e todas as turmas de todas as extrações.
+
+    As linhas vêm direto do cursor (sem fetchall); a conexão volta ao pool quando
+    a última aba termina de ser escrita.
+    """
+    if not Path(db_path).exists():
+        return
+    with conexoes.leitura(db_path) as conn:
+        yield from dividir_aba("Histórico Total", COLUNAS_HISTORICO_TOTAL, conn.execute(QUERY_HISTORICO_TOTAL), max_linhas)
+        yield from dividir_aba(
+            "Histórico Turmas", COLUNAS_HISTORICO_TURMAS, conn.execute(QUERY_HISTORICO_TURMAS), max_linhas
+        )
+
+
+def _bytes(abas):
+    output = BytesIO()
+    escrever_planilha(output, abas)
+    return output.getvalue()
+
+
+def gerar_excel(resumo, vagas, historico=False, db_path=DB_PATH):
+    """Planilha com resumo geral, unidades e todas as turmas (+ histórico de vagas.db)"""
+    abas = [aba_resumo(resumo), aba_unidades(resumo), aba_turmas(vagas)]
+    if historico:
+        # chain e não +=: o gerador precisa continuar aberto enquanto as abas são escritas
+        abas = itertools.chain(abas, abas_historico(db_path))
+    return _bytes(abas)
+
+
+def gerar_excel_relatorio(resumo, vagas, tipo_relatorio):
+    """Planilha do relatório `tipo_relatorio`"""
+    abas = [aba_resumo(resumo, completo=False), aba_unidades(resumo, completo=False)]
+    if tipo_relatorio == "Detalhado por Unidade":
+        abas.append(aba_turmas(vagas, "Turmas", completo=False))
+    elif tipo_relatorio == "Turmas Críticas":
+        abas.append(aba_turmas(vagas, "Turmas", completo=False, ocupacao_max=70))
+    return _bytes([aba for aba in abas if aba is not None])
+
+
+def main():
+    destino = Path(sys.argv[1]) if len(sys.argv) > 1 else OUTPUT_DIR / "vagas_historico.xlsx"
+    with open(OUTPUT_DIR / "resumo_ultimo.json", encoding="utf-8") as f:
+        resumo = classificar_dados(json.load(f))
+    with open(OUTPUT_DIR / "vagas_ultimo.json", encoding="utf-8") as f:
+        vagas = classificar_dados(json.load(f))
+
+    inicio = time.perf_counter()
+    # Gravado direto no arquivo: nem o .xlsx final passa pela memória
+    abas = [aba_resumo(resumo), aba_unidades(resumo), aba_turmas(vagas)]
+    escrever_planilha(str(destino), itertools.chain(abas, abas_historico()))
+    print(f"{destino} ({destino.stat().st_size / 1024:,.1f} KB em {time.perf_counter() - inicio:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Pré-renderiza todos os relatórios do snapshot atual logo após a extração.
+
+Gera, em paralelo, a matriz completa (4 tipos x PDF/Excel/PowerPoint), os
+downloads fixos dos dashboards e o HTML do envio agendado em
+output/artefatos/<versao>/. Dashboards e enviar_agendado.py só servem arquivos.
+
+Uso: python pre_renderizar.py   (usa resumo_ultimo.json / vagas_ultimo.json)
+"""
+
+import functools
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import artefatos
+import relatorios
+import tabelas
+from classificacao import classificar_dados
+from enviar_agendado import gerar_html_relatorio, nome_artefato_email
+
+OUTPUT_DIR = Path(__file__).parent / "output"
+
+
+def _csv_turmas(resumo, vagas):
+    return tabelas.df_turmas(vagas, strings_arrow=True).to_csv(index=False)
+
+
+def montar_geradores():
+    """nome do artefato -> função (resumo, vagas) que gera o conteúdo"""
+    geradores = {
+        "vagas.xlsx": relatorios.gerar_excel,
+        "vagas_historico.xlsx": functools.partial(relatorios.gerar_excel, historico=True),
+        "relatorio.html": relatorios.gerar_pdf_html,
+        "turmas.csv": _csv_turmas,
+    }
+    formatos = [f for f in relatorios.FORMATOS if f != "PowerPoint" or relatorios.PPTX_AVAILABLE]
+    for tipo in relatorios.TIPOS_RELATORIO:
+        for formato in formatos:
+            geradores[relatorios.nome_artefato(tipo, formato)] = functools.partial(
+                relatorios.renderizar, tipo_relatorio=tipo, formato=formato
+            )
+        geradores[nome_artefato_email(tipo)] = functools.partial(gerar_html_relatorio, tipo_relatorio=tipo)
+    return geradores
+
+
+GERADORES = montar_geradores()
+
+# Artefatos com vagas.db inteiro: versão do snapshot + do banco (artefatos.versao_historico)
+DO_BANCO = {"vagas_historico.xlsx"}
+
+
+def _renderizar(nome, versao, resumo, vagas):
+    inicio = time.perf_counter()
+    conteudo = artefatos.obter_artefato(nome, versao, lambda: GERADORES[nome](resumo, vagas))
+    return nome, len(conteudo), time.perf_counter() - inicio
+
+
+def pre_renderizar(resumo, vagas, max_workers=None):
+    """Renderiza todos os artefatos do snapshot (os já existentes são pulados); devolve a versão"""
+    versao = artefatos.versao_snapshot(resumo)
+    versao_banco = artefatos.versao_historico(resumo)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        jobs = [
+            executor.submit(_renderizar, nome, versao_banco if nome in DO_BANCO else versao, resumo, vagas)
+            for nome in GERADORES
+        ]
+        for job in jobs:
+            nome, tamanho, segundos = job.result()
+            print(f"  {nome:<45} {tamanho / 1024:8.1f} KB  {segundos:5.2f}s")
+    return versao
+
+
+def main():
+    with open(OUTPUT_DIR / "resumo_ultimo.json", encoding="utf-8") as f:
+        resumo = classificar_dados(json.load(f))
+    with open(OUTPUT_DIR / "vagas_ultimo.json", encoding="utf-8") as f:
+        vagas = classificar_dados(json.load(f))
+
+    inicio = time.perf_counter()
+    print(f"Pré-renderizando relatórios de {resumo['data_extracao'][:16]}...")
+    versao = pre_renderizar(resumo, vagas)
+    print(f"{len(GERADORES)} artefatos em {artefatos.DIR_ARTEFATOS / versao} ({time.perf_counter() - inicio:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Projeção da data de lotação por turma e por unidade.
+
+O histórico do ano (vagas.db + snapshot atual) vira uma matriz turmas ×
+extrações de matriculados. Uma regressão linear ponderada por exponencial (as
+extrações recentes pesam mais; meia-vida MEIA_VIDA_DIAS) é ajustada para todas
+as linhas de uma vez com NumPy, e a inclinação ± Z × erro padrão dá a faixa
+de confiança da data de lotação. As unidades usam a mesma conta sobre a soma
+das suas turmas.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import conexoes
+import periodos
+import tabelas
+
+DB_PATH = periodos.DB_PATH
+
+# Peso de uma extração cai pela metade a cada MEIA_VIDA_DIAS (None = mínimos quadrados simples)
+MEIA_VIDA_DIAS = 14
+# Faixa de confiança de 90% da inclinação (normal)
+Z_CONFIANCA = 1.645
+# Projeções além disso não são mostradas
+HORIZONTE_DIAS = 365
+
+QUERY_HISTORICO = """
+SELECT v.turma_id, e.data_extracao, v.matriculados
+FROM vagas v JOIN 'extrações' e ON e.id = v.extracao_id
+WHERE e.periodo = ?
+ORDER BY e.data_extracao, e.id
+"""
+
+
+def matriz_historico(vagas, db_path=DB_PATH):
+    """Matriculados das turmas do snapshot em cada extração do ano (NaN onde a turma não aparece).
+
+    Devolve (datas das extrações, matriz turmas × extrações); o snapshot entra
+    como última coluna se for mais recente que a última extração gravada.
+    """
+    ids = tabelas.ids_turmas(vagas)
+    data_atual = pd.Timestamp(vagas['data_extracao'])
+    matr_atual = np.asarray(tabelas.colunas_turmas(vagas)['Matriculados'], dtype=np.float64)
+
+    linhas = []
+    if db_path is not None and Path(db_path).exists():
+        # Só leitura: banco antigo ainda sem turma_id (migrado por quem grava) fica só com o snapshot
+        with conexoes.leitura(db_path) as conn:
+            if periodos.tem_coluna(conn, "vagas", "turma_id"):
+                linhas = conn.execute(QUERY_HISTORICO, (str(vagas['periodo']),)).fetchall()
+
+    if linhas:
+        turma_ids, datas, valores = zip(*linhas)
+        datas_ext, coluna = np.unique(np.asarray(datas), return_inverse=True)
+        linha = pd.Index(ids).get_indexer(turma_ids)
+        presentes = linha >= 0
+        matriz = np.full((len(ids), len(datas_ext)), np.nan)
+        matriz[linha[presentes], coluna[presentes]] = np.asarray(valores, dtype=np.float64)[presentes]
+        datas_ext = pd.to_datetime(datas_ext, format='ISO8601')
+    else:
+        datas_ext, matriz = pd.DatetimeIndex([]), np.empty((len(ids), 0))
+
+    if len(datas_ext) == 0 or data_atual > datas_ext[-1]:
+        datas_ext = datas_ext.append(pd.DatetimeIndex([data_atual]))
+        matriz = np.column_stack([matriz, matr_atual])
+    return datas_ext, matriz
+
+
+def ajustar_inclinacao(dias, matriz, meia_vida=MEIA_VIDA_DIAS):
+    """Inclinação (por dia), erro padrão e nº de pontos de cada linha; NaN na matriz é ignorado.
+
+    Mínimos quadrados ponderados vetorizados: pesos 0.5 ** (idade / meia_vida),
+    normalizados para média 1 nos pontos válidos de cada linha.
+    """
+    validos = ~np.isnan(matriz)
+    y = np.where(validos, matriz, 0.0)
+    if meia_vida:
+        pesos = 0.5 ** ((dias[-1] - dias) / meia_vida)
+    else:
+        pesos = np.ones_like(dias)
+    w = validos * pesos
+    n = validos.sum(axis=1)
+    soma_w = w.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        w = w * (n / soma_w)[:, None]
+        x_med = (w * dias).sum(axis=1) / n
+        y_med = (w * y).sum(axis=1) / n
+        dx = np.where(validos, dias - x_med[:, None], 0.0)
+        sxx = (w * dx * dx).sum(axis=1)
+        inclinacao = np.where(sxx > 0, (w * dx * (y - y_med[:, None])).sum(axis=1) / sxx, np.nan)
+        residuo = np.where(validos, y - y_med[:, None] - inclinacao[:, None] * dx, 0.0)
+        variancia = np.where(n > 2, (w * residuo * residuo).sum(axis=1) / (n - 2), np.nan)
+        erro = np.sqrt(variancia / sxx)
+    return inclinacao, erro, n
+
+
+def dias_para_lotar(restantes, inclinacao, erro, z=Z_CONFIANCA):
+    """Dias até lotar (central, otimista, pessimista); inf quando a tendência não chega a lotar"""
+    restantes = np.maximum(np.asarray(restantes, dtype=np.float64), 0.0)
+    erro = np.nan_to_num(erro, nan=0.0)
+
+    def dias(taxa):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            d = np.where(taxa > 0, restantes / taxa, np.inf)
+        return np.where(restantes == 0, 0.0, d)
+
+    return dias(inclinacao), dias(inclinacao + z * erro), dias(inclinacao - z * erro)
+
+
+def projetar(vagas, db_path=DB_PATH, meia_vida=MEIA_VIDA_DIAS, z=Z_CONFIANCA):
+    """Frames (turmas, unidades) com taxa/dia, dias para lotar e datas central/otimista/pessimista"""
+    datas, matriz = matriz_historico(vagas, db_path)
+    dias = ((datas - datas[0]) / pd.Timedelta(days=1)).to_numpy(dtype=np.float64)
+    col = tabelas.colunas_turmas(vagas)
+    qtd_vagas = np.asarray(col['Vagas'], dtype=np.float64)
+    matriculados = np.asarray(col['Matriculados'], dtype=np.float64)
+
+    # Unidades: soma das turmas presentes em cada extração
+    unidades, grupo = np.unique(np.asarray(col['Unidade_curta'], dtype=object), return_inverse=True)
+    matriz_unidades = np.zeros((len(unidades), matriz.shape[1]))
+    np.add.at(matriz_unidades, grupo, np.nan_to_num(matriz))
+    presentes = np.zeros((len(unidades), matriz.shape[1]), dtype=bool)
+    np.logical_or.at(presentes, grupo, ~np.isnan(matriz))
+    matriz_unidades[~presentes] = np.nan
+
+    base = datas[-1]
+    frames = []
+    for rotulos, historico, capacidade, atual, extras in (
+        (col['Unidade_curta'], matriz, qtd_vagas, matriculados, {'Turma': col['Turma']}),
+        (unidades, matriz_unidades, np.bincount(grupo, qtd_vagas), np.bincount(grupo, matriculados), {}),
+    ):
+        inclinacao, erro, n = ajustar_inclinacao(dias, historico, meia_vida)
+        restantes = capacidade - atual
+        central, otimista, pessimista = dias_para_lotar(restantes, inclinacao, erro, z)
+        frames.append(pd.DataFrame({
+            'Unidade': rotulos,
+            **extras,
+            'Disponíveis': restantes.astype(np.int64),
+            'Taxa/dia': np.round(inclinacao, 2),
+            'Pontos': n,
+            'Dias p/ Lotar': central,
+            'Previsão': _datas(base, central),
+            'Otimista': _datas(base, otimista),
+            'Pessimista': _datas(base, pessimista),
+        }))
+    return frames[0], frames[1]
+
+
+def _datas(base, dias):
+    """Data base + dias (NaT onde não lota dentro do horizonte)"""
+    dentro = np.isfinite(dias) & (dias <= HORIZONTE_DIAS)
+    return base + pd.to_timedelta(np.where(dentro, dias, np.nan), unit='D')
+
+
+def main():
+    import json
+    import time
+
+    from classificacao import classificar_dados
+
+    with open(periodos.OUTPUT_DIR / "vagas_ultimo.json", encoding="utf-8") as f:
+        vagas = classificar_dados(json.load(f))
+    inicio = time.perf_counter()
+    turmas, unidades = projetar(vagas)
+    print(f"{len(turmas)} turmas projetadas em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    print(unidades.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
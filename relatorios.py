@@ -0,0 +1,194 @@
+"""
+Geração dos relatórios do dashboard (HTML para impressão, Excel e PowerPoint).
+
+Funções puras sobre resumo_*.json e vagas_*.json (já classificados), sem
+Streamlit: rodam no script do dashboard, no worker de relatórios e fora dele.
+Os relatórios HTML são templates de modelos/ (ver modelos_html.py); Excel e
+PowerPoint vêm de planilhas.py e apresentacao.py, importados só no primeiro
+uso (xlsxwriter e python-pptx não pesam na abertura do dashboard); os nomes
+reexportados abaixo continuam disponíveis como `relatorios.gerar_excel` etc.
+"""
+
+import importlib
+import unicodedata
+from datetime import datetime
+
+import numpy as np
+
+import modelos_html
+import tabelas
+from modelos_html import classes, linhas
+
+TIPOS_RELATORIO = ["Resumo Executivo", "Detalhado por Unidade", "Análise de Tendências", "Turmas Críticas"]
+FORMATOS = ["PDF", "Excel", "PowerPoint"]
+EXTENSOES = {"PDF": "html", "Excel": "xlsx", "PowerPoint": "pptx"}
+
+# Reexportados de módulos pesados: importados na primeira vez que o nome é usado
+_REEXPORTADOS = {
+    "PPTX_AVAILABLE": "apresentacao",
+    "gerar_powerpoint": "apresentacao",
+    "gerar_excel": "planilhas",
+    "gerar_excel_relatorio": "planilhas",
+}
+
+
+def __getattr__(nome):
+    if nome not in _REEXPORTADOS:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(importlib.import_module(_REEXPORTADOS[nome]), nome)
+    globals()[nome] = valor
+    return valor
+
+
+def _linhas_ocupacao(nomes, vagas, matriculados, disponiveis=None):
+    """Linhas (nome, vagas, matriculados, disponíveis, ocupação %) a partir das colunas"""
+    vagas, matriculados = np.asarray(vagas, dtype=int), np.asarray(matriculados, dtype=int)
+    if disponiveis is None:
+        disponiveis = vagas - matriculados
+    return linhas(nomes, vagas, matriculados, disponiveis, tabelas.percentual(matriculados, vagas))
+
+
+def _datas_relatorio(resumo):
+    """Datas do cabeçalho/rodapé a partir da extração, não da hora da renderização.
+
+    Os relatórios ficam em cache por versão do snapshot (artefatos.py): o mesmo
+    snapshot tem que dar o mesmo arquivo, pré-renderizado ou gerado no clique.
+    """
+    extracao = datetime.fromisoformat(str(resumo['data_extracao'])[:19])
+    return {'gerado_em': extracao.strftime('%d/%m/%Y às %H:%M'), 'ano': extracao.year}
+
+
+def gerar_pdf_html(resumo, vagas):
+    """Relatório geral em HTML para impressão (Ctrl+P -> PDF)"""
+    total = resumo['total_geral']
+    unidades = tabelas.colunas_unidades(resumo)
+    segmentos = tabelas.colunas_segmentos(resumo)
+    return modelos_html.renderizar(
+        "relatorio_geral.html",
+        data=resumo['data_extracao'][:16].replace('T', ' '),
+        periodo=resumo['periodo'],
+        total=total,
+        ocupacao=round(total['matriculados'] / total['vagas'] * 100, 1),
+        unidades=_linhas_ocupacao(unidades['Unidade_curta'], unidades['Vagas'], unidades['Matriculados']),
+        segmentos=_linhas_ocupacao(segmentos['Segmento'], segmentos['Vagas'], segmentos['Matriculados']),
+        **_datas_relatorio(resumo),
+    )
+
+
+# ============================================================
+# GERAÇÃO DE RELATÓRIOS PERSONALIZADOS
+# ============================================================
+
+def gerar_relatorio_resumo_executivo(resumo, vagas, formato='PDF'):
+    """Gera relatório resumo executivo"""
+    total = resumo['total_geral']
+    unidades = tabelas.colunas_unidades(resumo)
+    return modelos_html.renderizar(
+        "resumo_executivo.html",
+        total=total,
+        ocupacao=round(total['matriculados'] / total['vagas'] * 100, 1),
+        unidades=_linhas_ocupacao(
+            unidades['Unidade_curta'], unidades['Vagas'], unidades['Matriculados'], unidades['Disponiveis']
+        ),
+        **_datas_relatorio(resumo),
+    )
+
+
+def gerar_relatorio_detalhado_unidade(resumo, vagas, formato='PDF'):
+    """Gera relatório detalhado por unidade"""
+    turmas = tabelas.colunas_turmas(vagas)
+    vagas_turma = np.asarray(turmas['Vagas'], dtype=int)
+    matriculados = np.asarray(turmas['Matriculados'], dtype=int)
+    ocup = tabelas.percentual(matriculados, vagas_turma)
+    todas = linhas(
+        [nome[:40] for nome in turmas['Turma']], turmas['Segmento'], vagas_turma, matriculados,
+        vagas_turma - matriculados, ocup,
+        classes(ocup, [(80, 'bom'), (70, ''), (50, 'atencao')], padrao='critico'),
+    )
+
+    totais = tabelas.colunas_unidades(resumo)
+    ocup_unidades = dict(zip(totais['Codigo'], tabelas.percentual(totais['Matriculados'], totais['Vagas']).tolist()))
+
+    # colunas_turmas segue a ordem de vagas['unidades']: cada unidade é uma fatia contígua
+    unidades, inicio = [], 0
+    for unidade in vagas['unidades']:
+        fim = inicio + len(unidade.get('turmas', []))
+        unidades.append((unidade['unidade_curta'], ocup_unidades.get(unidade['codigo'], 0.0), todas[inicio:fim]))
+        inicio = fim
+    return modelos_html.renderizar("detalhado_unidade.html", unidades=unidades, **_datas_relatorio(resumo))
+
+
+def gerar_relatorio_turmas_criticas(resumo, vagas, formato='PDF'):
+    """Gera relatório de turmas críticas (ocupação abaixo de 70%)"""
+    turmas = tabelas.colunas_turmas(vagas)
+    vagas_turma = np.asarray(turmas['Vagas'], dtype=int)
+    matriculados = np.asarray(turmas['Matriculados'], dtype=int)
+    ocup = tabelas.percentual(matriculados, vagas_turma)
+
+    ordem = np.argsort(ocup, kind='stable')
+    criticas = ordem[ocup[ordem] < 70]
+    top = criticas[:30]  # Limita a 30 turmas
+    return modelos_html.renderizar(
+        "turmas_criticas.html",
+        qtd_criticas=len(criticas),
+        turmas=linhas(
+            [turmas['Unidade_curta'][i] for i in top], [turmas['Turma'][i][:35] for i in top],
+            [turmas['Segmento'][i] for i in top], vagas_turma[top], matriculados[top],
+            vagas_turma[top] - matriculados[top], ocup[top],
+        ),
+        **_datas_relatorio(resumo),
+    )
+
+
+def gerar_relatorio_tendencias(resumo, vagas, formato='PDF'):
+    """Gera relatório de análise de tendências"""
+    total = resumo['total_geral']
+    segmentos = tabelas.colunas_segmentos(resumo)
+    ocup = tabelas.percentual(segmentos['Matriculados'], segmentos['Vagas'])
+    return modelos_html.renderizar(
+        "tendencias.html",
+        total=total,
+        ocupacao=round(total['matriculados'] / total['vagas'] * 100, 1),
+        faltam_meta=max(0, int(total['vagas'] * 0.8) - total['matriculados']),
+        segmentos=linhas(
+            segmentos['Segmento'], segmentos['Vagas'], segmentos['Matriculados'],
+            segmentos['Vagas'] - segmentos['Matriculados'], ocup, classes(ocup, [(70, 'bom')], padrao='critico'),
+        ),
+        **_datas_relatorio(resumo),
+    )
+
+
+def gerar_relatorio_html(resumo, vagas, tipo_relatorio, formato='PDF'):
+    """HTML do relatório `tipo_relatorio` (também usado como pré-visualização)"""
+    if tipo_relatorio == "Resumo Executivo":
+        return gerar_relatorio_resumo_executivo(resumo, vagas, formato)
+    elif tipo_relatorio == "Detalhado por Unidade":
+        return gerar_relatorio_detalhado_unidade(resumo, vagas, formato)
+    elif tipo_relatorio == "Análise de Tendências":
+        return gerar_relatorio_tendencias(resumo, vagas, formato)
+    return gerar_relatorio_turmas_criticas(resumo, vagas, formato)
+
+
+def slug_relatorio(tipo_relatorio):
+    """'Turmas Críticas' -> 'turmas_criticas'"""
+    sem_acento = unicodedata.normalize("NFKD", tipo_relatorio).encode("ascii", "ignore").decode()
+    return sem_acento.lower().replace(' ', '_')
+
+
+def nome_artefato(tipo_relatorio, formato):
+    """'Turmas Críticas', 'Excel' -> 'relatorio_turmas_criticas.xlsx'"""
+    return f"relatorio_{slug_relatorio(tipo_relatorio)}.{EXTENSOES[formato]}"
+
+
+def renderizar(resumo, vagas, tipo_relatorio, formato):
+    """Bytes do relatório no formato pedido"""
+    if formato == "Excel":
+        from planilhas import gerar_excel_relatorio
+        return gerar_excel_relatorio(resumo, vagas, tipo_relatorio)
+    if formato == "PowerPoint":
+        from apresentacao import gerar_powerpoint
+        conteudo = gerar_powerpoint(resumo, vagas, tipo_relatorio)
+        if conteudo is None:
+            raise RuntimeError("Biblioteca python-pptx não instalada. Use: pip install python-pptx")
+        return conteudo
+    return gerar_relatorio_html(resumo, vagas, tipo_relatorio, formato).encode("utf-8")
@@ -0,0 +1,134 @@
+"""
+Retenção por unidade × série entre anos letivos.
+
+Retenção de uma série num par de anos (base → ano) = veteranos da série no ano
+/ matriculados, no ano base, da série de onde esses alunos vieram. A matriz
+cobre todos os pares de anos disponíveis (output/dados_<ano>.json e o snapshot
+atual, vagas_ultimo.json) e é gravada em output/retencao.json junto com a
+versão dos arquivos de origem: só é recalculada quando algum deles muda.
+"""
+
+import json
+import re
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import artefatos
+import tabelas
+from classificacao import SERIES_ORDEM, classificar_dados
+
+OUTPUT_DIR = Path(__file__).parent / "output"
+ARQUIVO_MATRIZ = OUTPUT_DIR / "retencao.json"
+
+# série atual -> série anterior (SERIES_ORDEM já está na ordem de progressão)
+PROGRESSAO = dict(zip(SERIES_ORDEM[1:], SERIES_ORDEM[:-1]))
+
+COLUNAS = ["Ano base", "Ano", "Codigo", "Unidade", "Série", "Série base", "Alunos base", "Veteranos", "Retenção %"]
+
+
+def arquivos_por_ano(output_dir=OUTPUT_DIR, periodo_atual=None):
+    """ano -> arquivo de turmas: dados_<ano>.json e o snapshot atual (ano do `periodo`).
+
+    `periodo_atual` evita abrir vagas_ultimo.json quando o período já é conhecido.
+    """
+    arquivos = {}
+    for caminho in Path(output_dir).glob("dados_*.json"):
+        ano = re.fullmatch(r"dados_(\d{4})\.json", caminho.name)
+        if ano:
+            arquivos[int(ano.group(1))] = caminho
+    atual = Path(output_dir) / "vagas_ultimo.json"
+    if atual.exists():
+        periodo = periodo_atual
+        if periodo is None:
+            with open(atual, encoding="utf-8") as f:
+                periodo = json.load(f).get("periodo")
+        if periodo and str(periodo).isdigit():
+            arquivos[int(periodo)] = atual
+    return dict(sorted(arquivos.items()))
+
+
+def versao_dados(arquivos):
+    """Versão do conjunto de arquivos (nome, mtime e tamanho de cada um)"""
+    partes = []
+    for ano, caminho in arquivos.items():
+        info = caminho.stat()
+        partes.append(f"{ano}:{caminho.name}:{info.st_mtime_ns}:{info.st_size}")
+    return "|".join(partes)
+
+
+def totais_por_serie(dados):
+    """Matriculados e veteranos por (código da unidade, série), na ordem das unidades"""
+    col = tabelas.colunas_turmas(classificar_dados(dados))
+    df = pd.DataFrame({
+        "Codigo": col["Codigo"], "Série": col["Série"],
+        "Matriculados": col["Matriculados"], "Veteranos": col["Veteranos"],
+    })
+    return df.groupby(["Codigo", "Série"], sort=False).sum()
+
+
+def _par(totais_base, totais_ano, unidades, salto):
+    """Linhas da matriz para um par de anos separados por `salto` anos"""
+    series = SERIES_ORDEM[salto:]
+    bases = SERIES_ORDEM[:len(SERIES_ORDEM) - salto]
+    codigos = np.repeat(unidades, len(series))
+    atual = pd.MultiIndex.from_arrays([codigos, np.tile(series, len(unidades))])
+    anterior = pd.MultiIndex.from_arrays([codigos, np.tile(bases, len(unidades))])
+    veteranos = totais_ano["Veteranos"].reindex(atual, fill_value=0).to_numpy()
+    alunos_base = totais_base["Matriculados"].reindex(anterior, fill_value=0).to_numpy()
+    df = pd.DataFrame({
+        "Codigo": codigos,
+        "Unidade": [c.split("-")[1] if "-" in c else c for c in codigos],
+        "Série": atual.get_level_values(1),
+        "Série base": anterior.get_level_values(1),
+        "Alunos base": alunos_base,
+        "Veteranos": veteranos,
+        "Retenção %": tabelas.percentual(veteranos, alunos_base),
+    })
+    return df[df["Alunos base"] > 0]
+
+
+def calcular_matriz(dados_por_ano):
+    """Matriz de retenção para todos os pares (ano base < ano) de {ano: dados de turmas}.
+
+    Com mais de um ano de distância a série base recua o mesmo número de séries
+    e os veteranos do ano final contam todos os alunos que já eram da escola.
+    """
+    totais = {ano: totais_por_serie(dados) for ano, dados in dados_por_ano.items()}
+    partes = []
+    for ano_base, ano in combinations(sorted(totais), 2):
+        unidades = totais[ano].index.get_level_values("Codigo").unique().to_numpy()
+        df = _par(totais[ano_base], totais[ano], unidades, ano - ano_base)
+        partes.append(df.assign(**{"Ano base": ano_base, "Ano": ano}))
+    if not partes:
+        return pd.DataFrame(columns=COLUNAS)
+    return pd.concat(partes, ignore_index=True)[COLUNAS]
+
+
+def carregar_matriz(output_dir=OUTPUT_DIR):
+    """Matriz de retenção da versão atual dos arquivos (recalcula e grava só se mudou)"""
+    arquivos = arquivos_por_ano(output_dir)
+    versao = versao_dados(arquivos)
+    caminho = Path(output_dir) / ARQUIVO_MATRIZ.name
+    if caminho.exists():
+        with open(caminho, encoding="utf-8") as f:
+            salvo = json.load(f)
+        if salvo.get("versao") == versao:
+            return pd.DataFrame(salvo["colunas"], columns=COLUNAS)
+
+    dados_por_ano = {}
+    for ano, arquivo in arquivos.items():
+        with open(arquivo, encoding="utf-8") as f:
+            dados_por_ano[ano] = json.load(f)
+    matriz = calcular_matriz(dados_por_ano)
+    conteudo = {"versao": versao, "colunas": matriz.to_dict(orient="list")}
+    artefatos.salvar_artefato(caminho, json.dumps(conteudo, ensure_ascii=False).encode("utf-8"))
+    return matriz
+
+
+def pares_anos(matriz):
+    """Pares (ano base, ano) da matriz, do mais recente para o mais antigo"""
+    pares = matriz[["Ano base", "Ano"]].drop_duplicates().itertuples(index=False, name=None)
+    return sorted(((int(a), int(b)) for a, b in pares), key=lambda par: (-par[1], -par[0]))
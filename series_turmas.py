@@ -0,0 +1,131 @@
+"""
+Séries históricas por turma a partir de vagas.db, com cache LRU limitado.
+
+Cada linha de `vagas` tem o `turma_id` estável (classificacao.id_turma) e o
+índice (turma_id, extracao_id): a série de uma ou várias turmas sai de uma busca
+no índice, sem varrer a tabela. As séries ficam num LRU por (período, turma)
+com no máximo MAX_TURMAS entradas; um pedido com várias turmas consulta o banco
+uma vez só para as que faltam. O cache é esvaziado quando o banco muda.
+
+As leituras não migram o banco (a conexão é somente leitura): turma_id e os
+índices são criados por quem grava (periodos.preparar_banco). Um banco antigo,
+ainda sem turma_id, dá séries vazias até a próxima gravação.
+"""
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import conexoes
+import periodos
+
+DB_PATH = periodos.DB_PATH
+
+CAMPOS = ("vagas", "novatos", "veteranos", "matriculados", "pre_matriculados", "disponiveis")
+
+# Turmas mantidas no cache (cada série tem um ponto por extração do período)
+MAX_TURMAS = 2048
+
+# Limite de parâmetros por consulta (SQLITE_MAX_VARIABLE_NUMBER antigo é 999)
+_LOTE = 900
+
+QUERY_SERIES = f"""
+SELECT v.turma_id, e.data_extracao, {", ".join(f"v.{campo}" for campo in CAMPOS)}
+FROM vagas v JOIN 'extrações' e ON e.id = v.extracao_id
+WHERE e.periodo = ? AND v.turma_id IN ({{marcadores}})
+ORDER BY v.turma_id, e.data_extracao, e.id
+"""
+
+
+class CacheSeries:
+    """LRU de séries por (banco, período, turma), limitado a `max_turmas` entradas"""
+
+    def __init__(self, max_turmas=MAX_TURMAS):
+        self.max_turmas = max_turmas
+        self._series = OrderedDict()
+        self._versoes = {}
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+
+    def _validar(self, db_path):
+        """Esvazia as séries do banco se ele mudou desde a última consulta"""
+        info = Path(db_path).stat()
+        versao = (info.st_mtime_ns, info.st_size)
+        if self._versoes.get(db_path) != versao:
+            for chave in [c for c in self._series if c[0] == db_path]:
+                del self._series[chave]
+            self._versoes[db_path] = versao
+
+    def obter(self, turma_ids, periodo, db_path=DB_PATH):
+        """{turma_id: série} para as turmas pedidas; turmas sem histórico ficam com séries vazias"""
+        db_path, periodo = str(db_path), str(periodo)
+        with self._trava:
+            self._validar(db_path)
+            resultado, faltantes = {}, []
+            for turma_id in dict.fromkeys(turma_ids):
+                chave = (db_path, periodo, turma_id)
+                if chave in self._series:
+                    self._series.move_to_end(chave)
+                    resultado[turma_id] = self._series[chave]
+                    self.acertos += 1
+                else:
+                    faltantes.append(turma_id)
+            self.faltas += len(faltantes)
+
+            for turma_id, serie in _consultar(faltantes, periodo, db_path).items():
+                self._series[(db_path, periodo, turma_id)] = serie
+                resultado[turma_id] = serie
+            while len(self._series) > self.max_turmas:
+                self._series.popitem(last=False)
+        return resultado
+
+    def info(self):
+        """Acertos, faltas e tamanho atual (como functools.lru_cache.cache_info)"""
+        return {"acertos": self.acertos, "faltas": self.faltas, "turmas": len(self._series), "max": self.max_turmas}
+
+    def limpar(self):
+        with self._trava:
+            self._series.clear()
+            self._versoes.clear()
+
+
+def _serie_vazia():
+    return {"datas": (), **{campo: () for campo in CAMPOS}}
+
+
+def _consultar(turma_ids, periodo, db_path):
+    """Séries das turmas em consultas de até _LOTE turmas, via idx_vagas_turma"""
+    series = {turma_id: {"datas": [], **{campo: [] for campo in CAMPOS}} for turma_id in turma_ids}
+    if not turma_ids:
+        return {}
+    with conexoes.leitura(db_path) as conn:
+        if not periodos.tem_coluna(conn, "vagas", "turma_id"):
+            return {turma_id: _serie_vazia() for turma_id in turma_ids}
+        for inicio in range(0, len(turma_ids), _LOTE):
+            lote = turma_ids[inicio:inicio + _LOTE]
+            consulta = QUERY_SERIES.format(marcadores=", ".join("?" * len(lote)))
+            for turma_id, data, *valores in conn.execute(consulta, (periodo, *lote)):
+                serie = series[turma_id]
+                serie["datas"].append(data)
+                for campo, valor in zip(CAMPOS, valores):
+                    serie[campo].append(valor)
+    # Tuplas: as séries ficam no cache compartilhado e não podem ser alteradas por quem as recebe
+    return {turma_id: {campo: tuple(valores) for campo, valores in serie.items()} for turma_id, serie in series.items()}
+
+
+_cache = CacheSeries()
+
+
+def series_turmas(turma_ids, periodo, db_path=DB_PATH):
+    """{turma_id: {"datas": (...), "matriculados": (...), ...}} de todas as extrações do período"""
+    return _cache.obter(turma_ids, periodo, db_path)
+
+
+def serie_turma(turma_id, periodo, db_path=DB_PATH):
+    """Série de uma turma (tuplas vazias se ela não aparece em nenhuma extração do período)"""
+    return series_turmas([turma_id], periodo, db_path).get(turma_id, _serie_vazia())
+
+
+def info_cache():
+    return _cache.info()
@@ -0,0 +1,225 @@
+"""
+Construção dos DataFrames usados pelos dashboards, com tipos compactos.
+
+Colunas de baixa cardinalidade (unidade, segmento, série, turno, status) viram
+`category`, contadores viram int32 e percentuais float32. Os frames ficam
+cacheados por TTL e são copiados a cada filtro, então o ganho se repete.
+"""
+
+import numpy as np
+import pandas as pd
+
+from classificacao import SEGMENTOS_ORDEM, id_turma
+
+COLUNAS_CATEGORIA = ('Codigo', 'Unidade', 'Unidade_curta', 'Segmento', 'Série', 'Turno', 'Status')
+
+# Faixas de status usadas nas tabelas por série/turma do dashboard cloud
+FAIXAS_STATUS = [
+    (90, '🔥 Excelente'),
+    (80, '✨ Muito Bom'),
+    (70, '⚡ Bom'),
+    (50, '⚠️ Atenção'),
+]
+STATUS_CRITICO = '❄️ Crítico'
+
+ORDEM_SEGMENTOS = SEGMENTOS_ORDEM
+
+
+def compactar(df, strings_arrow=False):
+    """Converte o frame para tipos compactos (category, int32, float32).
+
+    Com `strings_arrow=True` as demais colunas de texto (ex.: nome da turma)
+    passam a usar strings Arrow em vez de objetos Python.
+    """
+    tipos = {}
+    for col in df.columns:
+        serie = df[col]
+        if col in COLUNAS_CATEGORIA:
+            tipos[col] = 'category'
+        elif pd.api.types.is_bool_dtype(serie):
+            continue
+        elif pd.api.types.is_integer_dtype(serie):
+            tipos[col] = 'int32'
+        elif pd.api.types.is_float_dtype(serie):
+            tipos[col] = 'float32'
+        elif strings_arrow and (pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie)):
+            tipos[col] = pd.StringDtype('pyarrow')
+    return df.astype(tipos)
+
+
+def percentual(parte, total):
+    """Percentual posição a posição (0 onde o total é zero); Series -> Series, listas/arrays -> array"""
+    valores = np.asarray(parte, dtype='float64')
+    divisor = np.asarray(total, dtype='float64')
+    divisor = np.where(divisor > 0, divisor, np.nan)
+    resultado = np.nan_to_num(np.round(valores / divisor * 100, 1), nan=0.0)
+    if isinstance(parte, pd.Series):
+        return pd.Series(resultado, index=parte.index)
+    return resultado
+
+
+def status_ocupacao(ocup):
+    """Rótulo de status para uma coluna de ocupação %"""
+    limites = [ocup >= limite for limite, _ in FAIXAS_STATUS]
+    rotulos = [rotulo for _, rotulo in FAIXAS_STATUS]
+    return pd.Series(np.select(limites, rotulos, default=STATUS_CRITICO), index=ocup.index)
+
+
+def colunas_turmas(vagas):
+    """Colunas (listas) com uma posição por turma, a partir de vagas_*.json (já classificado)"""
+    colunas = {
+        'Codigo': [], 'Unidade': [], 'Unidade_curta': [], 'Segmento': [], 'Série': [],
+        'Turno': [], 'Turma': [], 'Vagas': [], 'Matriculados': [], 'Novatos': [],
+        'Veteranos': [], 'Pre-matriculados': [], 'Disponiveis': [],
+    }
+    for unidade in vagas['unidades']:
+        for turma in unidade.get('turmas', []):
+            colunas['Codigo'].append(unidade['codigo'])
+            colunas['Unidade'].append(unidade['nome'])
+            colunas['Unidade_curta'].append(unidade['unidade_curta'])
+            colunas['Segmento'].append(turma['segmento'])
+            colunas['Série'].append(turma['serie'])
+            colunas['Turno'].append(turma['turno'])
+            colunas['Turma'].append(turma['turma'])
+            colunas['Vagas'].append(turma['vagas'])
+            colunas['Matriculados'].append(turma['matriculados'])
+            colunas['Novatos'].append(turma['novatos'])
+            colunas['Veteranos'].append(turma['veteranos'])
+            colunas['Pre-matriculados'].append(turma['pre_matriculados'])
+            colunas['Disponiveis'].append(turma['disponiveis'])
+    return colunas
+
+
+def ids_turmas(vagas):
+    """Id estável (classificacao.id_turma) de cada turma, na ordem de colunas_turmas"""
+    return np.array(
+        [id_turma(unidade['codigo'], turma['turma']) for unidade in vagas['unidades'] for turma in unidade.get('turmas', [])],
+        dtype=object,
+    )
+
+
+def df_turmas(vagas, strings_arrow=False):
+    """Uma linha por turma, a partir de vagas_*.json (já classificado)"""
+    return compactar(pd.DataFrame(colunas_turmas(vagas)), strings_arrow)
+
+
+def df_resumo(resumo, strings_arrow=False):
+    """Uma linha por unidade/segmento, a partir de resumo_*.json"""
+    rows = []
+    for unidade in resumo['unidades']:
+        for segmento, dados in unidade['segmentos'].items():
+            rows.append({
+                'Codigo': unidade['codigo'],
+                'Unidade': unidade['nome'],
+                'Unidade_curta': unidade['unidade_curta'],
+                'Segmento': segmento,
+                'Vagas': dados['vagas'],
+                'Novatos': dados['novatos'],
+                'Veteranos': dados['veteranos'],
+                'Matriculados': dados['matriculados'],
+                'Disponiveis': dados['disponiveis'],
+            })
+    return compactar(pd.DataFrame(rows), strings_arrow)
+
+
+def colunas_unidades(resumo):
+    """Colunas (listas) com os totais de cada unidade, na ordem de resumo_*.json"""
+    colunas = {
+        'Codigo': [], 'Unidade_curta': [], 'Vagas': [], 'Novatos': [],
+        'Veteranos': [], 'Matriculados': [], 'Disponiveis': [],
+    }
+    for unidade in resumo['unidades']:
+        total = unidade['total']
+        colunas['Codigo'].append(unidade['codigo'])
+        colunas['Unidade_curta'].append(unidade['unidade_curta'])
+        colunas['Vagas'].append(total['vagas'])
+        colunas['Novatos'].append(total['novatos'])
+        colunas['Veteranos'].append(total['veteranos'])
+        colunas['Matriculados'].append(total['matriculados'])
+        colunas['Disponiveis'].append(total['disponiveis'])
+    return colunas
+
+
+def colunas_segmentos(resumo):
+    """Vagas e matriculados por segmento (todas as unidades), na ordem de ORDEM_SEGMENTOS"""
+    totais = {}
+    for unidade in resumo['unidades']:
+        for seg, vals in unidade['segmentos'].items():
+            vagas, matriculados = totais.get(seg, (0, 0))
+            totais[seg] = (vagas + vals['vagas'], matriculados + vals['matriculados'])
+    segmentos = [seg for seg in ORDEM_SEGMENTOS if seg in totais]
+    return {
+        'Segmento': segmentos,
+        'Vagas': np.array([totais[seg][0] for seg in segmentos], dtype=int),
+        'Matriculados': np.array([totais[seg][1] for seg in segmentos], dtype=int),
+    }
+
+
+def df_turmas_nivel4(vagas, strings_arrow=False):
+    """Tabela do Nível 4 (todas as turmas) com ocupação e status"""
+    base = df_turmas(vagas, strings_arrow)
+    df = pd.DataFrame({
+        'Unidade': base['Unidade_curta'],
+        'Segmento': base['Segmento'],
+        'Série': base['Série'],
+        'Turma': base['Turma'],
+        'Vagas': base['Vagas'],
+        'Novatos': base['Novatos'],
+        'Veteranos': base['Veteranos'],
+        'Matriculados': base['Matriculados'],
+        'Disponíveis': base['Vagas'] - base['Matriculados'],
+        'Ocupação %': percentual(base['Matriculados'], base['Vagas']).astype('float32'),
+    })
+    df['Status'] = status_ocupacao(df['Ocupação %']).astype('category')
+    df['Pré-Matr.'] = base['Pre-matriculados']
+    return df
+
+
+def _agrupar(chaves, *valores):
+    """Chaves distintas (na ordem de aparição), índice do grupo de cada posição e somas por grupo"""
+    distintas, primeira, grupo = np.unique(chaves, return_index=True, return_inverse=True)
+    ordem = np.argsort(primeira)
+    posicao = np.empty_like(ordem)
+    posicao[ordem] = np.arange(len(ordem))
+    grupo = posicao[grupo]
+    somas = [np.bincount(grupo, weights=v, minlength=len(ordem)).astype(np.int64) for v in valores]
+    return distintas[ordem], grupo, somas
+
+
+def hierarquia_treemap(vagas):
+    """Nós do treemap unidade > segmento > turma em arrays paralelos.
+
+    Devolve ids, rótulos, pais, matriculados, vagas e ocupação % de cada nó
+    (unidades, depois segmentos, depois turmas); os totais dos nós internos são
+    somas dos filhos, prontos para go.Treemap com branchvalues='total'.
+    """
+    col = colunas_turmas(vagas)
+    unidades = np.asarray(col['Unidade_curta'], dtype=object)
+    segmentos = unidades + '/' + np.asarray(col['Segmento'], dtype=object)
+    matriculados = np.asarray(col['Matriculados'], dtype=np.int64)
+    qtd_vagas = np.asarray(col['Vagas'], dtype=np.int64)
+    turmas = pd.Series(col['Turma'], dtype=object).astype(str)
+    rotulos_turma = turmas.where(turmas.str.len() <= 30, turmas.str[:30] + '...').to_numpy(dtype=object)
+
+    ids_unidade, grupo_unidade, (matr_unidade, vagas_unidade) = _agrupar(unidades, matriculados, qtd_vagas)
+    ids_segmento, grupo_segmento, (matr_segmento, vagas_segmento) = _agrupar(segmentos, matriculados, qtd_vagas)
+    # Pai de cada segmento: a unidade da primeira turma do grupo
+    primeira_turma = np.zeros(len(ids_segmento), dtype=np.int64)
+    primeira_turma[grupo_segmento[::-1]] = np.arange(len(segmentos))[::-1]
+    # Nome repetido de turma no mesmo segmento não pode colidir: o id leva a posição
+    ids_turma = segmentos + '/' + np.arange(len(segmentos)).astype(str).astype(object)
+
+    matr_nos = np.concatenate([matr_unidade, matr_segmento, matriculados])
+    vagas_nos = np.concatenate([vagas_unidade, vagas_segmento, qtd_vagas])
+    return {
+        'ids': np.concatenate([ids_unidade, ids_segmento, ids_turma]),
+        'rotulos': np.concatenate([
+            ids_unidade, np.asarray(col['Segmento'], dtype=object)[primeira_turma], rotulos_turma
+        ]),
+        'pais': np.concatenate([
+            np.full(len(ids_unidade), '', dtype=object), unidades[primeira_turma], segmentos
+        ]),
+        'matriculados': matr_nos,
+        'vagas': vagas_nos,
+        'ocupacao': percentual(matr_nos, vagas_nos).astype(np.float32),
+    }
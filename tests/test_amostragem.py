@@ -0,0 +1,56 @@
+"""Redução de séries para os gráficos (amostragem.py)"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import amostragem  # noqa: E402
+
+
+def test_lttb_mantem_pontas_e_quantidade():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.sin(x / 50)
+    # Pico isolado no meio da série
+    y[537] = 10.0
+
+    indices = amostragem.lttb(x, y, 50)
+
+    assert len(indices) == 50
+    assert indices[0] == 0 and indices[-1] == 999
+    assert (np.diff(indices) > 0).all()
+    assert 537 in indices
+
+
+def test_lttb_sem_reducao():
+    x = np.arange(10)
+    assert amostragem.lttb(x, x, 10).tolist() == list(range(10))
+    assert amostragem.lttb(x, x, 2).tolist() == list(range(10))
+
+
+def test_reduzir_historico_respeita_limite_por_serie():
+    # Extração de hora em hora por 84 dias, duas unidades, fora de ordem
+    datas = pd.date_range("2026-01-01", periods=2000, freq="h")
+    df = pd.DataFrame({
+        "data_extracao": np.tile(datas, 2),
+        "unidade": np.repeat(["BV", "CD"], len(datas)),
+        "matriculados": np.arange(4000),
+    }).sample(frac=1, random_state=0)
+
+    reduzido = amostragem.reduzir_historico(df, "matriculados", limite=50, por="unidade")
+
+    for unidade, grupo in reduzido.groupby("unidade"):
+        assert len(grupo) == 50
+        assert grupo["data_extracao"].is_monotonic_increasing
+        # A última extração (o valor atual) sempre aparece
+        original = df[df["unidade"] == unidade]
+        assert grupo["matriculados"].iloc[-1] == original["matriculados"].max()
+        # Balde diário: no máximo uma extração por dia
+        assert grupo["data_extracao"].dt.date.is_unique
+
+    curto = df[df["unidade"] == "BV"].head(30)
+    assert len(amostragem.reduzir_historico(curto, "matriculados", limite=50)) == 30
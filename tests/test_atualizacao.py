@@ -0,0 +1,67 @@
+"""Interrupção da extração por timeout (atualizacao.AtualizacaoDados)"""
+
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import atualizacao  # noqa: E402
+
+# Extrator de mentira: pega a trava e fica parado, como uma extração travada
+EXTRATOR = """
+import sys, time
+sys.path.insert(0, {base!r})
+import atualizacao
+with atualizacao.TravaExtracao({trava!r}):
+    time.sleep(120)
+"""
+
+
+def esperar(condicao, segundos=5):
+    limite = time.monotonic() + segundos
+    while time.monotonic() < limite:
+        if condicao():
+            return True
+        time.sleep(0.05)
+    return condicao()
+
+
+def test_timeout_libera_trava(tmp_path, monkeypatch):
+    monkeypatch.setattr(atualizacao, "ESPERA_TERMINO", 0.5)
+    trava = tmp_path / "extracao.lock"
+    job = atualizacao.AtualizacaoDados(
+        tmp_path / "progresso.jsonl", tmp_path / "extracao.log", timeout=1, arquivo_trava=trava
+    )
+    extrator = EXTRATOR.format(base=str(BASE_DIR), trava=str(trava))
+    # Como o cron_extrator.sh: o extrator é neto do processo iniciado pelo dashboard
+    assert job.iniciar(["sh", "-c", f'"{sys.executable}" -c "$0"; true', extrator], tmp_path)
+    assert esperar(lambda: atualizacao.extracao_em_andamento(trava) is not None)
+
+    # Ninguém consulta o status: o timeout vale do mesmo jeito
+    assert esperar(lambda: atualizacao.extracao_em_andamento(trava) is None, segundos=3)
+    with atualizacao.TravaExtracao(trava) as nova:
+        assert not nova.esperou
+
+    assert esperar(lambda: job.status()["estado"] != atualizacao.RODANDO, segundos=2)
+    estado = job.status()
+    assert estado["estado"] == atualizacao.FALHOU
+    assert estado["interrompida"]
+
+
+def test_status_nao_espera_a_interrupcao(tmp_path, monkeypatch):
+    monkeypatch.setattr(atualizacao, "ESPERA_TERMINO", 2)
+    job = atualizacao.AtualizacaoDados(
+        tmp_path / "progresso.jsonl", tmp_path / "extracao.log", timeout=0.5, arquivo_trava=tmp_path / "extracao.lock"
+    )
+    # Ignora o SIGTERM: a interrupção fica esperando ESPERA_TERMINO até o SIGKILL
+    assert job.iniciar(["sh", "-c", "trap '' TERM; sleep 120 & wait; wait"], tmp_path)
+    assert esperar(lambda: job.status()["interrompida"])
+
+    inicio = time.monotonic()
+    estado = job.status()
+    assert time.monotonic() - inicio < 0.5
+    assert estado["estado"] == atualizacao.RODANDO
+
+    assert esperar(lambda: job.status()["estado"] == atualizacao.FALHOU, segundos=4)
@@ -0,0 +1,75 @@
+"""Métricas de crescimento diário (crescimento.py) sobre um vagas.db temporário"""
+
+import math
+import sqlite3
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import crescimento  # noqa: E402
+import periodos  # noqa: E402
+
+# (data da extração, período, matriculados); cada extração tem duas turmas que somam esse total
+EXTRACOES = [
+    ("2026-01-01T08:00:00", "2026", 90),
+    ("2026-01-01T18:00:00", "2026", 100),
+    ("2026-01-02T18:00:00", "2026", 110),
+    # 3 e 4 de janeiro sem extração
+    ("2026-01-05T18:00:00", "2026", 140),
+    ("2026-01-12T18:00:00", "2026", 170),
+    ("2026-01-12T10:00:00", "2025", 999),
+]
+
+
+def banco(caminho):
+    conn = sqlite3.connect(caminho)
+    periodos.preparar_banco(conn.cursor())
+    for data, periodo, matriculados in EXTRACOES:
+        extracao_id = conn.execute(
+            "INSERT INTO extrações (data_extracao, periodo) VALUES (?, ?)", (data, periodo)
+        ).lastrowid
+        metade = matriculados // 2
+        conn.executemany(
+            "INSERT INTO vagas (extracao_id, unidade_codigo, vagas, matriculados) VALUES (?, '01-BV', 200, ?)",
+            [(extracao_id, metade), (extracao_id, matriculados - metade)],
+        )
+    conn.commit()
+    conn.close()
+    return caminho
+
+
+def test_ritmo_atravessa_dias_sem_extracao(tmp_path):
+    df = crescimento.crescimento_diario("2026", banco(tmp_path / "vagas.db")).set_index("dia")
+
+    assert [d.strftime("%m-%d") for d in df.index] == ["01-01", "01-02", "01-05", "01-12"]
+    # Última extração do dia vence, e só o período pedido entra
+    assert df["matriculados"].tolist() == [100, 110, 140, 170]
+    assert df["vagas"].tolist() == [400] * 4
+    # Variação é para o dia anterior com dados, não para o dia de calendário anterior
+    assert df["variacao"].tolist()[1:] == [10.0, 30.0, 30.0]
+    assert df["dias"].tolist() == [0, 1, 4, 11]
+    assert df["crescimento"].tolist() == [0, 10, 40, 70]
+    assert df.loc["2026-01-12", "crescimento_pct"] == 70.0
+
+    primeiro = df.iloc[0]
+    assert all(math.isnan(primeiro[coluna]) for coluna in ("variacao", "media_diaria", "ritmo_7d", "ritmo_30d"))
+
+    # Em 5/1 a janela de 7 dias ainda alcança 1/1: (140 - 100) / 4 dias
+    assert df.loc["2026-01-05", "ritmo_7d"] == 10.0
+    # Em 12/1 começa em 5/1, exatamente 7 dias antes: (170 - 140) / 7
+    assert df.loc["2026-01-12", "ritmo_7d"] == round(30 / 7, 1)
+    # A de 30 dias e a média cobrem a campanha toda: (170 - 100) / 11
+    assert df.loc["2026-01-12", "ritmo_30d"] == round(70 / 11, 1)
+    assert df.loc["2026-01-12", "media_diaria"] == round(70 / 11, 1)
+
+
+def test_periodo_com_um_dia_e_sem_banco(tmp_path):
+    df = crescimento.crescimento_diario("2025", banco(tmp_path / "vagas.db"))
+    assert len(df) == 1
+    # Só NULL nas taxas: ainda assim float
+    assert df["ritmo_7d"].dtype == "float64"
+    assert df["ritmo_7d"].isna().all()
+
+    assert crescimento.crescimento_diario("2026", tmp_path / "nao_existe.db").empty
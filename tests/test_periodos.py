@@ -0,0 +1,80 @@
+"""Leituras de periodos.py em vagas.db"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import periodos  # noqa: E402
+
+# Esquema de um vagas.db antigo: sem dia_campanha, serie/turno/unidade_curta nem turma_id
+ESQUEMA_ANTIGO = """
+CREATE TABLE extrações (id INTEGER PRIMARY KEY AUTOINCREMENT, data_extracao TEXT, periodo TEXT);
+CREATE TABLE vagas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, extracao_id INTEGER, unidade_codigo TEXT, unidade_nome TEXT,
+    segmento TEXT, curso TEXT, turma TEXT, vagas INTEGER, novatos INTEGER, veteranos INTEGER,
+    matriculados INTEGER, vagas_restantes INTEGER, pre_matriculados INTEGER, disponiveis INTEGER
+);
+"""
+
+
+def banco_antigo(caminho):
+    conn = sqlite3.connect(caminho)
+    conn.executescript(ESQUEMA_ANTIGO)
+    for extracao_id, data, periodo in ((1, "2025-01-10T09:00:00", "2025"), (2, "2026-01-10T09:00:00", "2026")):
+        conn.execute("INSERT INTO extrações VALUES (?, ?, ?)", (extracao_id, data, periodo))
+        conn.execute(
+            "INSERT INTO vagas (extracao_id, unidade_codigo, unidade_nome, segmento, turma, vagas, novatos, "
+            "veteranos, matriculados, disponiveis) VALUES (?, '01-BV', 'Boa Viagem', 'Fund. I', '1º ano A', 30, 5, 20, 25, 5)",
+            (extracao_id,),
+        )
+    conn.commit()
+    conn.close()
+    return caminho
+
+
+def test_mesmo_dia_em_banco_sem_migracao(tmp_path):
+    db_path = banco_antigo(tmp_path / "vagas.db")
+    antes = db_path.read_bytes()
+
+    assert periodos.periodos_disponiveis(db_path) == ["2025", "2026"]
+    assert periodos.extracao_no_dia("2025", 100, db_path) is None
+    assert periodos.comparar_mesmo_dia("2026", "2026-01-10T09:00:00", db_path) == (None, None, None)
+    # Leitura não migra: o arquivo continua igual
+    assert db_path.read_bytes() == antes
+
+
+def test_comparativo_alinha_anos_com_segmento_ausente(tmp_path):
+    db_path = tmp_path / "vagas.db"
+    conn = sqlite3.connect(db_path)
+    periodos.preparar_banco(conn.cursor())
+    # (id, data, período, [(unidade, segmento, vagas, matriculados)]); 2026 tem duas extrações e não tem Ens. Médio
+    extracoes = [
+        (1, "2025-01-10T09:00:00", "2025", [("01-BV", "Fund. I", 30, 20), ("01-BV", "Ens. Médio", 40, 35)]),
+        (2, "2026-01-05T09:00:00", "2026", [("01-BV", "Fund. I", 30, 10)]),
+        (3, "2026-01-10T09:00:00", "2026", [("01-BV", "Fund. I", 30, 25)]),
+    ]
+    for extracao_id, data, periodo, linhas in extracoes:
+        conn.execute("INSERT INTO extrações (id, data_extracao, periodo) VALUES (?, ?, ?)", (extracao_id, data, periodo))
+        conn.executemany(
+            "INSERT INTO vagas (extracao_id, unidade_codigo, segmento, vagas, novatos, veteranos, matriculados) "
+            "VALUES (?, ?, ?, ?, 0, 0, ?)",
+            [(extracao_id, *linha) for linha in linhas],
+        )
+    conn.commit()
+    conn.close()
+
+    df = periodos.comparar_periodos(["2025", "2026"], db_path).set_index("Segmento")
+
+    # Uma linha por segmento da ordem pedagógica, mesmo sem dados em nenhum dos anos
+    assert list(df.index) == periodos.SEGMENTOS_ORDEM
+    assert df.loc["Fund. I", "Matriculados_2025"] == 20
+    # Última extração de 2026, não a primeira
+    assert df.loc["Fund. I", "Matriculados_2026"] == 25
+    # Segmento ausente num ano conta 0
+    assert df.loc["Ens. Médio", "Matriculados_2025"] == 35
+    assert df.loc["Ens. Médio", "Matriculados_2026"] == 0
+    assert df.loc["Ed. Infantil", ["Vagas_2025", "Vagas_2026"]].tolist() == [0, 0]
+    assert (df["Unidade"] == "BV").all()
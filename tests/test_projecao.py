@@ -0,0 +1,57 @@
+"""Tendência ponderada e dias até lotar (projecao.py)"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import projecao  # noqa: E402
+
+
+def test_inclinacao_conhecida_da_dias_ate_lotar():
+    dias = np.arange(10, dtype=np.float64)
+    # Três turmas: 2 matrículas/dia exatas, a mesma com buracos (NaN) e uma parada
+    matriz = np.vstack([5 + 2 * dias, 5 + 2 * dias, np.full(10, 7.0)])
+    matriz[1, [2, 5, 6]] = np.nan
+
+    inclinacao, erro, n = projecao.ajustar_inclinacao(dias, matriz)
+
+    np.testing.assert_allclose(inclinacao, [2.0, 2.0, 0.0], atol=1e-9)
+    np.testing.assert_allclose(erro, 0.0, atol=1e-9)
+    assert n.tolist() == [10, 7, 10]
+
+    central, otimista, pessimista = projecao.dias_para_lotar([10, 10, 10], inclinacao, erro)
+    np.testing.assert_allclose(central[:2], [5.0, 5.0])
+    # Sem ritmo não lota
+    assert np.isinf(central[2])
+    np.testing.assert_allclose(otimista[:2], central[:2])
+    np.testing.assert_allclose(pessimista[:2], central[:2])
+
+
+def test_faixa_de_confianca_e_turma_lotada():
+    central, otimista, pessimista = projecao.dias_para_lotar(
+        [12, 0, 6], np.array([2.0, 0.0, 1.0]), np.array([1.0, np.nan, np.nan]), z=1.0
+    )
+
+    # Otimista usa o ritmo + z·erro; pessimista o ritmo − z·erro
+    assert central[0] == 6.0
+    assert otimista[0] == 4.0
+    assert pessimista[0] == 12.0
+    # Sem vagas restantes: 0 dias, mesmo sem ritmo
+    assert central[1] == otimista[1] == pessimista[1] == 0.0
+    # Erro desconhecido (poucos pontos): a faixa colapsa na central
+    assert central[2] == otimista[2] == pessimista[2] == 6.0
+
+
+def test_pontos_recentes_pesam_mais():
+    dias = np.arange(20, dtype=np.float64)
+    # 1/dia nos primeiros 10 dias, 3/dia nos últimos 10
+    serie = np.where(dias < 10, dias, 9 + 3 * (dias - 9))[None, :]
+
+    recente, _, _ = projecao.ajustar_inclinacao(dias, serie, meia_vida=3)
+    uniforme, _, _ = projecao.ajustar_inclinacao(dias, serie, meia_vida=0)
+
+    assert uniforme[0] < recente[0] < 3.0